@@ -5,19 +5,529 @@ Objetivo: Identificar datos duplicados y patrones extraños en archivos NAC (199
 """
 
 import pandas as pd
+import numpy as np
 import os
 from pathlib import Path
-import json
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import hashlib
 
+from nac_io import (
+    candidate_read_configs,
+    file_fingerprint,
+    load_read_config_manifest,
+    save_read_config_manifest,
+)
+from nac_cache import fresh_cache_entry, parquet_available, read_cached_file
+from nac_schema import canonical_name, concat_years, harmonize_columns
+from nac_offsets import read_csv_parallel, read_row_positions
+from nac_bytes import profile_bytes, size_causes
+from nac_report import JsonReportWriter, ReportWriter
+from nac_near_duplicates import NEAR_DUPLICATE_COLUMNS, find_near_duplicates, near_duplicate_summary
+from nac_rules import AnomalyRules
+from nac_result_cache import (
+    cached_result,
+    drop_result,
+    load_cross_file_candidates,
+    load_result_manifest,
+    result_cache_directory,
+    save_cross_file_candidates,
+    save_result_manifest,
+    store_result,
+)
+
+HASH_MULTIPLIER = np.uint64(0x100000001B3)
+
+# Hash de los nulos de una columna numérica (cualquier valor fijo sirve: en
+# una columna todos los nulos tienen el mismo texto en el modo md5)
+NULL_HASH = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _hash_text(series):
+    """
+    Hash uint64 del texto str(v) de cada celda de una columna de texto u object
+    
+    Las columnas solo con strings se hashean tal cual (en C); las que mezclan
+    tipos pasan por str() celda a celda. Los nulos se hashean como su texto
+    ('nan', 'None', '<NA>'), igual que en el modo md5.
+    """
+    values = series.to_numpy(dtype=object)
+    nulls = pd.isna(values)
+    if nulls.any():
+        values = values.copy()
+        values[nulls] = [str(v) for v in values[nulls]]
+    if pd.api.types.infer_dtype(values, skipna=False) != 'string':
+        values = values.astype(str).astype(object)
+    return pd.util.hash_array(values)
+
+
+def _hash_column(series):
+    """
+    Hash uint64 por valor de una columna, sobre su arreglo nativo
+    
+    Dentro de una columna, dos celdas tienen el mismo texto str(v) en el modo
+    md5 si y solo si tienen el mismo valor, así que los números se hashean
+    directamente y solo las columnas de texto u object pasan por str():
+    '01' y '1' (texto) o 1 y 1.5 (números) siguen siendo distintos.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Una vez por categoría; los nulos (código -1) como el texto 'nan'
+        categories = _hash_text(pd.Series(series.cat.categories.to_numpy(dtype=object)))
+        codes = series.cat.codes.to_numpy()
+        null = _hash_text(pd.Series([np.nan], dtype=object))[0]
+        return np.where(codes >= 0, categories[codes], null)
+    
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype) and hasattr(dtype, 'numpy_dtype') \
+            and dtype.numpy_dtype.kind in 'biuf':
+        # Enteros/flotantes nullable: datos nativos y un hash fijo para <NA>
+        hashes = pd.util.hash_array(series.to_numpy(dtype=dtype.numpy_dtype, na_value=0))
+        hashes[series.isna().to_numpy()] = NULL_HASH
+        return hashes
+    
+    if dtype.kind in 'biu':
+        return pd.util.hash_array(series.to_numpy())
+    if dtype.kind == 'f':
+        values = series.to_numpy()
+        nan = np.isnan(values)
+        # Todos los NaN con el mismo patrón de bits
+        return np.where(nan, NULL_HASH, pd.util.hash_array(np.where(nan, 0.0, values)))
+    return _hash_text(series)
+
+
+def _hash_value_column(series):
+    """
+    Hash uint64 por valor de una columna, independiente del dtype inferido
+    
+    En una lectura por chunks la misma columna puede llegar como int en un
+    chunk, como float en otro (si trae nulos) y como texto en otro (si trae
+    un valor no numérico). Las celdas numéricas se hashean siempre como
+    float64 y el resto como texto, así la misma fila da el mismo hash en
+    cualquier chunk, igual que df.duplicated() sobre la lectura completa.
+    Diferencia con esa lectura: en una columna de texto, '02' y '2' cuentan
+    como el mismo valor.
+    """
+    if pd.api.types.is_bool_dtype(series.dtype):
+        # Como texto: en un chunk con texto la columna trae 'True'/'False'
+        return _hash_text(series.astype(object))
+    numbers = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    hashes = _hash_column(pd.Series(numbers))
+    text = np.isnan(numbers) & series.notna().to_numpy()
+    if text.any():
+        hashes[text] = _hash_text(series[text])
+    return hashes
+
+
+def _combine_hashes(df, column_hash):
+    """Combina en orden de columna los hashes por columna de column_hash"""
+    combined = np.full(len(df), np.uint64(len(df.columns)), dtype=np.uint64)
+    
+    for col in df.columns:
+        combined = (combined ^ column_hash(df[col])) * HASH_MULTIPLIER
+    
+    return combined
+
+
+def hash_rows(df):
+    """
+    Calcula un hash uint64 por fila de manera vectorizada
+    
+    Reemplaza el recorrido con iterrows + md5: cada columna se hashea como
+    un arreglo completo (nativo si es numérica) y los hashes se combinan en
+    orden de columna, por lo que dos filas tienen el mismo hash si y solo si
+    tienen el mismo texto str(v) en las mismas posiciones (salvo colisiones
+    de 64 bits). Agrupa las filas igual que el modo md5.
+    
+    Returns:
+        np.ndarray: Arreglo uint64 con un hash por fila
+    """
+    return _combine_hashes(df, _hash_column)
+
+
+class DuplicateGroups:
+    """
+    Grupos de filas con el mismo hash, almacenados como arreglos empaquetados
+    
+    Cada grupo g ocupa las posiciones offsets[g]:offsets[g + 1] de los
+    arreglos file_ids/rows, ordenadas por archivo y fila.
+    """
+    
+    def __init__(self, file_names, hashes, offsets, file_counts, file_ids, rows):
+        self.file_names = file_names
+        self.hashes = hashes
+        self.offsets = offsets
+        self.file_counts = file_counts
+        self.file_ids = file_ids
+        self.rows = rows
+    
+    def __len__(self):
+        return len(self.hashes)
+    
+    @property
+    def total_rows(self):
+        """Cantidad de filas involucradas en algún grupo"""
+        return len(self.rows)
+    
+    def locations(self, group):
+        """Ubicaciones de un grupo en el formato [{'file', 'row'}, ...]"""
+        start, stop = self.offsets[group], self.offsets[group + 1]
+        return [
+            {'file': self.file_names[file_id], 'row': int(row)}
+            for file_id, row in zip(self.file_ids[start:stop], self.rows[start:stop])
+        ]
+    
+    def sample(self, n=10):
+        """Primeros n grupos como {hash_hex: [ubicaciones]} para el reporte"""
+        return {
+            f"{self.hashes[group]:016x}": self.locations(group)
+            for group in range(min(n, len(self)))
+        }
+
+
+def find_duplicate_groups(file_names, hashes, file_ids, rows, min_files=2):
+    """
+    Motor de grupos de duplicados basado en ordenamiento
+    
+    Ordena los hashes una sola vez (argsort estable) y detecta los límites de
+    grupo comparando vecinos, sin construir diccionarios por fila. La memoria
+    adicional es proporcional a un par de arreglos del tamaño del corpus.
+    
+    Args:
+        file_names: nombres de archivo indexados por file_id
+        hashes: arreglo uint64 con el hash de cada fila
+        file_ids: arreglo entero con el archivo de cada fila
+        rows: arreglo entero con el índice de fila dentro de su archivo
+        min_files: mínimo de archivos distintos para reportar un grupo
+            (2 = solo duplicados entre archivos, 1 = cualquier duplicado)
+    
+    Returns:
+        DuplicateGroups: grupos con al menos 2 filas en >= min_files archivos
+    """
+    # Estable: dentro de un grupo se conserva el orden archivo/fila de entrada
+    order = np.argsort(hashes, kind='stable')
+    sorted_hashes = hashes[order]
+    sorted_files = file_ids[order]
+    
+    new_group = np.empty(len(order), dtype=bool)
+    new_group[:1] = True
+    np.not_equal(sorted_hashes[1:], sorted_hashes[:-1], out=new_group[1:])
+    
+    new_file = new_group.copy()
+    new_file[1:] |= sorted_files[1:] != sorted_files[:-1]
+    
+    starts = np.flatnonzero(new_group)
+    sizes = np.diff(np.append(starts, len(order)))
+    file_counts = np.add.reduceat(new_file.astype(np.int32), starts) if len(starts) else np.zeros(0, dtype=np.int32)
+    
+    selected = (sizes > 1) & (file_counts >= min_files)
+    member = np.repeat(selected, sizes)
+    kept_order = order[member]
+    
+    return DuplicateGroups(
+        file_names=list(file_names),
+        hashes=sorted_hashes[starts[selected]],
+        offsets=np.concatenate([[0], np.cumsum(sizes[selected])]),
+        file_counts=file_counts[selected],
+        file_ids=file_ids[kept_order],
+        rows=rows[kept_order]
+    )
+
+
+def sort_hashes(hashes):
+    """
+    Hashes ordenados y su permutación (argsort estable)
+    
+    Returns:
+        tuple: (hashes ordenados, posiciones en el arreglo original)
+    """
+    order = np.argsort(hashes, kind='stable')
+    return hashes[order], order
+
+
+def _unique_sorted(sorted_hashes):
+    """Valores distintos de un arreglo ya ordenado"""
+    keep = np.empty(len(sorted_hashes), dtype=bool)
+    keep[:1] = True
+    np.not_equal(sorted_hashes[1:], sorted_hashes[:-1], out=keep[1:])
+    return np.asarray(sorted_hashes[keep])
+
+
+def intersect_sorted(values, sorted_hashes):
+    """
+    Valores (ordenados) que aparecen en sorted_hashes
+    
+    Búsqueda binaria vectorizada: sobre un arreglo mapeado en memoria solo se
+    leen las páginas que visita la búsqueda, no el archivo completo.
+    """
+    if not len(values) or not len(sorted_hashes):
+        return np.zeros(0, dtype=np.uint64)
+    positions = np.searchsorted(sorted_hashes, values)
+    positions[positions == len(sorted_hashes)] = 0
+    return values[np.asarray(sorted_hashes[positions]) == values]
+
+
+def cross_file_candidates(sorted_by_file, pending, known=None):
+    """
+    Hashes que aparecen en más de un archivo, por sort-merge
+    
+    Solo se comparan los pares que involucran archivos de pending: cada uno
+    se busca en los arreglos ordenados de todos los demás. Los pares entre
+    archivos sin cambios vienen en known (candidatos de la ejecución
+    anterior). El resultado puede incluir hashes que ya no están repetidos;
+    find_duplicate_groups los descarta.
+    
+    Args:
+        sorted_by_file: nombre -> (hashes ordenados, permutación)
+        pending: archivos nuevos o modificados
+        known: candidatos previos (arreglo uint64) o None
+    
+    Returns:
+        np.ndarray: hashes candidatos únicos y ordenados
+    """
+    parts = [np.asarray(known, dtype=np.uint64)] if known is not None else []
+    checked = set()
+    
+    for name in pending:
+        values = _unique_sorted(sorted_by_file[name][0])
+        for other, (other_sorted, _) in sorted_by_file.items():
+            if other != name and other not in checked:
+                parts.append(intersect_sorted(values, other_sorted))
+        checked.add(name)
+    
+    return np.unique(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.uint64)
+
+
+def _candidate_positions(sorted_hashes, order, candidates):
+    """Posiciones (en orden del archivo) de las filas cuyo hash está en candidates"""
+    low = np.searchsorted(sorted_hashes, candidates, side='left')
+    high = np.searchsorted(sorted_hashes, candidates, side='right')
+    counts = high - low
+    total = int(counts.sum())
+    
+    # Expandir los rangos [low, high) sin bucle
+    starts = np.repeat(low - np.cumsum(counts) + counts, counts)
+    positions = np.asarray(order[starts + np.arange(total)])
+    return np.sort(positions)
+
+
+def _merge_dtypes(current, new):
+    """Dtype resultante de concatenar dos chunks de una misma columna"""
+    if current is None or current == new:
+        return new
+    if pd.api.types.is_numeric_dtype(current) and pd.api.types.is_numeric_dtype(new):
+        return np.result_type(current, new)
+    return np.dtype(object)
+
+
+def _report_near_duplicates(clusters, total_rows, analysis):
+    """Agrega al análisis el resumen de casi-duplicados y su advertencia"""
+    
+    summary = near_duplicate_summary(clusters, total_rows)
+    analysis['duplicates']['near_duplicates'] = summary
+    
+    if summary['clusters'] > 0:
+        analysis['warnings'].append(
+            f"Se encontraron {summary['clusters']} grupos de casi-duplicados "
+            f"({summary['redundant_rows']} filas redundantes, {summary['percentage']}%)"
+        )
+
+
+class StreamingQualityStats:
+    """
+    Acumulador de métricas de calidad para una lectura por chunks
+    
+    Cada chunk actualiza en una sola pasada los conteos de nulos, anomalías
+    y value_counts de columnas categóricas, y guarda sus hashes de filas; los
+    duplicados exactos se cuentan al final sobre esos hashes. Lo único que
+    crece con el archivo son los arreglos de hashes (8 bytes por fila) y las
+    columnas de bloqueo y comparación de casi-duplicados, con tipos compactos
+    (unos 22 bytes por fila en NAC_2009): la memoria es proporcional a las
+    filas del archivo, no a chunksize, aunque mucho menor que el DataFrame.
+    """
+    
+    categorical_cols = ['SEXO', 'TIPO_PARTO', 'TIPO_ATENC', 'ATENC_PART']
+    
+    def __init__(self, year):
+        self.year = year
+        self.total_rows = 0
+        self.column_names = None
+        self.memory_bytes = 0
+        self.null_counts = None
+        self.dtypes = {}
+        self.rules = AnomalyRules(int(year) if year.isdigit() else None)
+        self.empty_rows = 0
+        self.value_counts = {}
+        self._hash_chunks = []
+        self._near_chunks = []
+    
+    def update(self, chunk):
+        """Actualiza todas las métricas con un chunk"""
+        
+        if self.column_names is None:
+            self.column_names = list(chunk.columns)
+            self.null_counts = pd.Series(0, index=chunk.columns, dtype=np.int64)
+        
+        self.total_rows += len(chunk)
+        self.memory_bytes += chunk.memory_usage(deep=True).sum()
+        
+        is_null = chunk.isnull()
+        self.null_counts += is_null.sum()
+        self.empty_rows += int(is_null.all(axis=1).sum())
+        
+        for col, dtype in chunk.dtypes.items():
+            self.dtypes[col] = _merge_dtypes(self.dtypes.get(col), dtype)
+        
+        # Hashes para los duplicados exactos, por valor y no por el dtype que
+        # pandas infirió para este chunk
+        self._hash_chunks.append(_combine_hashes(chunk, _hash_value_column))
+        
+        # Casi-duplicados: los bloques pueden cruzar chunks, se comparan al final
+        self._near_chunks.append(harmonize_columns(
+            chunk[[col for col in chunk.columns if canonical_name(col) in NEAR_DUPLICATE_COLUMNS]]
+        ))
+        
+        # Anomalías
+        self.rules.update(chunk)
+        
+        # Consistencia: value_counts combinables por suma
+        for col in self.categorical_cols:
+            if col in chunk.columns:
+                counts = self.value_counts.setdefault(col, {})
+                for value, count in chunk[col].value_counts().items():
+                    key = str(value)
+                    counts[key] = counts.get(key, 0) + int(count)
+    
+    @property
+    def exact_duplicates(self):
+        """Filas cuyo hash ya apareció antes: total menos hashes distintos (un solo sort)"""
+        hashes = self.row_hashes[0]
+        return len(hashes) - len(np.unique(hashes))
+    
+    @property
+    def row_hashes(self):
+        hashes = np.concatenate(self._hash_chunks) if self._hash_chunks else np.zeros(0, dtype=np.uint64)
+        return hashes, np.arange(len(hashes), dtype=np.int64)
+    
+    def finalize(self, analysis):
+        """Escribe las métricas acumuladas con el mismo formato que el análisis completo"""
+        
+        total = self.total_rows
+        pct = lambda count: round((count / total) * 100, 2) if total else 0.0
+        metrics = analysis['metrics']
+        
+        metrics['total_rows'] = total
+        metrics['total_columns'] = len(self.column_names or [])
+        metrics['column_names'] = list(self.column_names or [])
+        metrics['memory_usage_mb'] = self.memory_bytes / (1024 * 1024)
+        
+        exact_duplicates = self.exact_duplicates
+        analysis['duplicates']['exact_duplicates'] = {
+            'count': exact_duplicates,
+            'percentage': pct(exact_duplicates)
+        }
+        if exact_duplicates > 0:
+            analysis['warnings'].append(
+                f"Se encontraron {exact_duplicates} filas duplicadas exactas ({pct(exact_duplicates)}%)"
+            )
+        
+        if self._near_chunks:
+            near = concat_years(self._near_chunks).reset_index(drop=True)
+            _report_near_duplicates(find_near_duplicates(near), total, analysis)
+        
+        null_counts = self.null_counts if self.null_counts is not None else pd.Series(dtype=np.int64)
+        columns_with_nulls = null_counts[null_counts > 0]
+        metrics['null_values'] = {
+            'total_nulls': int(null_counts.sum()),
+            'columns_with_nulls': {
+                col: {'count': int(count), 'percentage': pct(count)}
+                for col, count in columns_with_nulls.items()
+            }
+        }
+        for col, count in columns_with_nulls.items():
+            if total and count / total * 100 > 50:
+                analysis['warnings'].append(
+                    f"Columna '{col}' tiene {count / total * 100:.2f}% de valores nulos"
+                )
+        
+        dtype_counts = pd.Series([str(dtype) for dtype in self.dtypes.values()]).value_counts()
+        metrics['data_types'] = {dtype: int(count) for dtype, count in dtype_counts.items()}
+        
+        analysis['anomalies'].extend(self.rules.report())
+        if self.empty_rows > 0:
+            analysis['anomalies'].append({
+                'type': 'empty_rows',
+                'description': 'Filas completamente vacías',
+                'count': self.empty_rows
+            })
+        empty_cols = [col for col, count in null_counts.items() if total and count == total]
+        if empty_cols:
+            analysis['anomalies'].append({
+                'type': 'empty_columns',
+                'description': 'Columnas completamente vacías',
+                'columns': empty_cols
+            })
+        
+        metrics['consistency'] = [
+            {
+                'column': col,
+                'unique_values': len(self.value_counts[col]),
+                'top_5_values': dict(sorted(self.value_counts[col].items(), key=lambda item: -item[1]))
+            }
+            for col in self.categorical_cols if col in self.value_counts
+        ]
+        metrics['row_hashes_created'] = total
+
+
+def _analyze_file_worker(data_directory, options, file_path):
+    """
+    Analiza un archivo en un proceso hijo
+    
+    Devuelve solo el dict de análisis y los arreglos compactos de hashes,
+    que es lo único que el proceso padre necesita para el paso entre archivos.
+    """
+    analyzer = CSVAnalyzer(data_directory, result_cache=False, **options)
+    analysis = analyzer.analyze_single_csv(file_path)
+    row_hashes = analyzer.row_hashes.get(file_path.name)
+    return analysis, row_hashes, sort_hashes(row_hashes[0]) if row_hashes is not None else None
+
+
 class CSVAnalyzer:
     """Analizador completo de archivos CSV para detectar duplicados y anomalías"""
     
-    def __init__(self, data_directory):
+    def __init__(self, data_directory, hash_mode='vectorized', chunksize=None, use_cache=True,
+                 result_cache=True, parse_workers=1):
+        """
+        Args:
+            data_directory: directorio con los archivos NAC_*.csv
+            hash_mode: 'vectorized' (hash uint64 por columnas) o 'md5'
+                (recorrido fila a fila, más lento, se mantiene para verificación)
+            chunksize: si se especifica, cada archivo se analiza en modo
+                streaming leyendo chunks de ese tamaño. El archivo nunca está
+                completo en memoria, pero la memoria no queda acotada por
+                chunksize: los hashes de filas (8 bytes por fila) y las
+                columnas de casi-duplicados crecen con el archivo
+            use_cache: leer desde la caché columnar (nac_cache) cuando está
+                vigente; si el CSV cambió se lee el CSV
+            result_cache: reutilizar el análisis y los hashes guardados de los
+                archivos que no cambiaron (nac_result_cache, junto al reporte)
+            parse_workers: procesos para parsear cada CSV por rangos de bytes
+                (nac_offsets.read_csv_parallel). Acelera el análisis de un
+                archivo grande; con analyze_all_files(workers > 1) los procesos
+                hijos parsean en serie para no multiplicar procesos
+        """
         self.data_directory = Path(data_directory)
+        self.hash_mode = hash_mode
+        self.chunksize = chunksize
+        self.use_cache = use_cache
+        self.result_cache = result_cache
+        self.parse_workers = parse_workers
         self.analysis_results = {}
-        self.global_duplicates = []
+        self.row_hashes = {}
+        # nombre -> (hashes ordenados, permutación), para el paso entre archivos
+        self.sorted_hashes = {}
+        self.cross_file_duplicates = None
+        self._read_config_cache = None
         
     def analyze_single_csv(self, file_path):
         """
@@ -42,6 +552,9 @@ class CSVAnalyzer:
             'anomalies': []
         }
         
+        if self.chunksize:
+            return self._analyze_single_csv_streaming(file_path, analysis)
+        
         try:
             # Intentar leer con diferentes delimitadores y encodings
             df = self._read_csv_flexible(file_path, analysis)
@@ -73,6 +586,9 @@ class CSVAnalyzer:
             # Crear hash de filas para comparación global
             self._create_row_hashes(df, analysis, file_name)
             
+            # Perfil de bytes del CSV (explica archivos más grandes de lo normal)
+            self._profile_bytes(file_path, analysis)
+            
             print(f"✓ Análisis completado: {len(df)} filas, {len(df.columns)} columnas")
             
         except Exception as e:
@@ -81,22 +597,85 @@ class CSVAnalyzer:
         
         return analysis
     
+    def _analyze_single_csv_streaming(self, file_path, analysis):
+        """
+        Analiza un archivo en una sola pasada leyendo por chunks
+        
+        Produce las mismas métricas que el análisis completo sin cargar el
+        DataFrame entero: por fila solo se guardan el hash y las columnas de
+        casi-duplicados (ver StreamingQualityStats). Si una configuración de
+        lectura falla a mitad del archivo se reinicia la pasada con la
+        siguiente.
+        """
+        file_name = file_path.name
+        year = file_name.split('_')[1].split('.')[0]
+        
+        configs, cached_config, first_config = candidate_read_configs(
+            file_path, self._load_read_config_cache()
+        )
+        
+        for config in configs:
+            stats = StreamingQualityStats(year)
+            try:
+                for chunk in pd.read_csv(file_path, **config, chunksize=self.chunksize, low_memory=False):
+                    stats.update(chunk)
+            except Exception as e:
+                continue
+            
+            analysis['read_config'] = config
+            analysis['read_config_source'] = (
+                'cache' if config is cached_config
+                else 'sniff' if config is first_config
+                else 'fallback'
+            )
+            analysis['read_mode'] = {'streaming': True, 'chunksize': self.chunksize}
+            
+            try:
+                stats.finalize(analysis)
+                if self.hash_mode == 'md5':
+                    analysis['warnings'].append("hash_mode='md5' no aplica en modo streaming; se usó el hash vectorizado")
+                self.row_hashes[file_name] = stats.row_hashes
+                self._profile_bytes(file_path, analysis)
+                print(f"✓ Análisis completado: {stats.total_rows} filas, {len(stats.column_names or [])} columnas")
+            except Exception as e:
+                analysis['errors'].append(f"Error crítico: {str(e)}")
+                print(f"✗ Error al analizar {file_name}: {str(e)}")
+            
+            return analysis
+        
+        analysis['errors'].append("No se pudo leer el archivo con ninguna configuración")
+        return analysis
+    
     def _read_csv_flexible(self, file_path, analysis):
-        """Intenta leer el CSV con diferentes configuraciones"""
-        
-        # Configuraciones a probar
-        configs = [
-            {'sep': ';', 'encoding': 'utf-8', 'quotechar': '"'},
-            {'sep': ';', 'encoding': 'latin-1', 'quotechar': '"'},
-            {'sep': ';', 'encoding': 'iso-8859-1', 'quotechar': '"'},
-            {'sep': ',', 'encoding': 'utf-8', 'quotechar': '"'},
-            {'sep': ';', 'encoding': 'utf-8', 'quoting': 3},  # QUOTE_NONE
-        ]
+        """
+        Lee el CSV con una sola pasada cuando es posible
+        
+        Usa primero la configuración guardada en el manifiesto (si el archivo
+        no cambió) o la detectada por sniffing; solo si esa lectura falla se
+        prueban las demás configuraciones de READ_CONFIGS. Si hay una caché
+        columnar vigente para el archivo se lee desde ahí.
+        """
+        
+        if self.use_cache:
+            entry = fresh_cache_entry(file_path)
+            if entry is not None:
+                analysis['read_config'] = entry['read_config']
+                analysis['read_config_source'] = 'columnar_cache'
+                return read_cached_file(file_path, entry, plain=True)
+        
+        configs, cached_config, first_config = candidate_read_configs(
+            file_path, self._load_read_config_cache()
+        )
         
         for config in configs:
             try:
-                df = pd.read_csv(file_path, **config, low_memory=False)
+                df = read_csv_parallel(file_path, config, self.parse_workers)
                 analysis['read_config'] = config
+                analysis['read_config_source'] = (
+                    'cache' if config is cached_config
+                    else 'sniff' if config is first_config
+                    else 'fallback'
+                )
                 return df
             except Exception as e:
                 continue
@@ -104,6 +683,42 @@ class CSVAnalyzer:
         analysis['errors'].append("No se pudo leer el archivo con ninguna configuración")
         return None
     
+    def _profile_bytes(self, file_path, analysis):
+        """Bytes por campo, comillas, relleno y fin de línea del CSV (nac_bytes)"""
+        try:
+            analysis['byte_profile'] = profile_bytes(file_path, analysis.get('read_config'))
+        except Exception as e:
+            analysis['warnings'].append(f"No se pudo calcular el perfil de bytes: {str(e)}")
+    
+    def _load_read_config_cache(self):
+        """Carga el manifiesto de configuraciones de lectura (una sola vez)"""
+        if self._read_config_cache is None:
+            self._read_config_cache = load_read_config_manifest(self.data_directory)
+        return self._read_config_cache
+    
+    def _update_read_config_cache(self, csv_files):
+        """
+        Guarda en el manifiesto la configuración que funcionó para cada archivo
+        
+        Se ejecuta en el proceso padre después del análisis, así los procesos
+        hijos nunca escriben el manifiesto en paralelo.
+        """
+        cache = self._load_read_config_cache()
+        changed = False
+        
+        for csv_file in csv_files:
+            analysis = self.analysis_results.get(csv_file.name, {})
+            if 'read_config' not in analysis or analysis.get('read_config_source') in ('cache', 'columnar_cache'):
+                continue
+            cache[csv_file.name] = {
+                'fingerprint': file_fingerprint(csv_file),
+                'read_config': analysis['read_config']
+            }
+            changed = True
+        
+        if changed:
+            save_read_config_manifest(self.data_directory, cache)
+    
     def _analyze_duplicates(self, df, analysis):
         """Analiza duplicados en el DataFrame"""
         
@@ -121,27 +736,9 @@ class CSVAnalyzer:
                 f"Se encontraron {num_duplicates} filas duplicadas exactas ({analysis['duplicates']['exact_duplicates']['percentage']}%)"
             )
         
-        # Duplicados por subconjunto de columnas clave
-        # Asumiendo que estas columnas identifican un registro único
-        key_columns = []
-        for col in ['SEXO', 'DIA_NAC', 'MES_NAC', 'ANO_NAC', 'TIPO_PARTO']:
-            if col in df.columns:
-                key_columns.append(col)
-        
-        if key_columns:
-            subset_duplicates = df.duplicated(subset=key_columns)
-            num_subset_duplicates = subset_duplicates.sum()
-            
-            analysis['duplicates']['key_column_duplicates'] = {
-                'columns': key_columns,
-                'count': int(num_subset_duplicates),
-                'percentage': round((num_subset_duplicates / len(df)) * 100, 2)
-            }
-            
-            if num_subset_duplicates > 0:
-                analysis['warnings'].append(
-                    f"Se encontraron {num_subset_duplicates} duplicados en columnas clave ({analysis['duplicates']['key_column_duplicates']['percentage']}%)"
-                )
+        # Casi-duplicados: misma fecha, comuna y establecimiento con PESO,
+        # TALLA, EDAD_M y SEMANAS dentro de tolerancia
+        _report_near_duplicates(find_near_duplicates(df), len(df), analysis)
     
     def _analyze_null_values(self, df, analysis):
         """Analiza valores nulos en el DataFrame"""
@@ -184,37 +781,12 @@ class CSVAnalyzer:
         # Extraer año del nombre del archivo
         year = file_name.split('_')[1].split('.')[0]
         
-        # Anomalía 1: Verificar que ANO_NAC coincida con el año del archivo
-        if 'ANO_NAC' in df.columns:
-            wrong_year = df[df['ANO_NAC'].astype(str) != year]
-            if len(wrong_year) > 0:
-                analysis['anomalies'].append({
-                    'type': 'year_mismatch',
-                    'description': f"Registros con ANO_NAC diferente a {year}",
-                    'count': int(len(wrong_year)),
-                    'percentage': round((len(wrong_year) / len(df)) * 100, 2)
-                })
-        
-        # Anomalía 2: Valores fuera de rango en columnas numéricas
-        if 'DIA_NAC' in df.columns:
-            invalid_days = df[(df['DIA_NAC'] < 1) | (df['DIA_NAC'] > 31)]
-            if len(invalid_days) > 0:
-                analysis['anomalies'].append({
-                    'type': 'invalid_day',
-                    'description': 'Días de nacimiento inválidos (< 1 o > 31)',
-                    'count': int(len(invalid_days))
-                })
-        
-        if 'MES_NAC' in df.columns:
-            invalid_months = df[(df['MES_NAC'] < 1) | (df['MES_NAC'] > 12)]
-            if len(invalid_months) > 0:
-                analysis['anomalies'].append({
-                    'type': 'invalid_month',
-                    'description': 'Meses de nacimiento inválidos (< 1 o > 12)',
-                    'count': int(len(invalid_months))
-                })
+        # Reglas declarativas (rangos, fechas inexistentes, consistencia entre
+        # columnas) evaluadas en una sola pasada sobre arreglos NumPy
+        rules = AnomalyRules(int(year) if year.isdigit() else None).update(df)
+        analysis['anomalies'].extend(rules.report())
         
-        # Anomalía 3: Filas completamente vacías
+        # Filas completamente vacías
         empty_rows = df.isnull().all(axis=1).sum()
         if empty_rows > 0:
             analysis['anomalies'].append({
@@ -223,7 +795,7 @@ class CSVAnalyzer:
                 'count': int(empty_rows)
             })
         
-        # Anomalía 4: Columnas completamente vacías
+        # Columnas completamente vacías
         empty_cols = df.columns[df.isnull().all()].tolist()
         if empty_cols:
             analysis['anomalies'].append({
@@ -259,22 +831,36 @@ class CSVAnalyzer:
     def _create_row_hashes(self, df, analysis, file_name):
         """Crea hashes de filas para detectar duplicados entre archivos"""
         
-        # Crear hash de cada fila para comparación global
-        row_hashes = []
-        for idx, row in df.iterrows():
-            row_str = '|'.join([str(v) for v in row.values])
-            row_hash = hashlib.md5(row_str.encode()).hexdigest()
-            row_hashes.append({
-                'file': file_name,
-                'row_index': idx,
-                'hash': row_hash
-            })
+        if self.hash_mode == 'md5':
+            # Modo original: md5 de cada fila de iterrows; solo se guardan los
+            # primeros 64 bits del digest para usar los mismos arreglos uint64
+            hashes = np.fromiter(
+                (
+                    int(hashlib.md5('|'.join([str(v) for v in row.values]).encode()).hexdigest()[:16], 16)
+                    for _, row in df.iterrows()
+                ),
+                dtype=np.uint64,
+                count=len(df)
+            )
+        else:
+            hashes = hash_rows(df)
+        
+        rows = df.index.to_numpy(dtype=np.int64)
         
-        self.global_duplicates.extend(row_hashes)
-        analysis['metrics']['row_hashes_created'] = len(row_hashes)
+        # Arreglos compactos por archivo en lugar de un dict por fila
+        self.row_hashes[file_name] = (hashes, rows)
+        analysis['metrics']['row_hashes_created'] = len(hashes)
     
-    def analyze_all_files(self):
-        """Analiza todos los archivos CSV en el directorio"""
+    def analyze_all_files(self, workers=1):
+        """
+        Analiza todos los archivos CSV en el directorio
+        
+        Args:
+            workers: cantidad de procesos para el análisis por archivo.
+                Con workers > 1 los archivos se reparten en un
+                ProcessPoolExecutor; el resultado es el mismo que en serie
+                porque se combina en el orden de los archivos.
+        """
         
         csv_files = sorted(self.data_directory.glob('NAC_*.csv'))
         
@@ -282,12 +868,62 @@ class CSVAnalyzer:
         print(f"INICIANDO ANÁLISIS DE {len(csv_files)} ARCHIVOS CSV")
         print(f"{'#'*80}\n")
         
+        # Resultados guardados de archivos sin cambios
+        cache_dir = result_cache_directory(self.data_directory.parent)
+        manifest = load_result_manifest(cache_dir) if self.result_cache else {}
+        # Opciones que cambian el resultado: parte de la clave de la caché, y
+        # las mismas con que se crean los analizadores de los procesos hijos
+        cache_options = {'hash_mode': self.hash_mode, 'chunksize': self.chunksize, 'use_cache': self.use_cache}
+        results = {}
+        pending = []
+        
         for csv_file in csv_files:
-            analysis = self.analyze_single_csv(csv_file)
+            cached = cached_result(cache_dir, manifest, csv_file, cache_options) if self.result_cache else None
+            if cached is None:
+                pending.append(csv_file)
+            else:
+                results[csv_file.name] = cached
+                print(f"♻️  {csv_file.name}: sin cambios, se reutiliza el análisis guardado")
+        
+        if workers and workers > 1 and len(pending) > 1:
+            worker = partial(_analyze_file_worker, self.data_directory, cache_options)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # map conserva el orden de pending: la combinación es determinista
+                for csv_file, result in zip(pending, executor.map(worker, pending)):
+                    results[csv_file.name] = result
+        else:
+            for csv_file in pending:
+                analysis = self.analyze_single_csv(csv_file)
+                # Se vuelve a insertar abajo, en el orden de los archivos
+                row_hashes = self.row_hashes.pop(csv_file.name, None)
+                sorted_hashes = sort_hashes(row_hashes[0]) if row_hashes is not None else None
+                results[csv_file.name] = (analysis, row_hashes, sorted_hashes)
+        
+        if self.result_cache:
+            # Los arreglos nuevos se escriben a .npy y se usan mapeados en memoria
+            for csv_file in pending:
+                stored = store_result(cache_dir, manifest, csv_file, cache_options, *results[csv_file.name])
+                if stored is not None:
+                    results[csv_file.name] = (results[csv_file.name][0], *stored)
+            for name in [name for name in manifest if name not in results]:
+                drop_result(cache_dir, manifest, name)
+            save_result_manifest(cache_dir, manifest)
+        
+        # Combinar en el orden de los archivos
+        for csv_file in csv_files:
+            analysis, row_hashes, sorted_hashes = results[csv_file.name]
             self.analysis_results[csv_file.name] = analysis
+            if row_hashes is not None:
+                self.row_hashes[csv_file.name] = row_hashes
+                self.sorted_hashes[csv_file.name] = sorted_hashes
+        
+        self._update_read_config_cache(pending)
         
         # Detectar duplicados entre archivos
-        self._detect_cross_file_duplicates()
+        if self.result_cache:
+            self._detect_cross_file_duplicates_incremental(cache_dir, [f.name for f in pending])
+        else:
+            self._detect_cross_file_duplicates()
         
         return self.analysis_results
     
@@ -298,48 +934,159 @@ class CSVAnalyzer:
         print("ANALIZANDO DUPLICADOS ENTRE ARCHIVOS")
         print(f"{'='*80}")
         
-        # Crear diccionario de hashes
-        hash_dict = {}
-        for entry in self.global_duplicates:
-            hash_val = entry['hash']
-            if hash_val not in hash_dict:
-                hash_dict[hash_val] = []
-            hash_dict[hash_val].append({
-                'file': entry['file'],
-                'row': entry['row_index']
-            })
+        file_names = list(self.row_hashes.keys())
         
-        # Encontrar hashes que aparecen en múltiples archivos
-        cross_file_dups = {
-            hash_val: locations 
-            for hash_val, locations in hash_dict.items() 
-            if len(locations) > 1 and len(set(loc['file'] for loc in locations)) > 1
-        }
+        # Arreglos empaquetados (hash, file_id, fila) de todo el corpus
+        hashes = np.concatenate(
+            [self.row_hashes[name][0] for name in file_names] or [np.zeros(0, dtype=np.uint64)]
+        )
+        rows = np.concatenate(
+            [self.row_hashes[name][1].astype(np.int32) for name in file_names] or [np.zeros(0, dtype=np.int32)]
+        )
+        file_ids = np.concatenate(
+            [
+                np.full(len(self.row_hashes[name][0]), file_id, dtype=np.int16)
+                for file_id, name in enumerate(file_names)
+            ] or [np.zeros(0, dtype=np.int16)]
+        )
+        
+        cross_file_dups = find_duplicate_groups(file_names, hashes, file_ids, rows, min_files=2)
         
         self.cross_file_duplicates = cross_file_dups
         
         print(f"✓ Se encontraron {len(cross_file_dups)} registros duplicados entre archivos")
     
-    def generate_report(self, output_file='analysis_report.json'):
-        """Genera un reporte completo del análisis"""
-        
-        report = {
-            'analysis_date': datetime.now().isoformat(),
-            'total_files_analyzed': len(self.analysis_results),
-            'individual_file_analysis': self.analysis_results,
-            'cross_file_duplicates': {
-                'total_duplicate_groups': len(self.cross_file_duplicates),
-                'sample_duplicates': dict(list(self.cross_file_duplicates.items())[:10])  # Primeros 10 ejemplos
-            },
-            'summary': self._generate_summary()
+    def _detect_cross_file_duplicates_incremental(self, cache_dir, pending):
+        """
+        Duplicados entre archivos reutilizando los candidatos de la ejecución anterior
+        
+        Los archivos nuevos o modificados se cruzan con todos los demás por
+        sort-merge sobre los arreglos ordenados (mapeados en memoria); los
+        pares entre archivos sin cambios ya están en los candidatos guardados.
+        Luego solo las filas candidatas pasan por find_duplicate_groups, con
+        el mismo resultado que el paso completo.
+        """
+        
+        print(f"\n{'='*80}")
+        print("ANALIZANDO DUPLICADOS ENTRE ARCHIVOS (incremental)")
+        print(f"{'='*80}")
+        
+        file_names = list(self.row_hashes.keys())
+        
+        covered, known = load_cross_file_candidates(cache_dir)
+        covered = set(covered) - set(pending)
+        to_check = [name for name in file_names if name not in covered]
+        if known is None or not covered:
+            known, to_check = None, file_names
+        
+        candidates = cross_file_candidates(self.sorted_hashes, to_check, known)
+        
+        # Filas candidatas, en orden archivo/fila como en el paso completo
+        hashes, rows, file_ids = [], [], []
+        for file_id, name in enumerate(file_names):
+            positions = _candidate_positions(*self.sorted_hashes[name], candidates)
+            hashes.append(np.asarray(self.row_hashes[name][0][positions]))
+            rows.append(np.asarray(self.row_hashes[name][1][positions]).astype(np.int32))
+            file_ids.append(np.full(len(positions), file_id, dtype=np.int16))
+        
+        self.cross_file_duplicates = find_duplicate_groups(
+            file_names,
+            np.concatenate(hashes or [np.zeros(0, dtype=np.uint64)]),
+            np.concatenate(file_ids or [np.zeros(0, dtype=np.int16)]),
+            np.concatenate(rows or [np.zeros(0, dtype=np.int32)]),
+            min_files=2
+        )
+        
+        # Para la próxima ejecución bastan los hashes de los grupos confirmados
+        save_cross_file_candidates(cache_dir, file_names, self.cross_file_duplicates.hashes)
+        
+        print(f"✓ {len(to_check)} archivo(s) cruzados con el resto, {len(candidates)} hashes candidatos")
+        print(f"✓ Se encontraron {len(self.cross_file_duplicates)} registros duplicados entre archivos")
+    
+    def fetch_rows(self, file_name, rows, harmonize=True):
+        """
+        Filas de un archivo por posición, sin volver a leerlo completo
+        
+        Usa el índice de offsets de nac_offsets (se crea la primera vez y
+        queda junto a los CSV), así que revisar un grupo de duplicados o un
+        cluster de casi-duplicados cuesta un seek por fila.
+        
+        Returns:
+            pd.DataFrame: filas en el orden pedido, con índice = posición
+        """
+        return read_row_positions(self.data_directory / file_name, rows, harmonize=harmonize)
+    
+    def fetch_duplicate_group(self, group, harmonize=True):
+        """
+        Filas completas de un grupo de duplicados entre archivos
+        
+        Returns:
+            pd.DataFrame: columnas file y row seguidas de los datos de cada fila
+        """
+        locations = pd.DataFrame(self.cross_file_duplicates.locations(group))
+        parts = []
+        for file_name, members in locations.groupby('file', sort=False):
+            rows = self.fetch_rows(file_name, members['row'].to_numpy(), harmonize=harmonize)
+            rows.insert(0, 'file', file_name)
+            rows.insert(1, 'row', rows.index)
+            parts.append(rows.reset_index(drop=True))
+        return concat_years(parts) if harmonize else pd.concat(parts, ignore_index=True)
+    
+    def generate_report(self, output_file='analysis_report.json', export_json=False, release=False):
+        """
+        Guarda el reporte del análisis
+        
+        El reporte son tablas Parquet de métricas agregadas (nac_report) en
+        <directorio padre>/<output_file sin extensión>/, con una partición por
+        ejecución para consultarlas entre ejecuciones. El JSON completo
+        (output_file) es opcional; se usa también si pyarrow no está instalado.
+        
+        Args:
+            export_json: escribir además el JSON completo
+            release: liberar cada análisis apenas se escribe y los hashes por
+                fila (para el final de una ejecución; el analizador queda vacío)
+        
+        Returns:
+            Path: directorio del reporte Parquet, o el JSON si no hay pyarrow
+        """
+        
+        analysis_date = datetime.now().isoformat()
+        summary = self._generate_summary()
+        cross_file = {
+            'total_duplicate_groups': len(self.cross_file_duplicates),
+            'total_duplicate_rows': self.cross_file_duplicates.total_rows,
+            'sample_duplicates': self.cross_file_duplicates.sample(10)  # Primeros 10 ejemplos
         }
         
-        output_path = self.data_directory.parent / output_file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        if release:
+            # Los hashes por fila solo sirven para el paso entre archivos
+            self.row_hashes.clear()
+            self.sorted_hashes.clear()
+        
+        report_dir = self.data_directory.parent / Path(output_file).stem
+        json_path = self.data_directory.parent / output_file
+        writers = []
+        if parquet_available():
+            writers.append(ReportWriter(report_dir))
+        else:
+            print("⚠️  pyarrow no está instalado: el reporte se guarda solo en JSON")
+            export_json = True
+        if export_json:
+            writers.append(JsonReportWriter(json_path, analysis_date, len(self.analysis_results)))
+        
+        for name in list(self.analysis_results):
+            analysis = self.analysis_results.pop(name) if release else self.analysis_results[name]
+            for writer in writers:
+                writer.update(analysis)
+        
+        for writer in writers:
+            writer.close(analysis_date, summary, cross_file)
+        output_path = report_dir if isinstance(writers[0], ReportWriter) else json_path
         
         print(f"\n{'#'*80}")
         print(f"REPORTE GUARDADO EN: {output_path}")
+        if export_json and output_path != json_path:
+            print(f"JSON COMPLETO: {json_path}")
         print(f"{'#'*80}\n")
         
         return output_path
@@ -383,6 +1130,21 @@ class CSVAnalyzer:
             if result['file_size_mb'] > avg_size * 1.3  # 30% más grande que el promedio
         ]
         
+        # Causas del tamaño: perfil de bytes contra el de los archivos normales
+        suspicious_names = {file_info['file'] for file_info in suspicious_files}
+        reference = [
+            result['byte_profile'] for name, result in self.analysis_results.items()
+            if name not in suspicious_names and 'byte_profile' in result
+        ]
+        for file_info in suspicious_files:
+            profile = self.analysis_results[file_info['file']].get('byte_profile')
+            if profile is None:
+                continue
+            file_info['bytes_per_row'] = profile['bytes_per_row']
+            file_info['line_endings'] = profile['line_endings']['style']
+            file_info['overhead_pct'] = profile['overhead_pct']
+            file_info['size_causes'] = size_causes(profile, reference)
+        
         return {
             'total_records_analyzed': total_rows,
             'total_exact_duplicates': total_duplicates,
@@ -411,6 +1173,12 @@ class CSVAnalyzer:
             print(f"\n🚨 ARCHIVOS SOSPECHOSOS (más grandes de lo normal):")
             for file_info in summary['suspicious_files']:
                 print(f"   - {file_info['file']}: {file_info['size_mb']} MB ({file_info['rows']:,} filas)")
+                if 'bytes_per_row' in file_info:
+                    print(f"     {file_info['bytes_per_row']} bytes/fila, fin de línea {file_info['line_endings']}, "
+                          f"sobrecosto {file_info['overhead_pct']}%")
+                    for cause in file_info['size_causes']:
+                        print(f"     · {cause['cause']}: +{cause['extra_bytes'] / (1024 * 1024):.2f} MB")
+            print("   Normalizar: python analysis/nac_bytes.py resources/03_BI <archivo.csv>")
         
         print(f"\n{'#'*80}\n")
 
@@ -421,17 +1189,23 @@ def main():
     # Configurar el directorio de datos
     data_dir = Path(r"c:\Users\nidok\OneDrive\Documentos\REPOSITORIOS\google_collab_project\resources\03_BI")
     
-    # Crear el analizador
-    analyzer = CSVAnalyzer(data_dir)
+    # Crear el analizador (si solo cambió un archivo, se parsea en paralelo
+    # por rangos de bytes)
+    analyzer = CSVAnalyzer(data_dir, parse_workers=os.cpu_count())
     
-    # Analizar todos los archivos
-    results = analyzer.analyze_all_files()
+    # Analizar todos los archivos (un proceso por núcleo disponible)
+    results = analyzer.analyze_all_files(workers=os.cpu_count())
     
     # Imprimir resumen
     analyzer.print_summary()
     
-    # Generar reporte completo
-    report_path = analyzer.generate_report('csv_analysis_report.json')
+    # Primer grupo de duplicados entre archivos, leído por offsets
+    if analyzer.cross_file_duplicates is not None and len(analyzer.cross_file_duplicates):
+        print("🔎 Ejemplo de duplicado entre archivos:")
+        print(analyzer.fetch_duplicate_group(0).to_string(index=False))
+    
+    # Generar reporte (tablas Parquet; export_json=True agrega el JSON completo)
+    report_path = analyzer.generate_report('csv_analysis_report.json', release=True)
     
     print(f"✅ Análisis completado exitosamente!")
     print(f"📄 Reporte detallado: {report_path}")
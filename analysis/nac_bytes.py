@@ -0,0 +1,481 @@
+"""
+Perfil de bytes de los NAC_*.csv
+Bytes promedio por campo y columna, comillas, espacios de relleno, ceros
+sobrantes y estilo de fin de línea, calculados con NumPy sobre el archivo
+mapeado en memoria; y reescritura normalizada de los archivos con sobrecosto
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from nac_io import candidate_read_configs, read_nac_csv
+from nac_offsets import header_columns, load_row_offsets, row_count
+
+# Filas por bloque: acota la memoria de los arreglos por campo
+BLOCK_ROWS = 200_000
+
+UTF8_BOM = b'\xef\xbb\xbf'
+
+# Directorio (dentro del de datos) para los archivos reescritos
+NORMALIZED_DIRNAME = 'normalized'
+
+# Sobrecostos medidos, en el orden del reporte. La reescritura los elimina
+# todos salvo los ceros a la izquierda, que pueden ser parte de un código
+OVERHEAD_KEYS = ['quotes', 'padding', 'leading_zeros', 'zero_decimals', 'carriage_returns', 'bom']
+
+
+def _line_endings(data):
+    """Cantidad de fines de línea LF, CRLF y CR solo, y el estilo del archivo"""
+    lf = np.flatnonzero(data == ord('\n'))
+    crlf = int(np.count_nonzero(data[lf[lf > 0] - 1] == ord('\r')))
+    cr = int(np.count_nonzero(data == ord('\r'))) - crlf
+    counts = {'lf': len(lf) - crlf, 'crlf': crlf, 'cr': cr}
+    
+    used = [name for name, count in counts.items() if count]
+    counts['style'] = used[0].upper() if len(used) == 1 else 'mixed' if used else 'none'
+    return counts
+
+
+def _field_bounds(data, starts, ends, sep, n_cols):
+    """
+    Inicio y fin (sin separador ni fin de línea) de cada campo de las filas
+    
+    Solo se consideran las filas con exactamente n_cols - 1 separadores; las
+    demás (separadores dentro de comillas, filas truncadas) se cuentan aparte.
+    
+    Returns:
+        tuple: (inicios, fines) de forma (filas regulares, n_cols) y la
+            cantidad de filas irregulares
+    """
+    # Fin del contenido: el primer '\n' o '\r' de la fila (después pueden
+    # venir líneas en blanco, que el índice de offsets deja dentro de la fila)
+    lo, hi = int(starts[0]), int(ends[-1])
+    breaks = np.append(np.flatnonzero((data[lo:hi] == ord('\n')) | (data[lo:hi] == ord('\r'))) + lo, hi)
+    content_end = np.minimum(breaks[np.searchsorted(breaks, starts)], ends)
+    
+    seps = np.flatnonzero(data[lo:hi] == ord(sep)) + lo
+    line = np.searchsorted(starts, seps, side='right') - 1
+    seps, line = seps[seps < content_end[line]], line[seps < content_end[line]]
+    
+    regular = np.bincount(line, minlength=len(starts)) == n_cols - 1
+    seps = seps[regular[line]].reshape(-1, n_cols - 1)
+    
+    field_start = np.column_stack([starts[regular], seps + 1])
+    field_end = np.column_stack([seps, content_end[regular]])
+    return field_start, field_end, int(np.count_nonzero(~regular))
+
+
+# Máximo de bytes en la matriz de campos candidatos de _candidate_overheads
+MATRIX_BYTES = 16 * 1024 * 1024
+
+
+def _candidate_overheads(data, field_start, field_end, sep):
+    """
+    Sobrecostos de campos sueltos, sobre una matriz campo x byte
+    
+    Contenido = bytes que no son espacio, tab ni comilla. Relleno = espacios
+    antes o después del contenido; ceros a la izquierda = ceros iniciales de
+    campos solo numéricos ("0032" -> 2 bytes); decimales cero = ".0", ".00"
+    al final de un número entero.
+    
+    Returns:
+        dict: arreglos con el valor de cada campo
+    """
+    width = int((field_end - field_start).max())
+    cols = np.arange(width)
+    index = field_start[:, None] + cols
+    inside = index < field_end[:, None]
+    m = np.where(inside, data[np.minimum(index, len(data) - 1)], 0)
+    
+    is_space = (m == ord(' ')) | (m == ord('\t'))
+    is_quote = m == ord('"')
+    is_digit = (m >= ord('0')) & (m <= ord('9'))
+    is_decimal = (m == ord('.')) | ((m == ord(',')) if sep != ',' else False)
+    content = inside & ~is_space & ~is_quote
+    
+    has_content = content.any(axis=1)
+    first = np.argmax(content, axis=1)
+    last = width - 1 - np.argmax(content[:, ::-1], axis=1)
+    within = (cols >= first[:, None]) & (cols <= last[:, None])
+    span = last - first + 1
+    
+    padding = is_space.sum(axis=1) - np.where(has_content, (is_space & within).sum(axis=1), 0)
+    
+    # "1234.0": dígitos, un separador decimal y solo ceros después
+    decimal_at = is_decimal & within & (cols > first[:, None])
+    has_decimal = decimal_at.any(axis=1)
+    decimal = np.where(has_decimal, np.argmax(decimal_at, axis=1), last + 1)
+    before = (cols >= first[:, None]) & (cols < decimal[:, None])
+    after = (cols > decimal[:, None]) & within
+    integer_digits = (is_digit & before).sum(axis=1) == decimal - first
+    zero_decimal = (
+        has_content & has_decimal & integer_digits
+        & (((m == ord('0')) & after).sum(axis=1) == last - decimal)
+    )
+    
+    # Ceros a la izquierda de números ("0032", "0001.5"), dejando al menos
+    # un dígito antes del separador decimal
+    numeric = has_content & integer_digits & ((is_digit & after).sum(axis=1) == np.maximum(last - decimal, 0))
+    nonzero = content & (m != ord('0')) & (cols >= first[:, None])
+    first_nonzero = np.where(nonzero.any(axis=1), np.argmax(nonzero, axis=1), width)
+    leading_zeros = np.where(numeric, np.minimum(first_nonzero, decimal - 1) - first, 0)
+    
+    return {
+        'quotes': is_quote.sum(axis=1),
+        'padding': padding,
+        'leading_zeros': leading_zeros,
+        'zero_decimals': np.where(zero_decimal, last - decimal + 1, 0),
+        'empty_fields': ~has_content,
+    }
+
+
+def _block_overheads(data, field_start, field_end, sep):
+    """
+    Bytes por campo y sobrecostos de un bloque de filas
+    
+    La mayoría de los campos no tiene sobrecosto: solo los que contienen
+    espacio, tab, comilla o separador decimal, o empiezan con '0', pasan por
+    _candidate_overheads.
+    
+    Returns:
+        dict: arreglos (n_cols,) con las sumas por columna
+    """
+    n_cols = field_start.shape[1]
+    starts, ends = field_start.ravel(), field_end.ravel()
+    lo, hi = int(starts[0]), int(ends[-1])
+    chunk = data[lo:hi]
+    
+    special = (chunk == ord(' ')) | (chunk == ord('\t')) | (chunk == ord('"')) | (chunk == ord('.'))
+    if sep != ',':
+        special |= chunk == ord(',')
+    
+    # Entre el inicio de un campo y el del siguiente solo hay el campo y un
+    # separador o fin de línea, que no son bytes especiales. Un byte extra al
+    # final: un último campo vacío al cierre del archivo empieza en hi
+    special = np.append(special, False)
+    special_count = np.add.reduceat(special.astype(np.int32), starts - lo)
+    lengths = ends - starts
+    zero_first = (lengths > 1) & (data[np.minimum(starts, len(data) - 1)] == ord('0'))
+    candidates = np.flatnonzero(((special_count > 0) & (lengths > 0)) | zero_first)
+    
+    totals = {
+        'bytes': lengths.reshape(-1, n_cols).sum(axis=0),
+        'quotes': np.zeros(n_cols, dtype=np.int64),
+        'padding': np.zeros(n_cols, dtype=np.int64),
+        'leading_zeros': np.zeros(n_cols, dtype=np.int64),
+        'zero_decimals': np.zeros(n_cols, dtype=np.int64),
+        'empty_fields': np.bincount(np.flatnonzero(lengths == 0) % n_cols, minlength=n_cols),
+    }
+    if not len(candidates):
+        return totals
+    
+    # Lotes para acotar la matriz campo x byte
+    batch = max(MATRIX_BYTES // max(int(lengths[candidates].max()), 1), 1)
+    for i in range(0, len(candidates), batch):
+        chosen = candidates[i:i + batch]
+        column = chosen % n_cols
+        for key, values in _candidate_overheads(data, starts[chosen], ends[chosen], sep).items():
+            totals[key] += np.bincount(column, weights=values, minlength=n_cols).astype(np.int64)
+    return totals
+
+
+def profile_bytes(csv_path, config=None):
+    """
+    Perfil de bytes de un NAC_*.csv
+    
+    Explica el tamaño de un archivo con una cantidad de filas similar a la
+    de otros años: bytes promedio por campo de cada columna, y bytes que
+    sobran (comillas, espacios de relleno, ceros a la izquierda, decimales
+    ".0", '\\r' de CRLF, BOM).
+    
+    Args:
+        config: configuración de lectura (sep, encoding); si falta se detecta
+    
+    Returns:
+        dict: tamaño, filas, bytes por fila, fin de línea, BOM, filas
+            irregulares, métricas por columna y sobrecosto total con el
+            tamaño estimado del archivo normalizado
+    """
+    csv_path = Path(csv_path)
+    if config is None:
+        _, _, config = candidate_read_configs(csv_path)
+    sep = config['sep']
+    
+    offsets = load_row_offsets(csv_path)
+    n_rows = row_count(offsets)
+    size = int(offsets[-1])
+    
+    if size == 0:
+        raise ValueError(f"{csv_path.name} está vacío")
+    
+    # np.memmap: el mapeo se libera con el arreglo, también si hay una excepción
+    data = np.memmap(csv_path, dtype=np.uint8, mode='r')
+    columns = header_columns(bytes(data[:int(offsets[1])]), config)
+    has_bom = bytes(data[:3]) == UTF8_BOM
+    line_endings = _line_endings(data)
+    
+    totals = {key: np.zeros(len(columns), dtype=np.int64) for key in
+              ['bytes', 'quotes', 'padding', 'leading_zeros', 'zero_decimals', 'empty_fields']}
+    regular_rows, irregular_rows = 0, 0
+    for start in range(0, n_rows, BLOCK_ROWS):
+        stop = min(start + BLOCK_ROWS, n_rows)
+        starts = np.asarray(offsets[start + 1:stop + 1], dtype=np.int64)
+        ends = np.asarray(offsets[start + 2:stop + 2], dtype=np.int64)
+        field_start, field_end, irregular = _field_bounds(data, starts, ends, sep, len(columns))
+        irregular_rows += irregular
+        regular_rows += len(field_start)
+        if len(field_start):
+            for key, values in _block_overheads(data, field_start, field_end, sep).items():
+                totals[key] += values
+    
+    per_field = lambda key, i: round(float(totals[key][i]) / regular_rows, 3) if regular_rows else 0.0
+    column_profile = {
+        col: {
+            'bytes_per_field': per_field('bytes', i),
+            'content_bytes_per_field': round(float(
+                totals['bytes'][i] - sum(totals[key][i] for key in ['quotes', 'padding', 'leading_zeros', 'zero_decimals'])
+            ) / regular_rows, 3) if regular_rows else 0.0,
+            'quote_bytes': int(totals['quotes'][i]),
+            'padding_bytes': int(totals['padding'][i]),
+            'leading_zero_bytes': int(totals['leading_zeros'][i]),
+            'zero_decimal_bytes': int(totals['zero_decimals'][i]),
+            'empty_fields': int(totals['empty_fields'][i]),
+        }
+        for i, col in enumerate(columns)
+    }
+    
+    overhead = {
+        'quotes': int(totals['quotes'].sum()),
+        'padding': int(totals['padding'].sum()),
+        'leading_zeros': int(totals['leading_zeros'].sum()),
+        'zero_decimals': int(totals['zero_decimals'].sum()),
+        'carriage_returns': line_endings['crlf'],
+        'bom': len(UTF8_BOM) if has_bom else 0,
+    }
+    overhead_total = sum(overhead.values())
+    
+    return {
+        'file': csv_path.name,
+        'size_bytes': size,
+        'rows': n_rows,
+        'bytes_per_row': round(size / n_rows, 2) if n_rows else 0.0,
+        'line_endings': line_endings,
+        'bom': has_bom,
+        'irregular_rows': irregular_rows,
+        'columns': column_profile,
+        'overhead_bytes': overhead,
+        'overhead_pct': round(overhead_total / size * 100, 2) if size else 0.0,
+        'normalized_size_estimate': size - overhead_total + overhead['leading_zeros'],
+    }
+
+
+def byte_profile_table(profiles):
+    """
+    Bytes por campo de cada columna y archivo, para comparar años
+    
+    Returns:
+        pd.DataFrame: filas = archivo, columnas = columna del CSV
+    """
+    return pd.DataFrame({
+        profile['file']: {col: stats['bytes_per_field'] for col, stats in profile['columns'].items()}
+        for profile in profiles
+    }).T
+
+
+def size_causes(profile, reference_profiles, top=5):
+    """
+    Por qué un archivo es más grande que los de referencia
+    
+    Compara el sobrecosto de cada tipo (comillas, relleno, ...) con el de
+    los archivos de referencia, y los bytes de contenido por campo de cada
+    columna (sin sobrecosto, p. ej. códigos escritos como texto) con la
+    mediana de los archivos que tienen esa columna.
+    
+    Returns:
+        list: hasta top causas {'cause', 'extra_bytes'}, de mayor a menor
+    """
+    rows = profile['rows']
+    causes = []
+    
+    for key in OVERHEAD_KEYS:
+        reference = [p['overhead_bytes'][key] / p['rows'] for p in reference_profiles if p['rows']]
+        extra = profile['overhead_bytes'][key] - (float(np.median(reference)) if reference else 0.0) * rows
+        if extra > 0:
+            causes.append({'cause': f"sobrecosto {key}", 'extra_bytes': int(extra)})
+    
+    for col, stats in profile['columns'].items():
+        reference = [p['columns'][col]['content_bytes_per_field'] for p in reference_profiles if col in p['columns']]
+        if not reference:
+            continue
+        baseline = float(np.median(reference))
+        extra = (stats['content_bytes_per_field'] - baseline) * rows
+        if extra > 0:
+            causes.append({
+                'cause': f"contenido de {col} ({stats['content_bytes_per_field']} vs {baseline:.2f} bytes/campo)",
+                'extra_bytes': int(extra)
+            })
+    
+    return sorted(causes, key=lambda cause: -cause['extra_bytes'])[:top]
+
+
+# Número con ceros a la izquierda ("01101", "007.5"): se trata como código
+ZERO_PADDED = r'^[+-]?0\d'
+
+
+def read_raw_csv(csv_path, workers=1):
+    """
+    Texto de cada campo tal como está en el archivo (sin comillas)
+    
+    Sin inferencia de tipos ni valores nulos: '01101' sigue siendo '01101'
+    y un campo vacío es ''.
+    
+    Returns:
+        tuple: (DataFrame de strings, configuración usada)
+    """
+    return read_nac_csv(csv_path, workers=workers, dtype=str, keep_default_na=False)
+
+
+def normalize_frame(df):
+    """
+    Valores sin relleno ni ceros sobrantes, con el mismo significado
+    
+    Recibe el texto de read_raw_csv y devuelve texto: sin espacios alrededor
+    y, en las columnas donde todos los valores son números enteros ("3200.0",
+    "+5"), con su forma entera ("3200", "5"). Una columna con algún valor
+    con ceros a la izquierda es un código y solo se le quitan los espacios.
+    """
+    df = df.rename(columns=lambda col: col.strip())
+    for col in df.columns:
+        text = df[col].astype(str).str.strip()
+        filled = text[text != '']
+        numeric = pd.to_numeric(filled, errors='coerce')
+        if (
+            len(filled) and numeric.notna().all() and np.isfinite(numeric).all()
+            and not filled.str.contains(ZERO_PADDED).any()
+            and (numeric == np.round(numeric)).all()
+        ):
+            text = text.where(text == '', pd.to_numeric(text.where(text != ''), errors='coerce')
+                              .astype('Int64').astype(str))
+        df[col] = text
+    return df
+
+
+def _same_values(raw, written):
+    """
+    Compara el archivo escrito con el texto original, campo a campo
+    
+    Un campo coincide si su texto sin espacios alrededor es igual, o si ambos
+    son el mismo número y el original no tiene ceros a la izquierda (así
+    "3200.0" -> "3200" pasa, pero "01101" -> "1101" no).
+    """
+    if [col.strip() for col in raw.columns] != list(written.columns) or len(raw) != len(written):
+        return False
+    for col_raw, col in zip(raw.columns, written.columns):
+        before = raw[col_raw].astype(str).str.strip().reset_index(drop=True)
+        after = written[col].astype(str).reset_index(drop=True)
+        differs = before != after
+        if not differs.any():
+            continue
+        before, after = before[differs], after[differs]
+        a, b = pd.to_numeric(before, errors='coerce'), pd.to_numeric(after, errors='coerce')
+        if a.isna().any() or b.isna().any() or (a != b).any() or before.str.contains(ZERO_PADDED).any():
+            return False
+    return True
+
+
+def normalize_csv(csv_path, output_path=None, replace=False, workers=1):
+    """
+    Reescribe un NAC_*.csv sin sobrecosto de bytes
+    
+    Mismo separador y encoding que el original, fin de línea LF, sin BOM,
+    sin comillas innecesarias y con los valores de normalize_frame. El
+    archivo escrito se vuelve a leer como texto y se compara campo a campo
+    con el texto del original (_same_values); solo si coincide se puede
+    reemplazar el original.
+    
+    Args:
+        output_path: destino; por defecto <datos>/normalized/<nombre>
+        replace: reemplazar el original por la versión normalizada (el
+            original queda en <datos>/normalized/<nombre>.orig)
+        workers: procesos para parsear el original (read_nac_csv)
+    
+    Returns:
+        dict: tamaños antes y después, ruta escrita y resultado de la verificación
+    """
+    csv_path = Path(csv_path)
+    normalized_dir = csv_path.parent / NORMALIZED_DIRNAME
+    output_path = Path(output_path) if output_path else normalized_dir / csv_path.name
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    raw, config = read_raw_csv(csv_path, workers=workers)
+    encoding = 'utf-8' if config['encoding'] in ('utf-8-sig', 'utf_8_sig') else config['encoding']
+    normalize_frame(raw.copy()).to_csv(output_path, sep=config['sep'], encoding=encoding, index=False, lineterminator='\n')
+    
+    # Se compara contra el texto original, no contra otra normalización
+    written = pd.read_csv(output_path, sep=config['sep'], encoding=encoding, dtype=str, keep_default_na=False)
+    verified = _same_values(raw, written)
+    
+    result = {
+        'file': csv_path.name,
+        'size_before': csv_path.stat().st_size,
+        'size_after': output_path.stat().st_size,
+        'output': str(output_path),
+        'verified': verified,
+    }
+    
+    if not verified:
+        print(f"⚠️  {csv_path.name}: la versión normalizada no coincide con el original, no se reemplaza")
+    elif replace:
+        backup = normalized_dir / f"{csv_path.name}.orig"
+        normalized_dir.mkdir(exist_ok=True)
+        os.replace(csv_path, backup)
+        os.replace(output_path, csv_path)
+        result['output'] = str(csv_path)
+        result['backup'] = str(backup)
+    
+    return result
+
+
+def print_byte_profile(profile):
+    """Resumen de un perfil en consola"""
+    mb = lambda n: n / (1024 * 1024)
+    print(f"\n📄 {profile['file']}: {mb(profile['size_bytes']):.2f} MB, {profile['rows']:,} filas, "
+          f"{profile['bytes_per_row']} bytes/fila")
+    endings = profile['line_endings']
+    print(f"   Fin de línea: {endings['style']} (LF {endings['lf']:,}, CRLF {endings['crlf']:,}, CR {endings['cr']:,})"
+          f"{' · BOM' if profile['bom'] else ''}")
+    if profile['irregular_rows']:
+        print(f"   ⚠️  Filas irregulares (otra cantidad de separadores): {profile['irregular_rows']:,}")
+    print(f"   Sobrecosto: {profile['overhead_pct']}% -> ~{mb(profile['normalized_size_estimate']):.2f} MB normalizado")
+    for key in OVERHEAD_KEYS:
+        if profile['overhead_bytes'][key]:
+            print(f"     - {key}: {mb(profile['overhead_bytes'][key]):.2f} MB")
+
+
+def main():
+    """
+    Uso: python analysis/nac_bytes.py [directorio] [NAC_2009.csv NAC_2014.csv ...]
+    
+    Perfila todos los archivos y escribe en <directorio>/normalized/ la
+    versión normalizada de los archivos indicados.
+    """
+    import sys
+    data_dir = Path(sys.argv[1] if len(sys.argv) > 1 else 'resources/03_BI')
+    
+    profiles = [profile_bytes(csv_file) for csv_file in sorted(data_dir.glob('NAC_*.csv'))]
+    for profile in profiles:
+        print_byte_profile(profile)
+    
+    print("\nBytes por campo (archivo x columna):")
+    print(byte_profile_table(profiles).to_string())
+    
+    for name in sys.argv[2:]:
+        result = normalize_csv(data_dir / name, workers=os.cpu_count())
+        print(f"\n✓ {name}: {result['size_before'] / 1024**2:.2f} MB -> {result['size_after'] / 1024**2:.2f} MB "
+              f"({'verificado' if result['verified'] else 'NO verificado'}) en {result['output']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Caché columnar del corpus NAC (1990-2017)
+Ingesta única de los CSV a Parquet tipado, un archivo por año, con fallback a CSV
+"""
+
+import pandas as pd
+from pathlib import Path
+import json
+import sys
+
+from nac_io import file_fingerprint, load_read_config_manifest, read_nac_csv
+from nac_schema import (
+    CANONICAL_DTYPES,
+    canonical_name,
+    cast_canonical,
+    harmonize_columns,
+    reader_dtypes,
+)
+
+# Directorio de la caché, dentro del directorio de datos
+CACHE_DIRNAME = '_columnar_cache'
+CACHE_MANIFEST = 'manifest.json'
+
+
+def parquet_available():
+    """La caché requiere pyarrow (incluido por defecto en Google Colab)"""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def cache_directory(data_directory):
+    return Path(data_directory) / CACHE_DIRNAME
+
+
+def load_cache_manifest(data_directory):
+    """Manifiesto de la caché: por archivo, huella del CSV fuente y metadatos"""
+    try:
+        with open(cache_directory(data_directory) / CACHE_MANIFEST, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache_manifest(data_directory, manifest):
+    with open(cache_directory(data_directory) / CACHE_MANIFEST, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def _typed_column(name, series):
+    """Tipo compacto de una columna: dtype canónico, enteros reducidos, float32 y strings"""
+    if canonical_name(name) in CANONICAL_DTYPES:
+        return cast_canonical(series, CANONICAL_DTYPES[canonical_name(name)])
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(series):
+        return pd.to_numeric(series, downcast='float')
+    if series.dtype == object:
+        return series.astype('string')
+    return series
+
+
+def _restores(typed, series):
+    """El tipo compacto vuelve exactamente a los valores y dtype originales"""
+    try:
+        restored = typed.astype(series.dtype)
+    except (ValueError, TypeError, OverflowError):
+        return False
+    return restored.dtype == series.dtype and restored.equals(series)
+
+
+def _typed_frame(df):
+    """
+    Tipos compactos para la caché, solo donde la conversión no pierde nada
+    
+    Una columna queda con su dtype original si el compacto no vuelve a los
+    mismos valores (decimales que float32 redondea, texto que no es número
+    en una columna entera, ...), así la caché se puede leer con los mismos
+    valores que pd.read_csv.
+    """
+    for col in df.columns:
+        series = df[col]
+        typed = _typed_column(col, series)
+        if typed is not series and _restores(typed, series):
+            df[col] = typed
+    return df
+
+
+def fresh_cache_entry(csv_path, manifest=None):
+    """
+    Entrada de la caché para el CSV si está vigente
+    
+    Returns:
+        dict o None: None si no hay caché, falta el Parquet o el CSV cambió
+    """
+    csv_path = Path(csv_path)
+    if manifest is None:
+        manifest = load_cache_manifest(csv_path.parent)
+    
+    entry = manifest.get(csv_path.name)
+    # Entradas sin plain_dtypes son de una versión anterior de la caché
+    if not entry or 'plain_dtypes' not in entry or not parquet_available():
+        return None
+    if entry.get('fingerprint') != file_fingerprint(csv_path):
+        return None
+    if not (cache_directory(csv_path.parent) / entry['cache_file']).exists():
+        return None
+    return entry
+
+
+def read_cached_file(csv_path, entry, usecols=None, nrows=None, plain=False):
+    """
+    Lee el Parquet de un año, solo con las columnas pedidas
+    
+    Args:
+        plain: devolver cada columna con el dtype que da pd.read_csv sobre el
+            CSV (mismos valores, hashes y métricas que leer el archivo)
+    """
+    csv_path = Path(csv_path)
+    columns = entry['columns']
+    
+    if callable(usecols):
+        columns = [col for col in columns if usecols(col)]
+    elif usecols is not None:
+        columns = [col for col in columns if col in set(usecols)]
+    
+    df = pd.read_parquet(cache_directory(csv_path.parent) / entry['cache_file'], columns=columns)
+    if nrows is not None:
+        df = df.head(nrows)
+    if plain:
+        df = df.astype({col: entry['plain_dtypes'][col] for col in df.columns})
+    return df
+
+
+def read_nac_file(csv_path, usecols=None, nrows=None, manifest=None, harmonize=False, workers=1):
+    """
+    Lee un año desde la caché columnar si está vigente, si no desde el CSV
+    
+    Args:
+        csv_path: ruta al NAC_*.csv
+        usecols: lista de columnas o función, igual que en pd.read_csv
+        nrows: leer solo las primeras filas
+        harmonize: aplicar el esquema canónico (nac_schema) al leer; en ese
+            caso usecols se refiere a los nombres canónicos
+        workers: procesos para parsear el CSV por rangos de bytes cuando no
+            hay caché vigente (ver read_nac_csv)
+    
+    Returns:
+        pd.DataFrame
+    """
+    if harmonize and usecols is not None:
+        wanted = usecols if callable(usecols) else set(usecols).__contains__
+        usecols = lambda col: wanted(canonical_name(col))
+    
+    entry = fresh_cache_entry(csv_path, manifest)
+    if entry is not None:
+        df = read_cached_file(csv_path, entry, usecols=usecols, nrows=nrows)
+    elif harmonize:
+        # dtypes compactos directamente en el parser
+        df, _ = read_nac_csv(csv_path, usecols=usecols, nrows=nrows, dtype=reader_dtypes(), workers=workers)
+    else:
+        df, _ = read_nac_csv(csv_path, usecols=usecols, nrows=nrows, workers=workers)
+    
+    return harmonize_columns(df) if harmonize else df
+
+
+def ingest_file(csv_path, read_config_manifest=None):
+    """
+    Parsea un CSV una vez y lo guarda tipado en la caché
+    
+    Se parsea con los tipos por defecto de pd.read_csv y se guardan esos
+    dtypes (plain_dtypes), para poder devolver la caché igual que el CSV.
+    
+    Returns:
+        dict: Entrada del manifiesto para el archivo
+    """
+    csv_path = Path(csv_path)
+    cache_dir = cache_directory(csv_path.parent)
+    cache_dir.mkdir(exist_ok=True)
+    
+    fingerprint = file_fingerprint(csv_path)
+    df, read_config = read_nac_csv(csv_path, manifest=read_config_manifest)
+    plain_dtypes = {col: str(dtype) for col, dtype in df.dtypes.items()}
+    df = _typed_frame(df)
+    
+    cache_file = csv_path.with_suffix('.parquet').name
+    df.to_parquet(cache_dir / cache_file, index=False)
+    
+    return {
+        'fingerprint': fingerprint,
+        'read_config': read_config,
+        'cache_file': cache_file,
+        'columns': list(df.columns),
+        'plain_dtypes': plain_dtypes,
+        'rows': len(df)
+    }
+
+
+def build_cache(data_directory, force=False):
+    """
+    Ingesta única de todos los NAC_*.csv a la caché columnar
+    
+    Solo se vuelven a procesar los archivos nuevos o modificados
+    (tamaño o mtime distintos a los registrados).
+    
+    Returns:
+        dict: Manifiesto actualizado
+    """
+    data_directory = Path(data_directory)
+    
+    if not parquet_available():
+        print("⚠️  pyarrow no está instalado: se seguirá leyendo desde CSV")
+        return {}
+    
+    manifest = load_cache_manifest(data_directory)
+    read_config_manifest = load_read_config_manifest(data_directory)
+    csv_files = sorted(data_directory.glob('NAC_*.csv'))
+    
+    print(f"🗃️  Caché columnar: {cache_directory(data_directory)}")
+    
+    for csv_file in csv_files:
+        if not force and fresh_cache_entry(csv_file, manifest) is not None:
+            print(f"✓ {csv_file.name}: vigente")
+            continue
+        
+        try:
+            manifest[csv_file.name] = ingest_file(csv_file, read_config_manifest)
+            print(f"✓ {csv_file.name}: {manifest[csv_file.name]['rows']:,} registros guardados")
+        except Exception as e:
+            print(f"✗ Error en {csv_file.name}: {e}")
+    
+    # Quitar entradas de archivos que ya no existen
+    existing = {csv_file.name for csv_file in csv_files}
+    for name in [name for name in manifest if name not in existing]:
+        (cache_directory(data_directory) / manifest[name]['cache_file']).unlink(missing_ok=True)
+        del manifest[name]
+    
+    _save_cache_manifest(data_directory, manifest)
+    return manifest
+
+
+if __name__ == "__main__":
+    build_cache(sys.argv[1] if len(sys.argv) > 1 else 'resources/03_BI')
@@ -0,0 +1,113 @@
+"""
+Validación de fechas de nacimiento NAC
+Días por mes según año bisiesto y fecha como ordinal int32 (días desde
+1970-01-01), calculados sobre arreglos completos sin construir strings
+"""
+
+import numpy as np
+import pandas as pd
+
+# Días por mes: fila 0 = año común, fila 1 = bisiesto (índice 0 sin uso)
+DAYS_IN_MONTH = np.array([
+    [0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31],
+    [0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31],
+])
+
+# Columna con la fecha como ordinal: mismo origen que datetime64[D], así que
+# df[ORDINAL_COLUMN].to_numpy().astype('datetime64[D]') da la fecha
+ORDINAL_COLUMN = 'FECHA_ORD'
+
+
+def _as_float(values):
+    """Serie o arreglo como float64 con NaN para los nulos"""
+    if isinstance(values, pd.Series):
+        if not pd.api.types.is_numeric_dtype(values):
+            values = pd.to_numeric(values, errors='coerce')
+        return values.to_numpy(dtype='float64', na_value=np.nan)
+    return np.asarray(values, dtype='float64')
+
+
+def is_leap(years):
+    years = np.asarray(years)
+    return (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+
+
+def valid_date_mask(years, months, days):
+    """
+    Fechas que existen en el calendario
+    
+    Con año nulo se valida solo mes y día, aceptando el 29-02.
+    
+    Returns:
+        np.ndarray: booleano, False para 30-02, 31-04, 29-02 de año común,
+            valores fuera de rango, decimales o nulos en mes/día
+    """
+    years, months, days = _as_float(years), _as_float(months), _as_float(days)
+    
+    valid_month = (months >= 1) & (months <= 12) & (months == np.round(months))
+    leap = np.where(np.isnan(years), True, is_leap(np.nan_to_num(years).astype(np.int64)))
+    max_days = DAYS_IN_MONTH[leap.astype(np.int64), np.where(valid_month, months, 0).astype(np.int64)]
+    
+    return valid_month & (days >= 1) & (days <= max_days) & (days == np.round(days))
+
+
+def date_ordinal(years, months, days):
+    """
+    Fecha como días desde 1970-01-01
+    
+    Returns:
+        tuple: (ordinal int32, máscara de fechas válidas con año conocido);
+            el ordinal de las filas no válidas es 0 y no debe usarse
+    """
+    years, months, days = _as_float(years), _as_float(months), _as_float(days)
+    valid = valid_date_mask(years, months, days) & ~np.isnan(years)
+    
+    # Mes desde 1970-01 -> primer día de ese mes -> más (día - 1)
+    month_index = np.where(valid, (years - 1970) * 12 + months - 1, 0).astype(np.int64)
+    first_day = month_index.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+    ordinal = first_day + np.where(valid, days - 1, 0).astype(np.int64)
+    
+    return np.where(valid, ordinal, 0).astype(np.int32), valid
+
+
+def add_date_ordinal(df, column=ORDINAL_COLUMN):
+    """
+    Agrega la columna ordinal (Int32, nula si la fecha no es válida)
+    
+    Se calcula una vez al cargar; los pasos siguientes (día del año, día de
+    la semana, estacionalidad) la reutilizan.
+    """
+    if not all(col in df.columns for col in ['ANO_NAC', 'MES_NAC', 'DIA_NAC']):
+        return df
+    ordinal, valid = date_ordinal(df['ANO_NAC'], df['MES_NAC'], df['DIA_NAC'])
+    df[column] = pd.arrays.IntegerArray(ordinal, ~valid)
+    return df
+
+
+def ordinal_parts(ordinal):
+    """
+    Año, mes y día de un arreglo de ordinales (sin nulos)
+    
+    Returns:
+        tuple: tres arreglos int64
+    """
+    dates = np.asarray(ordinal, dtype=np.int64).astype('datetime64[D]')
+    months = dates.astype('datetime64[M]')
+    years = dates.astype('datetime64[Y]')
+    return (
+        years.astype(np.int64) + 1970,
+        (months - years.astype('datetime64[M]')).astype(np.int64) + 1,
+        (dates - months.astype('datetime64[D]')).astype(np.int64) + 1
+    )
+
+
+def day_of_year(ordinal):
+    """Día del año (1-366) de cada ordinal"""
+    dates = np.asarray(ordinal, dtype=np.int64).astype('datetime64[D]')
+    return (dates - dates.astype('datetime64[Y]').astype('datetime64[D]')).astype(np.int64) + 1
+
+
+def weekday(ordinal):
+    """Día de la semana de cada ordinal (0 = lunes, 6 = domingo)"""
+    # 1970-01-01 fue jueves
+    return (np.asarray(ordinal, dtype=np.int64) + 3) % 7
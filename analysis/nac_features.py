@@ -0,0 +1,59 @@
+"""
+Variables derivadas del corpus NAC
+Clasificación por tramos vectorizada (pd.cut) con límites configurables
+"""
+
+import numpy as np
+import pandas as pd
+
+# Tramos: (límites, etiquetas). Cada tramo incluye su límite inferior y
+# excluye el superior: [37, 42) = 37 a 41 semanas.
+GESTATIONAL_BINS = (
+    [-np.inf, 37, 42, np.inf],
+    ['Prematuro', 'A término', 'Postérmino']
+)
+
+# Clasificación OMS del peso al nacer (gramos)
+BIRTH_WEIGHT_BINS = (
+    [-np.inf, 1500, 2500, 4000, np.inf],
+    ['Muy bajo peso', 'Bajo peso', 'Normal', 'Macrosómico']
+)
+
+MATERNAL_AGE_BINS = (
+    [-np.inf, 20, 35, np.inf],
+    ['Menor de 20', '20 a 34', '35 o más']
+)
+
+
+def bin_column(series, edges, labels):
+    """
+    Clasifica una columna numérica en tramos
+    
+    Args:
+        series: columna numérica (admite enteros nullable; los nulos quedan nulos)
+        edges: límites crecientes, len(labels) + 1 valores
+        labels: nombre de cada tramo
+    
+    Returns:
+        pd.Series: categórica ordenada con categorías labels
+    """
+    if len(edges) != len(labels) + 1:
+        raise ValueError("Se requieren len(labels) + 1 límites")
+    
+    values = pd.to_numeric(series, errors='coerce').astype('float64')
+    return pd.cut(values, bins=edges, labels=labels, right=False, ordered=True)
+
+
+def gestational_category(weeks, bins=GESTATIONAL_BINS):
+    """Prematuro (< 37), A término (37-41) y Postérmino (>= 42 semanas)"""
+    return bin_column(weeks, *bins)
+
+
+def birth_weight_category(weight, bins=BIRTH_WEIGHT_BINS):
+    """Muy bajo peso (< 1500 g), Bajo peso (< 2500 g), Normal y Macrosómico (>= 4000 g)"""
+    return bin_column(weight, *bins)
+
+
+def maternal_age_band(age, bins=MATERNAL_AGE_BINS):
+    """Edad de la madre en tramos: menor de 20, 20 a 34 y 35 o más"""
+    return bin_column(age, *bins)
@@ -0,0 +1,141 @@
+"""
+Lectura de archivos NAC_*.csv
+Detección de encoding/separador y manifiesto con la configuración que funcionó por archivo
+"""
+
+from pathlib import Path
+import json
+
+# Configuraciones de lectura a probar, en orden, si el sniffing falla
+READ_CONFIGS = [
+    {'sep': ';', 'encoding': 'utf-8', 'quotechar': '"'},
+    {'sep': ';', 'encoding': 'latin-1', 'quotechar': '"'},
+    {'sep': ';', 'encoding': 'iso-8859-1', 'quotechar': '"'},
+    {'sep': ',', 'encoding': 'utf-8', 'quotechar': '"'},
+    {'sep': ';', 'encoding': 'utf-8', 'quoting': 3},  # QUOTE_NONE
+]
+
+# Bytes iniciales inspeccionados para elegir encoding y separador
+SNIFF_BYTES = 64 * 1024
+
+# Manifiesto junto a los CSV con la configuración que funcionó por archivo
+READ_CONFIG_MANIFEST = '.read_config_cache.json'
+
+
+def sniff_read_config(file_path, sample_bytes=SNIFF_BYTES):
+    """
+    Elige encoding y separador inspeccionando solo el inicio del archivo
+    
+    Returns:
+        dict: Configuración para pd.read_csv (sep, encoding, quotechar)
+    """
+    with open(file_path, 'rb') as f:
+        sample = f.read(sample_bytes)
+    
+    # Cortar en la última línea completa para no partir un carácter multibyte
+    if len(sample) == sample_bytes and b'\n' in sample:
+        sample = sample[:sample.rfind(b'\n')]
+    
+    try:
+        text = sample.decode('utf-8')
+        encoding = 'utf-8'
+    except UnicodeDecodeError:
+        text = sample.decode('latin-1')
+        encoding = 'latin-1'
+    
+    header = text.splitlines()[0] if text else ''
+    sep = ';' if header.count(';') >= header.count(',') else ','
+    
+    return {'sep': sep, 'encoding': encoding, 'quotechar': '"'}
+
+
+def file_fingerprint(file_path):
+    """Tamaño y mtime del archivo, usados para invalidar caches"""
+    stat = Path(file_path).stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def load_read_config_manifest(data_directory):
+    """Carga el manifiesto de configuraciones de lectura ({} si no existe)"""
+    try:
+        with open(Path(data_directory) / READ_CONFIG_MANIFEST, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_read_config_manifest(data_directory, manifest):
+    """Guarda el manifiesto de configuraciones de lectura"""
+    try:
+        with open(Path(data_directory) / READ_CONFIG_MANIFEST, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+    except OSError as e:
+        print(f"⚠️  No se pudo guardar {READ_CONFIG_MANIFEST}: {e}")
+
+
+def cached_read_config(file_path, manifest=None):
+    """Configuración guardada para el archivo, si su tamaño y mtime no cambiaron"""
+    file_path = Path(file_path)
+    if manifest is None:
+        manifest = load_read_config_manifest(file_path.parent)
+    
+    entry = manifest.get(file_path.name)
+    if entry and entry.get('fingerprint') == file_fingerprint(file_path):
+        return entry['read_config']
+    return None
+
+
+def candidate_read_configs(file_path, manifest=None):
+    """
+    Configuraciones a probar, en orden
+    
+    Returns:
+        tuple: (lista de configuraciones, configuración cacheada o None,
+            primera configuración de la lista)
+    """
+    cached_config = cached_read_config(file_path, manifest)
+    first_config = cached_config or sniff_read_config(file_path)
+    configs = [first_config] + [c for c in READ_CONFIGS if c != first_config]
+    return configs, cached_config, first_config
+
+
+def read_nac_csv(file_path, manifest=None, workers=1, **read_kwargs):
+    """
+    Lee un NAC_*.csv con la configuración cacheada o detectada
+    
+    Args:
+        file_path: ruta al CSV
+        manifest: manifiesto ya cargado (opcional, se lee del directorio si falta)
+        workers: procesos para parsear el archivo por rangos de bytes
+            (nac_offsets.read_csv_parallel); 1 = pd.read_csv directo
+        **read_kwargs: argumentos adicionales para pd.read_csv (usecols, nrows,
+            dtype, ...). Si el archivo no se puede convertir al dtype pedido se
+            vuelve a leer sin dtype con la misma configuración.
+    
+    Returns:
+        tuple: (DataFrame, configuración usada)
+    """
+    # Import local: nac_offsets importa este módulo
+    from nac_offsets import read_csv_parallel
+    
+    configs, _, _ = candidate_read_configs(file_path, manifest)
+    untyped_kwargs = {k: v for k, v in read_kwargs.items() if k != 'dtype'}
+    
+    for config in configs:
+        try:
+            return read_csv_parallel(file_path, config, workers, **read_kwargs), config
+        except UnicodeDecodeError:
+            continue
+        except (ValueError, TypeError, OverflowError):
+            if 'dtype' not in read_kwargs:
+                continue
+        except Exception:
+            continue
+        
+        # Valores no convertibles al dtype pedido: leer sin dtype
+        try:
+            return read_csv_parallel(file_path, config, workers, **untyped_kwargs), config
+        except Exception:
+            continue
+    
+    raise ValueError(f"No se pudo leer {Path(file_path).name} con ninguna configuración")
@@ -0,0 +1,216 @@
+"""
+Detección de casi-duplicados en archivos NAC
+Bloqueo por fecha + COMUNA + ESTAB + TIPO_PARTO y comparación con
+tolerancias dentro de cada bloque, para encontrar re-inscripciones del mismo
+nacimiento con pequeñas diferencias de digitación sin comparar todos los pares
+"""
+
+import numpy as np
+import pandas as pd
+
+from nac_rules import UNKNOWN_CODES
+from nac_schema import canonical_name
+
+# Columnas de bloqueo: solo se comparan registros con los mismos valores.
+# Las columnas ausentes en un año (ESTAB antes de 1996) se omiten.
+BLOCK_COLUMNS = ['DIA_NAC', 'MES_NAC', 'ANO_NAC', 'COMUNA', 'ESTAB', 'TIPO_PARTO']
+DATE_COLUMNS = ['DIA_NAC', 'MES_NAC', 'ANO_NAC']
+
+# TIPO_PARTO: 1 = parto simple; 2 o más = gemelos, trillizos, ... Los
+# hermanos de un parto múltiple comparten fecha, lugar y medidas parecidas
+# sin ser el mismo nacimiento, así que no se comparan
+SINGLE_BIRTH = 1
+
+# Diferencia absoluta máxima por variable para considerar dos registros
+# el mismo nacimiento. PESO es además la clave de orden dentro del bloque.
+TOLERANCES = {
+    'PESO': 50,
+    'TALLA': 1,
+    'EDAD_M': 0,
+    'SEMANAS': 1,
+}
+SORT_COLUMN = 'PESO'
+
+# Mínimo de variables conocidas en ambos registros para aceptar un par
+MIN_COMPARED = 3
+
+# Límite de vecinos por registro dentro del bloque (peor caso lineal)
+MAX_WINDOW = 50
+
+NEAR_DUPLICATE_COLUMNS = BLOCK_COLUMNS + list(TOLERANCES)
+
+
+def _numeric(df, column):
+    """
+    Columna como float64 (nulos, valores no numéricos y el código de
+    "ignorado" de UNKNOWN_CODES como NaN)
+    
+    Así dos registros con PESO 9999 no cuentan como el mismo valor.
+    """
+    if column not in df.columns:
+        return np.full(len(df), np.nan)
+    values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    if column in UNKNOWN_CODES:
+        values = np.where(values == UNKNOWN_CODES[column], np.nan, values)
+    return values
+
+
+def _compare_pairs(values, tolerances, left, right, min_compared):
+    """
+    Similitud de los pares (left, right), variable por variable
+    
+    Cada variable aporta 1 - |diferencia| / (tolerancia + 1) si está dentro
+    de la tolerancia y 0 si falta en alguno de los dos registros. El score
+    es el promedio sobre todas las variables: 1.0 = valores idénticos.
+    
+    Returns:
+        tuple: (máscara de pares aceptados, score de cada par)
+    """
+    diff = np.abs(values[left] - values[right])
+    known = ~np.isnan(diff)
+    within = diff <= tolerances
+    
+    accepted = (within | ~known).all(axis=1) & (known.sum(axis=1) >= min_compared)
+    similarity = np.where(within, 1 - diff / (tolerances + 1), 0.0)
+    return accepted, similarity.mean(axis=1)
+
+
+def _connected_components(n, left, right):
+    """Etiqueta de componente por nodo (la menor posición), por propagación de mínimos"""
+    labels = np.arange(n)
+    while True:
+        low = np.minimum(labels[left], labels[right])
+        new = labels.copy()
+        np.minimum.at(new, left, low)
+        np.minimum.at(new, right, low)
+        new = new[new]
+        if np.array_equal(new, labels):
+            return labels
+        labels = new
+
+
+def find_near_duplicates(df, tolerances=None, min_compared=MIN_COMPARED, max_window=MAX_WINDOW):
+    """
+    Motor de casi-duplicados por bloqueo y vecindad ordenada
+    
+    Los registros se ordenan por bloque y PESO. Como dentro de un bloque la
+    diferencia de PESO crece con la distancia en el orden, basta comparar
+    cada registro con sus siguientes vecinos mientras esa diferencia esté
+    dentro de la tolerancia: cada desplazamiento es una comparación
+    vectorizada sobre los registros aún activos. El costo es lineal en la
+    cantidad de filas más la de pares candidatos, acotado por max_window.
+    
+    Los pares aceptados se agrupan en clusters (componentes conexas).
+    Registros sin fecha, sin PESO (o PESO ignorado) o de partos múltiples
+    no se comparan; los códigos de "ignorado" cuentan como valor faltante.
+    
+    Args:
+        df: DataFrame NAC (nombres crudos o canónicos)
+        tolerances: {variable: diferencia máxima}; por defecto TOLERANCES
+        min_compared: mínimo de variables conocidas en ambos registros
+        max_window: máximo de vecinos comparados por registro
+    
+    Returns:
+        pd.DataFrame: una fila por registro en algún cluster, con cluster,
+            row (posición en df), size, score (promedio de sus pares),
+            min_score y las columnas de bloqueo y comparación, ordenado por
+            score descendente
+    """
+    tolerances = dict(TOLERANCES if tolerances is None else tolerances)
+    df = df.rename(columns=canonical_name)
+    block_cols = [col for col in BLOCK_COLUMNS if col in df.columns]
+    compare_cols = list(tolerances)
+    
+    if not all(col in df.columns for col in DATE_COLUMNS + [SORT_COLUMN]):
+        return _empty_clusters(block_cols, compare_cols)
+    
+    # Bloque por combinación de valores (los nulos de COMUNA/ESTAB son un valor más)
+    block = df[block_cols].groupby(block_cols, dropna=False, sort=False).ngroup().to_numpy()
+    values = np.column_stack([_numeric(df, col) for col in compare_cols])
+    sort_key = values[:, compare_cols.index(SORT_COLUMN)]
+    
+    multiple_birth = _numeric(df, 'TIPO_PARTO') > SINGLE_BIRTH
+    eligible = np.flatnonzero(
+        df[DATE_COLUMNS].notna().all(axis=1).to_numpy() & ~np.isnan(sort_key) & ~multiple_birth
+    )
+    order = eligible[np.lexsort((sort_key[eligible], block[eligible]))]
+    block, values, sort_key = block[order], values[order], sort_key[order]
+    limits = np.array([tolerances[col] for col in compare_cols], dtype='float64')
+    
+    # Vecindad ordenada: en el paso k se compara i con i + k para los i activos
+    left_parts, right_parts, score_parts = [], [], []
+    active = np.arange(len(order) - 1)
+    for k in range(1, max_window + 1):
+        active = active[active + k < len(order)]
+        partner = active + k
+        near = (block[partner] == block[active]) & (sort_key[partner] - sort_key[active] <= tolerances[SORT_COLUMN])
+        active, partner = active[near], partner[near]
+        if not len(active):
+            break
+        
+        accepted, scores = _compare_pairs(values, limits, active, partner, min_compared)
+        left_parts.append(active[accepted])
+        right_parts.append(partner[accepted])
+        score_parts.append(scores[accepted])
+    
+    if not left_parts or not sum(len(part) for part in left_parts):
+        return _empty_clusters(block_cols, compare_cols)
+    
+    left = np.concatenate(left_parts)
+    right = np.concatenate(right_parts)
+    scores = np.concatenate(score_parts)
+    
+    labels = _connected_components(len(order), left, right)
+    pair_cluster = labels[left]
+    
+    # Score del cluster: promedio y mínimo de sus pares
+    pair_stats = pd.DataFrame({'cluster': pair_cluster, 'score': scores}).groupby('cluster')['score'].agg(['mean', 'min'])
+    members = np.unique(np.concatenate([left, right]))
+    
+    clusters = df.iloc[order[members]][block_cols + compare_cols].reset_index(drop=True)
+    clusters.insert(0, 'cluster', labels[members])
+    clusters.insert(1, 'row', order[members])
+    clusters.insert(2, 'size', clusters.groupby('cluster')['row'].transform('size'))
+    clusters.insert(3, 'score', clusters['cluster'].map(pair_stats['mean']).round(4))
+    clusters.insert(4, 'min_score', clusters['cluster'].map(pair_stats['min']).round(4))
+    
+    # Clusters numerados de 0 en adelante, del más al menos parecido
+    clusters = clusters.sort_values(['score', 'cluster', 'row'], ascending=[False, True, True], kind='stable')
+    clusters['cluster'] = pd.factorize(clusters['cluster'])[0]
+    return clusters.reset_index(drop=True)
+
+
+def _empty_clusters(block_cols, compare_cols):
+    columns = ['cluster', 'row', 'size', 'score', 'min_score'] + block_cols + compare_cols
+    return pd.DataFrame(columns=columns)
+
+
+def near_duplicate_summary(clusters, total_rows, tolerances=None, sample=10):
+    """
+    Resumen de find_near_duplicates para el reporte JSON
+    
+    Returns:
+        dict: clusters, filas involucradas, filas redundantes (todas menos
+            una por cluster), porcentaje y los primeros clusters con sus filas
+    """
+    sizes = clusters.groupby('cluster')['row'].size()
+    redundant = int((sizes - 1).sum())
+    
+    top = []
+    for cluster, members in clusters[clusters['cluster'] < sample].groupby('cluster', sort=True):
+        top.append({
+            'cluster': int(cluster),
+            'rows': [int(row) for row in members['row']],
+            'score': float(members['score'].iloc[0]),
+            'min_score': float(members['min_score'].iloc[0])
+        })
+    
+    return {
+        'block_columns': [col for col in clusters.columns if col in BLOCK_COLUMNS],
+        'tolerances': dict(TOLERANCES if tolerances is None else tolerances),
+        'clusters': int(len(sizes)),
+        'rows': int(len(clusters)),
+        'redundant_rows': redundant,
+        'percentage': round(redundant / total_rows * 100, 2) if total_rows else 0.0,
+        'sample': top
+    }
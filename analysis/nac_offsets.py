@@ -0,0 +1,348 @@
+"""
+Índice de offsets de filas de los NAC_*.csv
+Arreglo uint64 con el offset en bytes de cada fila, calculado una vez con una
+pasada NumPy sobre el archivo mapeado en memoria y guardado junto a los CSV.
+Permite leer cualquier fila o rango de filas con un seek, sin recorrer el archivo.
+"""
+
+import io
+import json
+import mmap
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from nac_io import candidate_read_configs, file_fingerprint
+from nac_schema import canonical_name, concat_years, harmonize_columns, reader_dtypes
+
+# Directorio junto a los CSV: <stem>.npy por archivo y manifiesto con huellas
+OFFSETS_DIRNAME = '.line_offsets'
+OFFSETS_MANIFEST = 'manifest.json'
+
+# Cambiar al modificar scan_row_offsets: invalida los índices guardados
+OFFSETS_VERSION = 2
+
+# Tamaño mínimo de cada rango en la lectura paralela: con menos, el costo de
+# lanzar procesos y copiar los resultados supera al del parseo
+MIN_RANGE_BYTES = 4 * 1024 * 1024
+
+
+def offsets_directory(data_directory):
+    return Path(data_directory) / OFFSETS_DIRNAME
+
+
+# Bytes por bloque al buscar fines de línea y líneas en blanco
+SCAN_BLOCK_BYTES = 16 * 1024 * 1024
+
+# Bytes que no cuentan como contenido: una línea solo con estos está en blanco
+WHITESPACE = (ord(' '), ord('\t'), ord('\r'), ord('\n'))
+
+
+def _line_starts(data, lo, hi):
+    """Inicio de las líneas que empiezan en (lo, hi]: después de '\n', '\r\n' o '\r' solo"""
+    block = data[lo:hi]
+    after_lf = np.flatnonzero(block == ord('\n')) + lo + 1
+    cr = np.flatnonzero(block == ord('\r')) + lo
+    # '\r' seguido de '\n' es parte de CRLF; el corte lo pone el '\n'
+    lone_cr = cr[(cr + 1 >= len(data)) | (data[np.minimum(cr + 1, len(data) - 1)] != ord('\n'))]
+    return np.sort(np.concatenate([after_lf, lone_cr + 1]))
+
+
+def _has_content(data, starts, ends):
+    """Si cada línea [starts, ends) tiene algún byte distinto de espacio, tab o fin de línea"""
+    result = np.zeros(len(starts), dtype=bool)
+    first = 0
+    while first < len(starts):
+        last = max(int(np.searchsorted(starts, starts[first] + SCAN_BLOCK_BYTES)), first + 1)
+        lo, hi = int(starts[first]), int(ends[last - 1])
+        content = ~np.isin(data[lo:hi], WHITESPACE)
+        result[first:last] = np.logical_or.reduceat(content, starts[first:last] - lo)
+        first = last
+    return result
+
+
+def scan_row_offsets(csv_path):
+    """
+    Offsets de las filas de datos de un CSV
+    
+    Sigue la numeración de filas de pd.read_csv: las líneas terminan en
+    '\n', '\r\n' o '\r' solo, y las líneas en blanco (vacías o solo con
+    espacios y tabs) se omiten, también antes del encabezado, así que la fila k
+    coincide con la fila k de la lectura completa. Las líneas se ubican con
+    np.flatnonzero sobre los bytes mapeados en memoria, por bloques. Asume que
+    no hay saltos de línea dentro de campos entre comillas, como en todos los
+    NAC_*.csv.
+    
+    Returns:
+        np.ndarray: uint64 de largo filas + 2: [0, inicio fila 0, ...,
+            inicio fila n - 1, tamaño]. La fila k ocupa offsets[k + 1]:offsets[k + 2]
+            (con las líneas en blanco que la siguen) y el encabezado
+            0:offsets[1] (con las líneas en blanco que lo preceden).
+    """
+    size = file_fingerprint(csv_path)['size']
+    if size == 0:
+        return np.zeros(2, dtype=np.uint64)
+    
+    # np.memmap: el mapeo se libera con el arreglo, también si hay una excepción
+    data = np.memmap(csv_path, dtype=np.uint8, mode='r')
+    starts = np.concatenate([[0]] + [
+        _line_starts(data, lo, min(lo + SCAN_BLOCK_BYTES, size))
+        for lo in range(0, size, SCAN_BLOCK_BYTES)
+    ]).astype(np.int64)
+    starts = starts[starts < size]
+    lines = starts[_has_content(data, starts, np.append(starts[1:], size))]
+    del data
+    
+    # La primera línea con contenido es el encabezado
+    rows = lines[1:]
+    return np.concatenate([[0], rows, [size]]).astype(np.uint64)
+
+
+def _load_manifest(directory):
+    try:
+        with open(Path(directory) / OFFSETS_MANIFEST, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _index_key(csv_path):
+    """Huella del CSV y versión del escaneo con que se calculó el índice"""
+    return {**file_fingerprint(csv_path), 'version': OFFSETS_VERSION}
+
+
+def load_row_offsets(csv_path, save=True):
+    """
+    Índice de offsets del archivo, desde disco si sigue vigente
+    
+    Si el archivo cambió (tamaño o mtime) o no hay índice, se recalcula con
+    scan_row_offsets y se guarda como .npy; el guardado se abre con
+    mmap_mode='r', así que cargarlo no lee el arreglo completo.
+    
+    Returns:
+        np.ndarray: uint64, ver scan_row_offsets
+    """
+    csv_path = Path(csv_path)
+    directory = offsets_directory(csv_path.parent)
+    index_path = directory / f"{csv_path.stem}.npy"
+    manifest = _load_manifest(directory)
+    
+    if manifest.get(csv_path.name) == _index_key(csv_path) and index_path.exists():
+        try:
+            return np.load(index_path, mmap_mode='r')
+        except (OSError, ValueError):
+            pass
+    
+    offsets = scan_row_offsets(csv_path)
+    if save:
+        try:
+            directory.mkdir(exist_ok=True)
+            np.save(index_path, offsets)
+            manifest[csv_path.name] = _index_key(csv_path)
+            with open(directory / OFFSETS_MANIFEST, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+        except OSError as e:
+            print(f"⚠️  No se pudo guardar el índice de offsets de {csv_path.name}: {e}")
+    return offsets
+
+
+def build_offset_index(data_directory):
+    """Crea o actualiza el índice de offsets de todos los NAC_*.csv"""
+    for csv_file in sorted(Path(data_directory).glob('NAC_*.csv')):
+        offsets = load_row_offsets(csv_file)
+        print(f"✓ {csv_file.name}: {row_count(offsets):,} filas indexadas")
+
+
+def row_count(offsets):
+    """Cantidad de filas de datos según el índice"""
+    return max(len(offsets) - 2, 0)
+
+
+def header_columns(header, config):
+    """Nombres de columna de la línea de encabezado (bytes) con la configuración dada"""
+    text = header.decode(config['encoding']).lstrip('\ufeff').strip()
+    return [col.strip().strip('"') for col in text.split(config['sep'])]
+
+
+def _with_newline(line):
+    return line if line.endswith(b'\n') else line + b'\n'
+
+
+def parse_lines(csv_path, payload, usecols=None, harmonize=False):
+    """
+    Parsea bytes (encabezado + filas) con la configuración del archivo
+    
+    Args:
+        usecols / harmonize: como en read_nac_file
+    """
+    configs, _, _ = candidate_read_configs(csv_path)
+    
+    if harmonize and usecols is not None:
+        wanted = usecols if callable(usecols) else set(usecols).__contains__
+        usecols = lambda col: wanted(canonical_name(col))
+    
+    read_kwargs = {'usecols': usecols}
+    if harmonize:
+        read_kwargs['dtype'] = reader_dtypes()
+    untyped_kwargs = {k: v for k, v in read_kwargs.items() if k != 'dtype'}
+    
+    for config in configs:
+        for kwargs in (read_kwargs, untyped_kwargs):
+            try:
+                df = pd.read_csv(io.BytesIO(payload), **config, low_memory=False, **kwargs)
+            except UnicodeDecodeError:
+                break
+            except Exception:
+                continue
+            return harmonize_columns(df) if harmonize else df
+    
+    raise ValueError(f"No se pudieron leer las filas de {Path(csv_path).name} con ninguna configuración")
+
+
+def read_rows(csv_path, start=0, stop=None, usecols=None, harmonize=False, offsets=None):
+    """
+    Filas start:stop de un CSV, leídas con un seek al offset de la fila start
+    
+    Returns:
+        pd.DataFrame: con índice = posición de la fila en el archivo
+    """
+    offsets = load_row_offsets(csv_path) if offsets is None else offsets
+    n_rows = row_count(offsets)
+    start = min(max(start, 0), n_rows)
+    stop = n_rows if stop is None else min(max(stop, start), n_rows)
+    
+    with open(csv_path, 'rb') as f:
+        header = f.read(int(offsets[1]))
+        f.seek(int(offsets[start + 1]))
+        body = f.read(int(offsets[stop + 1]) - int(offsets[start + 1]))
+    
+    df = parse_lines(csv_path, _with_newline(header) + _with_newline(body) if body else _with_newline(header),
+                     usecols=usecols, harmonize=harmonize)
+    df.index = pd.RangeIndex(start, start + len(df))
+    return df
+
+
+def read_row_positions(csv_path, positions, usecols=None, harmonize=False, offsets=None):
+    """
+    Filas en posiciones arbitrarias (ordenadas o no), sin leer el resto
+    
+    Returns:
+        pd.DataFrame: en el orden de positions, con índice = posición
+    """
+    offsets = load_row_offsets(csv_path) if offsets is None else offsets
+    positions = np.asarray(positions, dtype=np.int64)
+    if len(positions) and (positions.min() < 0 or positions.max() >= row_count(offsets)):
+        raise IndexError(f"Fila fuera de rango en {Path(csv_path).name}")
+    
+    with open(csv_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        header = mm[0:int(offsets[1])]
+        lines = [mm[int(offsets[row + 1]):int(offsets[row + 2])] for row in positions]
+    
+    payload = b''.join([_with_newline(header)] + [_with_newline(line) for line in lines])
+    df = parse_lines(csv_path, payload, usecols=usecols, harmonize=harmonize)
+    df.index = positions
+    return df
+
+
+def row_ranges(offsets, parts):
+    """
+    Divide las filas en hasta parts rangos contiguos de bytes similares
+    
+    Los cortes caen siempre al inicio de una fila, así que cada rango se
+    puede parsear por separado.
+    
+    Returns:
+        list: [(fila_inicio, fila_fin), ...] en orden, sin rangos vacíos
+    """
+    n_rows = row_count(offsets)
+    starts = np.asarray(offsets[1:-1], dtype=np.int64)
+    if not n_rows:
+        return []
+    targets = np.linspace(starts[0], int(offsets[-1]), max(parts, 1) + 1)[1:-1]
+    cuts = np.unique(np.concatenate([[0], np.searchsorted(starts, targets), [n_rows]]))
+    return [(int(a), int(b)) for a, b in zip(cuts[:-1], cuts[1:]) if b > a]
+
+
+def _read_byte_range(csv_path, header_end, start, stop, read_kwargs):
+    """Parsea encabezado + bytes start:stop del archivo (en un proceso hijo)"""
+    with open(csv_path, 'rb') as f:
+        header = f.read(header_end)
+        f.seek(start)
+        body = f.read(stop - start)
+    return pd.read_csv(io.BytesIO(_with_newline(header) + _with_newline(body)), **read_kwargs)
+
+
+def _is_text(dtype):
+    return dtype == object or pd.api.types.is_string_dtype(dtype)
+
+
+def _mixed_text_columns(parts):
+    """Columnas que quedaron como texto en un rango y numéricas en otro"""
+    return [
+        col for col in parts[0].columns
+        if any(_is_text(part[col].dtype) for part in parts)
+        and not all(_is_text(part[col].dtype) for part in parts)
+    ]
+
+
+def read_csv_parallel(csv_path, config, workers=1, **read_kwargs):
+    """
+    pd.read_csv(csv_path, **config, **read_kwargs) parseando rangos de bytes en paralelo
+    
+    El archivo se divide en rangos alineados a inicio de fila (índice de
+    offsets), cada proceso parsea el suyo y los resultados se concatenan en
+    orden. Si un rango falla (encoding, dtype) se propaga la misma excepción
+    que daría pd.read_csv, así los llamadores pueden probar la siguiente
+    configuración. Con workers <= 1, nrows o un archivo chico se usa
+    pd.read_csv directamente.
+    
+    Una columna con texto en un rango y solo números en otro se vuelve a
+    parsear como texto, igual que en la lectura completa.
+    
+    Returns:
+        pd.DataFrame: el mismo resultado que la lectura completa
+    """
+    read_kwargs = {'low_memory': False, **config, **read_kwargs}
+    size = file_fingerprint(csv_path)['size']
+    parts = min(workers or 1, size // MIN_RANGE_BYTES)
+    if parts <= 1 or read_kwargs.get('nrows') is not None:
+        return pd.read_csv(csv_path, **read_kwargs)
+    
+    offsets = load_row_offsets(csv_path)
+    ranges = row_ranges(offsets, parts)
+    header_end = int(offsets[1])
+    
+    # usecols como función no se puede enviar a otro proceso: se resuelve
+    # aquí contra el encabezado
+    if callable(read_kwargs.get('usecols')):
+        header = pd.read_csv(csv_path, **{**read_kwargs, 'usecols': None, 'nrows': 0})
+        read_kwargs['usecols'] = [col for col in header.columns if read_kwargs['usecols'](col)]
+    
+    def parse_all(executor, kwargs, indices):
+        futures = [
+            executor.submit(_read_byte_range, str(csv_path), header_end,
+                            int(offsets[ranges[i][0] + 1]), int(offsets[ranges[i][1] + 1]), kwargs)
+            for i in indices
+        ]
+        return [future.result() for future in futures]
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+        frames = parse_all(executor, read_kwargs, range(len(ranges)))
+        
+        mixed = _mixed_text_columns(frames)
+        if mixed:
+            dtype = read_kwargs.get('dtype')
+            dtype = dict(dtype) if isinstance(dtype, dict) else {}
+            dtype.update({col: str for col in mixed})
+            redo = [i for i, frame in enumerate(frames) if not all(_is_text(frame[col].dtype) for col in mixed)]
+            for i, frame in zip(redo, parse_all(executor, {**read_kwargs, 'dtype': dtype}, redo)):
+                frames[i] = frame
+    
+    # concat_years unifica las categorías que difieren entre rangos
+    return concat_years(frames)
+
+
+if __name__ == "__main__":
+    import sys
+    build_offset_index(sys.argv[1] if len(sys.argv) > 1 else 'resources/03_BI')
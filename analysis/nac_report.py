@@ -0,0 +1,308 @@
+"""
+Reporte del análisis en tablas Parquet
+Solo métricas agregadas (por ejecución, archivo, columna y anomalía), sin
+filas de ejemplo; cada ejecución se agrega como una partición run=<id>, así
+que las tablas se consultan entre ejecuciones con pd.read_parquet. El JSON
+completo queda como exportación opcional.
+"""
+
+import json
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+
+from nac_cache import parquet_available
+
+# Columnas y tipos de cada tabla: fijos para que las particiones de todas las
+# ejecuciones tengan el mismo esquema
+REPORT_TABLES = {
+    'runs': {
+        'analysis_date': 'string',
+        'total_files': 'int64',
+        'total_records': 'int64',
+        'total_exact_duplicates': 'int64',
+        'files_with_anomalies': 'int64',
+        'files_with_errors': 'int64',
+        'average_file_size_mb': 'float64',
+        'cross_file_groups': 'int64',
+        'cross_file_rows': 'int64',
+        'suspicious_files': 'string',
+    },
+    'files': {
+        'file': 'string',
+        'year': 'int16',
+        'size_mb': 'float64',
+        'rows': 'int64',
+        'columns': 'int64',
+        'memory_mb': 'float64',
+        'read_config_source': 'string',
+        'encoding': 'string',
+        'sep': 'string',
+        'exact_duplicates': 'int64',
+        'exact_duplicates_pct': 'float64',
+        'near_duplicate_clusters': 'int64',
+        'near_duplicate_redundant_rows': 'int64',
+        'anomaly_types': 'int64',
+        'warnings': 'int64',
+        'errors': 'int64',
+        'bytes_per_row': 'float64',
+        'overhead_pct': 'float64',
+        'line_endings': 'string',
+        'normalized_size_mb': 'float64',
+    },
+    'columns': {
+        'file': 'string',
+        'column': 'string',
+        'null_count': 'int64',
+        'null_pct': 'float64',
+        'unique_values': 'int64',
+        'bytes_per_field': 'float64',
+        'content_bytes_per_field': 'float64',
+        'quote_bytes': 'int64',
+        'padding_bytes': 'int64',
+        'leading_zero_bytes': 'int64',
+        'zero_decimal_bytes': 'int64',
+        'empty_fields': 'int64',
+    },
+    'anomalies': {
+        'file': 'string',
+        'type': 'string',
+        'description': 'string',
+        'count': 'int64',
+        'percentage': 'float64',
+        'columns': 'string',
+    },
+}
+
+# Archivos analizados por lote escrito (un row group por lote)
+BATCH_FILES = 8
+
+
+def _arrow_schema(table):
+    import pyarrow as pa
+    types = {'string': pa.string(), 'int64': pa.int64(), 'int16': pa.int16(), 'float64': pa.float64()}
+    return pa.schema([(col, types[dtype]) for col, dtype in REPORT_TABLES[table].items()])
+
+
+def _file_year(file_name):
+    year = file_name.split('_')[1].split('.')[0] if '_' in file_name else ''
+    return int(year) if year.isdigit() else None
+
+
+def file_row(analysis):
+    """Fila de la tabla files para el análisis de un archivo"""
+    metrics = analysis.get('metrics', {})
+    duplicates = analysis.get('duplicates', {})
+    near = duplicates.get('near_duplicates', {})
+    profile = analysis.get('byte_profile', {})
+    config = analysis.get('read_config', {})
+    
+    return {
+        'file': analysis['file_name'],
+        'year': _file_year(analysis['file_name']),
+        'size_mb': analysis.get('file_size_mb'),
+        'rows': metrics.get('total_rows'),
+        'columns': metrics.get('total_columns'),
+        'memory_mb': metrics.get('memory_usage_mb'),
+        'read_config_source': analysis.get('read_config_source'),
+        'encoding': config.get('encoding'),
+        'sep': config.get('sep'),
+        'exact_duplicates': duplicates.get('exact_duplicates', {}).get('count'),
+        'exact_duplicates_pct': duplicates.get('exact_duplicates', {}).get('percentage'),
+        'near_duplicate_clusters': near.get('clusters'),
+        'near_duplicate_redundant_rows': near.get('redundant_rows'),
+        'anomaly_types': len(analysis.get('anomalies', [])),
+        'warnings': len(analysis.get('warnings', [])),
+        'errors': len(analysis.get('errors', [])),
+        'bytes_per_row': profile.get('bytes_per_row'),
+        'overhead_pct': profile.get('overhead_pct'),
+        'line_endings': profile.get('line_endings', {}).get('style'),
+        'normalized_size_mb': (
+            profile['normalized_size_estimate'] / (1024 * 1024) if 'normalized_size_estimate' in profile else None
+        ),
+    }
+
+
+def column_rows(analysis):
+    """Filas de la tabla columns: nulos, valores distintos y perfil de bytes por columna"""
+    metrics = analysis.get('metrics', {})
+    total = metrics.get('total_rows') or 0
+    nulls = metrics.get('null_values', {}).get('columns_with_nulls', {})
+    unique = {item['column']: item['unique_values'] for item in metrics.get('consistency', [])}
+    profile = analysis.get('byte_profile', {}).get('columns', {})
+    
+    names = list(metrics.get('column_names', []))
+    names += [col for col in profile if col not in names]
+    
+    rows = []
+    for col in names:
+        null_count = nulls.get(col, {}).get('count', 0 if col in metrics.get('column_names', []) else None)
+        stats = profile.get(col, {})
+        rows.append({
+            'file': analysis['file_name'],
+            'column': col,
+            'null_count': null_count,
+            'null_pct': round(null_count / total * 100, 2) if total and null_count is not None else None,
+            'unique_values': unique.get(col),
+            'bytes_per_field': stats.get('bytes_per_field'),
+            'content_bytes_per_field': stats.get('content_bytes_per_field'),
+            'quote_bytes': stats.get('quote_bytes'),
+            'padding_bytes': stats.get('padding_bytes'),
+            'leading_zero_bytes': stats.get('leading_zero_bytes'),
+            'zero_decimal_bytes': stats.get('zero_decimal_bytes'),
+            'empty_fields': stats.get('empty_fields'),
+        })
+    return rows
+
+
+def anomaly_rows(analysis):
+    """Filas de la tabla anomalies: una por tipo de anomalía del archivo"""
+    return [
+        {
+            'file': analysis['file_name'],
+            'type': anomaly['type'],
+            'description': anomaly.get('description'),
+            'count': anomaly.get('count'),
+            'percentage': anomaly.get('percentage'),
+            'columns': ','.join(anomaly['columns']) if 'columns' in anomaly else None,
+        }
+        for anomaly in analysis.get('anomalies', [])
+    ]
+
+
+def run_row(analysis_date, total_files, summary, cross_file):
+    """Fila de la tabla runs con el resumen de la ejecución"""
+    return {
+        'analysis_date': analysis_date,
+        'total_files': total_files,
+        'total_records': summary['total_records_analyzed'],
+        'total_exact_duplicates': summary['total_exact_duplicates'],
+        'files_with_anomalies': summary['files_with_anomalies'],
+        'files_with_errors': summary['files_with_errors'],
+        'average_file_size_mb': summary['average_file_size_mb'],
+        'cross_file_groups': cross_file['total_duplicate_groups'],
+        'cross_file_rows': cross_file['total_duplicate_rows'],
+        'suspicious_files': ','.join(file_info['file'] for file_info in summary['suspicious_files']),
+    }
+
+
+def _frame(table, rows):
+    """Filas -> DataFrame con las columnas y tipos de la tabla (nulos permitidos)"""
+    nullable = {'int64': 'Int64', 'int16': 'Int16', 'float64': 'Float64', 'string': 'string'}
+    columns = REPORT_TABLES[table]
+    return pd.DataFrame(rows, columns=list(columns)).astype({col: nullable[t] for col, t in columns.items()})
+
+
+class ReportWriter:
+    """
+    Escribe las tablas de una ejecución mientras se recorren los análisis
+    
+    Las filas se acumulan solo para BATCH_FILES archivos: cada lote se
+    escribe como un row group y se descarta, así la memoria no depende de la
+    cantidad de archivos. Cada tabla queda en <report_dir>/<tabla>/run=<id>/.
+    """
+    
+    def __init__(self, report_dir, run_id=None, batch_files=BATCH_FILES):
+        import pyarrow.parquet as pq
+        self._pq = pq
+        self.report_dir = Path(report_dir)
+        self.run_id = run_id or datetime.now().strftime('%Y%m%dT%H%M%S_%f')
+        self.batch_files = batch_files
+        self._pending = {table: [] for table in ('files', 'columns', 'anomalies')}
+        self._pending_files = 0
+        self._writers = {}
+        self.total_files = 0
+    
+    def _path(self, table):
+        path = self.report_dir / table / f"run={self.run_id}"
+        path.mkdir(parents=True, exist_ok=True)
+        return path / 'part-0.parquet'
+    
+    def _write(self, table, rows):
+        import pyarrow as pa
+        if table not in self._writers:
+            self._writers[table] = self._pq.ParquetWriter(self._path(table), _arrow_schema(table))
+        batch = pa.Table.from_pandas(_frame(table, rows), schema=_arrow_schema(table), preserve_index=False)
+        self._writers[table].write_table(batch)
+    
+    def update(self, analysis):
+        """Agrega el análisis de un archivo"""
+        self._pending['files'].append(file_row(analysis))
+        self._pending['columns'].extend(column_rows(analysis))
+        self._pending['anomalies'].extend(anomaly_rows(analysis))
+        self._pending_files += 1
+        self.total_files += 1
+        if self._pending_files >= self.batch_files:
+            self.flush()
+    
+    def flush(self):
+        for table, rows in self._pending.items():
+            if rows:
+                self._write(table, rows)
+            self._pending[table] = []
+        self._pending_files = 0
+    
+    def close(self, analysis_date, summary, cross_file):
+        """Escribe lo pendiente y la fila de la ejecución"""
+        self.flush()
+        self._write('runs', [run_row(analysis_date, self.total_files, summary, cross_file)])
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+        return self.report_dir
+
+
+class JsonReportWriter:
+    """
+    Exportación JSON con la estructura del reporte completo
+    
+    Cada análisis se serializa y escribe apenas llega, sin armar el reporte
+    entero en memoria; sin indentación para que el archivo sea compacto.
+    """
+    
+    def __init__(self, path, analysis_date, total_files):
+        self.path = Path(path)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._first = True
+        self._file.write('{' + f'"analysis_date": {json.dumps(analysis_date)}, '
+                         f'"total_files_analyzed": {total_files}, "individual_file_analysis": {{')
+    
+    def update(self, analysis):
+        separator = '' if self._first else ', '
+        self._file.write(f"{separator}{json.dumps(analysis['file_name'])}: {json.dumps(analysis, ensure_ascii=False)}")
+        self._first = False
+    
+    def close(self, analysis_date, summary, cross_file):
+        self._file.write('}, "cross_file_duplicates": ' + json.dumps(cross_file, ensure_ascii=False))
+        self._file.write(', "summary": ' + json.dumps(summary, ensure_ascii=False) + '}')
+        self._file.close()
+        return self.path
+
+
+def load_report(report_dir, table='files', latest=False):
+    """
+    Tabla del reporte con todas las ejecuciones (columna run)
+    
+    Args:
+        table: 'runs', 'files', 'columns' o 'anomalies'
+        latest: solo la última ejecución
+    
+    Returns:
+        pd.DataFrame
+    """
+    path = Path(report_dir) / table
+    if not parquet_available() or not path.exists():
+        return _frame(table, []).assign(run=pd.Series(dtype='string'))
+    
+    runs = sorted(p.name.split('=', 1)[1] for p in path.glob('run=*'))
+    filters = [('run', '==', runs[-1])] if latest and runs else None
+    df = pd.read_parquet(path, filters=filters, dtype_backend='numpy_nullable')
+    df['run'] = df['run'].astype('string')
+    return df.sort_values('run', kind='stable').reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import sys
+    report_dir = sys.argv[1] if len(sys.argv) > 1 else 'resources/csv_analysis_report'
+    print(load_report(report_dir, 'runs').to_string(index=False))
+    print(load_report(report_dir, 'files', latest=True).to_string(index=False))
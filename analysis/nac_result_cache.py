@@ -0,0 +1,189 @@
+"""
+Caché de resultados de CSVAnalyzer
+Por archivo: huella (tamaño, mtime y hash del contenido), dict de análisis y
+arreglos de hashes de filas (.npy, abiertos con memory-map), para volver a
+analizar solo lo que cambió
+"""
+
+import numpy as np
+from pathlib import Path
+import hashlib
+import json
+
+from nac_io import file_fingerprint
+
+# Directorio de la caché, junto al reporte csv_analysis_report.json
+RESULT_CACHE_DIRNAME = '.csv_analysis_cache'
+RESULT_MANIFEST = 'manifest.json'
+
+# Cambiar al modificar el contenido de los análisis: invalida toda la caché
+RESULT_CACHE_VERSION = 11
+
+# Arreglos por archivo: hashes y filas en orden del archivo, y los mismos
+# hashes ordenados con su permutación (para búsquedas por sort-merge)
+HASH_ARRAYS = ('hashes', 'rows', 'sorted', 'order')
+
+# Hashes presentes en más de un archivo en la última ejecución
+CROSS_FILE_CANDIDATES = 'cross_file_candidates.npy'
+CROSS_FILE_MANIFEST = 'cross_file_candidates.json'
+
+
+def content_hash(file_path, block_size=1024 * 1024):
+    """Hash BLAKE2 del contenido del archivo, leído por bloques"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def result_cache_directory(report_directory):
+    return Path(report_directory) / RESULT_CACHE_DIRNAME
+
+
+def load_result_manifest(cache_dir):
+    """Manifiesto de la caché ({} si no existe o es de otra versión)"""
+    try:
+        with open(Path(cache_dir) / RESULT_MANIFEST, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != RESULT_CACHE_VERSION:
+        return {}
+    return manifest.get('files', {})
+
+
+def save_result_manifest(cache_dir, manifest):
+    cache_dir = Path(cache_dir)
+    try:
+        cache_dir.mkdir(exist_ok=True)
+        with open(cache_dir / RESULT_MANIFEST, 'w', encoding='utf-8') as f:
+            json.dump({'version': RESULT_CACHE_VERSION, 'files': manifest}, f, indent=2, ensure_ascii=False)
+    except OSError as e:
+        print(f"⚠️  No se pudo guardar la caché de resultados: {e}")
+
+
+def _array_files(csv_path):
+    stem = Path(csv_path).stem
+    return {name: f"{stem}.{name}.npy" for name in HASH_ARRAYS}
+
+
+def _load_arrays(cache_dir, entry):
+    """Arreglos de un archivo, mapeados en memoria (solo lectura)"""
+    return {
+        name: np.load(Path(cache_dir) / file_name, mmap_mode='r')
+        for name, file_name in entry['arrays'].items()
+    }
+
+
+def cached_result(cache_dir, manifest, csv_path, options):
+    """
+    Resultado guardado para el archivo si sigue vigente
+    
+    options son los parámetros del analizador que cambian el resultado
+    (hash_mode, chunksize, use_cache): si difieren de los guardados no se
+    reutiliza. Con igual tamaño y mtime se reutiliza directamente. Si solo
+    cambió el mtime (archivo copiado o tocado) se compara el hash del
+    contenido y, si coincide, se actualiza la huella en el manifiesto.
+    
+    Returns:
+        tuple o None: (analysis, (hashes, rows) o None, (sorted, order) o None),
+            con los arreglos mapeados en memoria
+    """
+    csv_path = Path(csv_path)
+    entry = manifest.get(csv_path.name)
+    if not entry or entry.get('options') != options:
+        return None
+    
+    fingerprint = file_fingerprint(csv_path)
+    stored = entry['fingerprint']
+    if fingerprint['size'] != stored['size']:
+        return None
+    if fingerprint['mtime_ns'] != stored['mtime_ns']:
+        if content_hash(csv_path) != stored['content_hash']:
+            return None
+        stored['mtime_ns'] = fingerprint['mtime_ns']
+    
+    if not entry.get('arrays'):
+        return entry['analysis'], None, None
+    try:
+        arrays = _load_arrays(cache_dir, entry)
+    except (OSError, ValueError):
+        return None
+    
+    return entry['analysis'], (arrays['hashes'], arrays['rows']), (arrays['sorted'], arrays['order'])
+
+
+def store_result(cache_dir, manifest, csv_path, options, analysis, row_hashes, sorted_hashes):
+    """
+    Guarda el análisis y los hashes de un archivo
+    
+    No se guardan análisis con errores. Los arreglos se escriben como .npy de
+    ancho fijo y se devuelven reabiertos con memory-map.
+    
+    Returns:
+        tuple o None: ((hashes, rows), (sorted, order)) mapeados en memoria
+    """
+    csv_path = Path(csv_path)
+    if analysis.get('errors'):
+        manifest.pop(csv_path.name, None)
+        return None
+    
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(exist_ok=True)
+    
+    entry = {
+        'fingerprint': {**file_fingerprint(csv_path), 'content_hash': content_hash(csv_path)},
+        'options': options,
+        'analysis': analysis,
+        'arrays': None
+    }
+    manifest[csv_path.name] = entry
+    if row_hashes is None:
+        return None
+    
+    entry['arrays'] = _array_files(csv_path)
+    values = {
+        'hashes': row_hashes[0], 'rows': row_hashes[1],
+        'sorted': sorted_hashes[0], 'order': sorted_hashes[1]
+    }
+    for name, file_name in entry['arrays'].items():
+        np.save(cache_dir / file_name, np.ascontiguousarray(values[name]))
+    
+    arrays = _load_arrays(cache_dir, entry)
+    return (arrays['hashes'], arrays['rows']), (arrays['sorted'], arrays['order'])
+
+
+def drop_result(cache_dir, manifest, file_name):
+    """Quita del manifiesto un archivo que ya no existe, junto con sus arreglos"""
+    entry = manifest.pop(file_name, None)
+    for array_file in ((entry or {}).get('arrays') or {}).values():
+        (Path(cache_dir) / array_file).unlink(missing_ok=True)
+
+
+def load_cross_file_candidates(cache_dir):
+    """
+    Candidatos a duplicado entre archivos de la ejecución anterior
+    
+    Returns:
+        tuple: (nombres de archivo cubiertos, arreglo uint64 ordenado); ([], None)
+            si no hay
+    """
+    cache_dir = Path(cache_dir)
+    try:
+        with open(cache_dir / CROSS_FILE_MANIFEST, 'r', encoding='utf-8') as f:
+            files = json.load(f)['files']
+        return files, np.load(cache_dir / CROSS_FILE_CANDIDATES)
+    except (OSError, ValueError, KeyError):
+        return [], None
+
+
+def save_cross_file_candidates(cache_dir, files, candidates):
+    cache_dir = Path(cache_dir)
+    try:
+        cache_dir.mkdir(exist_ok=True)
+        np.save(cache_dir / CROSS_FILE_CANDIDATES, candidates)
+        with open(cache_dir / CROSS_FILE_MANIFEST, 'w', encoding='utf-8') as f:
+            json.dump({'files': files}, f, indent=2)
+    except OSError as e:
+        print(f"⚠️  No se pudieron guardar los candidatos entre archivos: {e}")
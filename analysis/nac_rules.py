@@ -0,0 +1,172 @@
+"""
+Reglas de anomalías para archivos NAC
+Cada regla es una expresión booleana vectorizada sobre columnas NumPy; todas
+se evalúan en una sola pasada por chunk, sin copiar filas
+"""
+
+import numpy as np
+import pandas as pd
+
+from nac_dates import valid_date_mask
+from nac_schema import canonical_name
+
+# Códigos de "ignorado" que no cuentan como valores fuera de rango
+UNKNOWN_CODES = {'PESO': 9999, 'TALLA': 99, 'SEMANAS': 99, 'EDAD_M': 99, 'TIPO_PARTO': 9}
+
+
+class Rule:
+    """
+    Regla de anomalía
+    
+    Args:
+        name: tipo de anomalía en el reporte
+        description: texto del reporte; puede usar {year}
+        columns: columnas canónicas que necesita (si falta alguna no se evalúa)
+        check: función (columnas, year) -> arreglo booleano, True = anómala.
+            Las columnas llegan como float64 con NaN para los nulos, así que
+            cualquier comparación con un nulo es False.
+        needs_year: la regla solo aplica si se conoce el año del archivo
+    """
+    
+    def __init__(self, name, description, columns, check, needs_year=False):
+        self.name = name
+        self.description = description
+        self.columns = list(columns)
+        self.check = check
+        self.needs_year = needs_year
+    
+    def applies(self, available, year):
+        return all(col in available for col in self.columns) and (year is not None or not self.needs_year)
+
+
+def _out_of_range(values, low, high, unknown=None):
+    """Valores conocidos fuera de [low, high], sin contar el código de ignorado"""
+    outside = (values < low) | (values > high)
+    if unknown is not None:
+        outside &= values != unknown
+    return outside
+
+
+def _impossible_date(c, year):
+    """
+    Día y mes en rango pero la fecha no existe (31-04, 30-02, 29-02 en año
+    común). Si falta ANO_NAC se acepta el 29-02.
+    """
+    day, month = c['DIA_NAC'], c['MES_NAC']
+    years = c.get('ANO_NAC', np.full(len(day), np.nan))
+    in_range = (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    return in_range & ~valid_date_mask(years, month, day)
+
+
+def _children_mismatch(c, year):
+    """HIJ_TOTAL distinto de la suma, solo si se conocen las cuatro columnas"""
+    parts = c['HIJ_VIVOS'] + c['HIJ_FALL'] + c['HIJ_MORT']
+    known = ~np.isnan(parts) & ~np.isnan(c['HIJ_TOTAL'])
+    return known & (c['HIJ_TOTAL'] != parts)
+
+
+RULES = [
+    # Sin ANO_NAC también cuenta como año distinto al del archivo
+    Rule('year_mismatch', 'Registros con ANO_NAC diferente a {year}',
+         ['ANO_NAC'], lambda c, year: ~(c['ANO_NAC'] == year), needs_year=True),
+    Rule('invalid_day', 'Días de nacimiento inválidos (< 1 o > 31)',
+         ['DIA_NAC'], lambda c, year: _out_of_range(c['DIA_NAC'], 1, 31)),
+    Rule('invalid_month', 'Meses de nacimiento inválidos (< 1 o > 12)',
+         ['MES_NAC'], lambda c, year: _out_of_range(c['MES_NAC'], 1, 12)),
+    Rule('impossible_date', 'Fechas inexistentes (31-04, 30-02, 29-02 en año no bisiesto)',
+         ['DIA_NAC', 'MES_NAC'], _impossible_date),
+    Rule('peso_out_of_range', 'PESO fuera de 300-7000 g (sin contar 9999)',
+         ['PESO'], lambda c, year: _out_of_range(c['PESO'], 300, 7000, UNKNOWN_CODES['PESO'])),
+    Rule('talla_out_of_range', 'TALLA fuera de 20-70 cm (sin contar 99)',
+         ['TALLA'], lambda c, year: _out_of_range(c['TALLA'], 20, 70, UNKNOWN_CODES['TALLA'])),
+    Rule('semanas_out_of_range', 'SEMANAS fuera de 20-45 (sin contar 99)',
+         ['SEMANAS'], lambda c, year: _out_of_range(c['SEMANAS'], 20, 45, UNKNOWN_CODES['SEMANAS'])),
+    Rule('edad_m_out_of_range', 'EDAD_M fuera de 10-60 años (sin contar 99)',
+         ['EDAD_M'], lambda c, year: _out_of_range(c['EDAD_M'], 10, 60, UNKNOWN_CODES['EDAD_M'])),
+    Rule('peso_semanas_inconsistent', 'PESO incompatible con SEMANAS (>= 4000 g con < 28 semanas o < 1000 g con >= 40)',
+         ['PESO', 'SEMANAS'],
+         lambda c, year: (
+             ((c['PESO'] >= 4000) & (c['PESO'] != UNKNOWN_CODES['PESO']) & (c['SEMANAS'] < 28))
+             | ((c['PESO'] < 1000) & (c['SEMANAS'] >= 40) & (c['SEMANAS'] != UNKNOWN_CODES['SEMANAS']))
+         )),
+    Rule('hijos_total_mismatch', 'HIJ_TOTAL distinto de HIJ_VIVOS + HIJ_FALL + HIJ_MORT',
+         ['HIJ_TOTAL', 'HIJ_VIVOS', 'HIJ_FALL', 'HIJ_MORT'], _children_mismatch),
+]
+
+
+def _column_arrays(df, columns):
+    """Columnas canónicas pedidas como float64 (una conversión por columna)"""
+    arrays = {}
+    for col in df.columns:
+        name = canonical_name(col)
+        if name in columns and name not in arrays:
+            series = df[col]
+            if not pd.api.types.is_numeric_dtype(series):
+                series = pd.to_numeric(series, errors='coerce')
+            arrays[name] = series.to_numpy(dtype='float64', na_value=np.nan)
+    return arrays
+
+
+class AnomalyRules:
+    """
+    Evaluador de reglas acumulable por chunks
+    
+    Cada update extrae una vez las columnas que usan las reglas y evalúa
+    todas sobre esos arreglos. Guarda los conteos y, si keep_rows, las
+    posiciones de las filas marcadas (pocas, por ser anomalías), de las que
+    bitmap() arma un mapa de bits de 1 bit por fila.
+    """
+    
+    def __init__(self, year=None, rules=RULES, keep_rows=False):
+        self.year = year
+        self.rules = list(rules)
+        self.keep_rows = keep_rows
+        self.total_rows = 0
+        self.applied = set()
+        self.counts = {rule.name: 0 for rule in self.rules}
+        self._rows = {rule.name: [] for rule in self.rules}
+    
+    def update(self, df):
+        """Evalúa todas las reglas sobre un chunk"""
+        needed = {col for rule in self.rules for col in rule.columns}
+        arrays = _column_arrays(df, needed)
+        
+        for rule in self.rules:
+            if not rule.applies(arrays, self.year):
+                continue
+            self.applied.add(rule.name)
+            mask = rule.check(arrays, self.year)
+            self.counts[rule.name] += int(np.count_nonzero(mask))
+            if self.keep_rows:
+                self._rows[rule.name].append(np.flatnonzero(mask) + self.total_rows)
+        
+        self.total_rows += len(df)
+        return self
+    
+    def rows(self, name):
+        """Posiciones (desde 0) de las filas marcadas por una regla"""
+        if not self.keep_rows:
+            raise ValueError("AnomalyRules se creó con keep_rows=False")
+        parts = self._rows[name]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+    
+    def bitmap(self, name):
+        """Mapa de bits de la regla: bit i (orden little) = fila i marcada"""
+        mask = np.zeros(self.total_rows, dtype=bool)
+        mask[self.rows(name)] = True
+        return np.packbits(mask, bitorder='little')
+    
+    def report(self):
+        """Anomalías con al menos una fila, en el formato de analysis['anomalies']"""
+        anomalies = []
+        for rule in self.rules:
+            count = self.counts[rule.name]
+            if rule.name not in self.applied or count == 0:
+                continue
+            anomalies.append({
+                'type': rule.name,
+                'description': rule.description.format(year=self.year),
+                'count': count,
+                'percentage': round(count / self.total_rows * 100, 2) if self.total_rows else 0.0
+            })
+        return anomalies
@@ -0,0 +1,123 @@
+"""
+Muestreo de filas de archivos NAC por offsets de bytes
+Selección reproducible de filas sobre el índice de offsets (nac_offsets):
+solo se leen y parsean las filas elegidas
+"""
+
+import mmap
+import zlib
+import numpy as np
+from pathlib import Path
+
+from nac_io import candidate_read_configs
+from nac_offsets import header_columns, load_row_offsets, read_row_positions, row_count
+from nac_schema import canonical_name
+
+DEFAULT_SEED = 42
+
+
+def sample_positions(n_rows, n, seed=DEFAULT_SEED, key='', strata=None):
+    """
+    Posiciones (0 = primera fila de datos) de una muestra sin reemplazo
+    
+    El generador se inicializa con (seed, crc32(key)): la misma semilla da
+    la misma muestra en cada ejecución, y cada archivo (key = nombre) tiene
+    su propia secuencia.
+    
+    Args:
+        strata: arreglo con el estrato de cada fila (por ejemplo el mes); si
+            se entrega, cada estrato recibe una parte proporcional a su
+            tamaño (resto mayor) y se muestrea por separado
+    
+    Returns:
+        np.ndarray: int64 ordenado
+    """
+    if n >= n_rows:
+        return np.arange(n_rows, dtype=np.int64)
+    
+    rng = np.random.default_rng([seed, zlib.crc32(str(key).encode())])
+    if strata is None:
+        return np.sort(rng.choice(n_rows, size=n, replace=False)).astype(np.int64)
+    
+    values, group, sizes = np.unique(strata, return_inverse=True, return_counts=True)
+    quota = sizes * n / n_rows
+    allocation = np.floor(quota).astype(np.int64)
+    remainder_order = np.argsort(-(quota - allocation), kind='stable')
+    allocation[remainder_order[:n - allocation.sum()]] += 1
+    
+    members = np.argsort(group, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    chosen = [
+        members[bounds[g]:bounds[g + 1]][rng.choice(sizes[g], size=allocation[g], replace=False)]
+        for g in range(len(values))
+    ]
+    return np.sort(np.concatenate(chosen)).astype(np.int64)
+
+
+def _field_codes(data, starts, ends, field, sep):
+    """
+    Valor entero de un campo en cada línea, leído de los bytes
+    
+    Solo para campos numéricos cortos (hasta 4 dígitos, como MES_NAC);
+    vacíos o no numéricos quedan en -1.
+    """
+    seps = np.flatnonzero(data == ord(sep))
+    first = np.searchsorted(seps, starts)
+    
+    field_start = starts if field == 0 else seps[np.minimum(first + field - 1, len(seps) - 1)] + 1
+    next_sep = seps[np.minimum(first + field, len(seps) - 1)] if len(seps) else ends
+    field_end = np.where((next_sep < ends) & (next_sep >= field_start), next_sep, ends)
+    
+    # Hasta 4 bytes por campo: dígitos, ignorando comillas, espacios, \r y
+    # el salto de línea del último campo
+    values = np.zeros(len(starts), dtype=np.int64)
+    digits = np.zeros(len(starts), dtype=np.int64)
+    valid = np.ones(len(starts), dtype=bool)
+    for i in range(4):
+        pos = np.minimum(field_start + i, len(data) - 1)
+        inside = field_start + i < field_end
+        byte = data[pos]
+        is_digit = inside & (byte >= ord('0')) & (byte <= ord('9'))
+        ignored = inside & np.isin(byte, [ord('"'), ord('\r'), ord('\n'), ord(' ')])
+        valid &= ~inside | is_digit | ignored
+        values = np.where(is_digit, values * 10 + (byte.astype(np.int64) - ord('0')), values)
+        digits += is_digit
+    
+    return np.where(valid & (digits > 0), values, -1)
+
+
+def read_sample(csv_path, n, seed=DEFAULT_SEED, usecols=None, harmonize=False, by_month=False):
+    """
+    Muestra reproducible de n filas de un NAC_*.csv sin parsear el archivo
+    
+    Usa el índice de offsets guardado junto al archivo para copiar solo las
+    líneas elegidas (más el encabezado) y las parsea con la configuración
+    detectada para el archivo.
+    
+    Args:
+        n: filas a muestrear (todas si el archivo tiene menos)
+        seed: semilla; junto con el nombre del archivo fija la muestra
+        usecols / harmonize: como en read_nac_file
+        by_month: muestra estratificada por MES_NAC (proporcional a cada mes)
+    
+    Returns:
+        pd.DataFrame: filas elegidas, con índice = posición de la fila en el
+            archivo (igual que df.sample sobre la lectura completa)
+    """
+    csv_path = Path(csv_path)
+    _, _, config = candidate_read_configs(csv_path)
+    offsets = load_row_offsets(csv_path)
+    n_rows = row_count(offsets)
+    
+    strata = None
+    if by_month and n_rows:
+        with open(csv_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            columns = [canonical_name(col) for col in header_columns(mm[0:int(offsets[1])], config)]
+            if 'MES_NAC' in columns:
+                data = np.frombuffer(mm, dtype=np.uint8)
+                strata = _field_codes(data, offsets[1:-1].astype(np.int64), offsets[2:].astype(np.int64),
+                                      columns.index('MES_NAC'), config['sep'])
+                del data
+    
+    positions = sample_positions(n_rows, n, seed, csv_path.name, strata)
+    return read_row_positions(csv_path, positions, usecols=usecols, harmonize=harmonize, offsets=offsets)
@@ -0,0 +1,212 @@
+"""
+Esquema canónico de los archivos NAC (1990-2017)
+Mapeo declarativo de nombres de columna entre años y dtype fijo por concepto
+"""
+
+import pandas as pd
+import numpy as np
+
+# Nombre usado en algún año -> nombre canónico (el de 1996-2017)
+COLUMN_ALIASES = {
+    'TIPO_ATENC': 'ATENC_PART',   # 1990-1995
+    'LUGAR_PART': 'LOCAL_PART',   # 1990-1995
+    'CATEG_PA': 'CATEG_P',        # 1990
+    'EST_CIV_M': 'EST_CIVI_M',    # 1990-1995
+    'ECIV_M': 'EST_CIVI_M',       # 1991
+    'URB_RURAL': 'URBA_RURAL',    # 1990-1995
+    'AREA': 'URBA_RURAL',         # 1991
+    'RES_SERV': 'SERV_RES',       # 1991
+    'RES_REG': 'REG_RES',         # 1991
+    'HIJ_NACM': 'HIJ_MORT',       # 1991
+    'CONDACT_P': 'ACTIV_P',       # 1991
+    'CONDACT_M': 'ACTIV_M',       # 1991
+}
+
+# dtype canónico por columna. Enteros nullable: una columna con algún
+# vacío en un año no obliga a pasar todo el corpus a float64.
+CANONICAL_DTYPES = {
+    'SEXO': 'Int8',
+    'DIA_NAC': 'Int8',
+    'MES_NAC': 'Int8',
+    'ANO_NAC': 'Int16',
+    'TIPO_PARTO': 'Int8',
+    'ATENC_PART': 'Int8',
+    'LOCAL_PART': 'Int8',
+    'SEMANAS': 'Int8',
+    'PESO': 'Int16',
+    'TALLA': 'Int8',
+    'EDAD_P': 'Int8',
+    'CURSO_P': 'Int8',
+    'NIVEL_P': 'Int8',
+    'ACTIV_P': 'Int8',
+    'OCUPA_P': 'category',
+    'CATEG_P': 'Int8',
+    'GRUPO_P': 'Int16',
+    'EDAD_M': 'Int8',
+    'EST_CIVI_M': 'Int8',
+    'CURSO_M': 'Int8',
+    'NIVEL_M': 'Int8',
+    'ACTIV_M': 'Int8',
+    'OCUPA_M': 'category',
+    'CATEG_M': 'Int8',
+    'GRUPO_M': 'Int16',
+    'COMUNA': 'Int16',
+    'URBA_RURAL': 'Int8',
+    'HIJ_VIVOS': 'Int8',
+    'HIJ_FALL': 'Int8',
+    'HIJ_MORT': 'Int8',
+    'HIJ_TOTAL': 'Int8',
+    'REG_RES': 'Int8',
+    'SERV_RES': 'Int8',
+    'ESTAB': 'category',
+    'NAC_MA': 'category',
+}
+
+# Si los valores no caben en el dtype canónico se usa el siguiente
+_WIDER_INT = {'Int8': 'Int16', 'Int16': 'Int32', 'Int32': 'Int64'}
+
+# dtype con que el parser lee las columnas enteras. Ni el parser C ni el de
+# pyarrow validan el rango del entero pedido: 300 en Int8 queda como 44 y
+# 70000 en Int16 como 4464, sin error. Por eso no se le pasan al parser los
+# dtypes canónicos Int8/Int16: se parsea a Int32 y cast_canonical reduce
+# cada columna con verificación de rango. Int32 tampoco se valida (desborda
+# desde 2**31), pero los códigos NAC tienen a lo sumo 5 dígitos.
+PARSE_INT_DTYPE = 'Int32'
+
+
+def canonical_name(column):
+    """Nombre canónico de una columna (mayúsculas, sin espacios, con alias resuelto)"""
+    name = str(column).upper().strip()
+    return COLUMN_ALIASES.get(name, name)
+
+
+def cast_canonical(series, dtype):
+    """
+    Convierte una serie a su dtype canónico
+    
+    Los valores no numéricos en columnas enteras quedan como nulos; si el
+    rango no cabe en el entero canónico se usa uno más ancho, y si hay
+    decimales se usa Float32 (Float64 si Float32 redondearía algún valor).
+    """
+    if dtype == 'category':
+        # Códigos como texto: 5, 5.0 y '5' de distintos años son la misma categoría
+        if pd.api.types.is_numeric_dtype(series):
+            series = cast_canonical(series, 'Int64')
+        return series.astype('string').astype('category')
+    
+    numeric = pd.to_numeric(series, errors='coerce')
+    valid = numeric.dropna()
+    
+    if len(valid) and not np.array_equal(valid, np.round(valid)):
+        # Float32 solo si no redondea ningún valor
+        compact = numeric.astype('Float32')
+        lossless = np.array_equal(compact.dropna().to_numpy('float64'), valid.to_numpy('float64'))
+        return compact if lossless else numeric.astype('Float64')
+    
+    while dtype in _WIDER_INT:
+        info = np.iinfo(dtype.lower())
+        if not len(valid) or (valid.min() >= info.min and valid.max() <= info.max):
+            break
+        dtype = _WIDER_INT[dtype]
+    
+    return numeric.astype(dtype)
+
+
+def reader_dtypes():
+    """
+    Mapa de dtypes para pd.read_csv, por nombre crudo de columna
+    
+    Incluye los alias de cada columna para que cualquier año se parsee
+    directamente a PARSE_INT_DTYPE o category, sin pasar por
+    int64/float64/object; el dtype canónico final lo da harmonize_columns.
+    """
+    raw_names = {name: [name] for name in CANONICAL_DTYPES}
+    for alias, name in COLUMN_ALIASES.items():
+        raw_names.setdefault(name, []).append(alias)
+    
+    dtypes = {}
+    for name, dtype in CANONICAL_DTYPES.items():
+        parse_dtype = 'category' if dtype == 'category' else PARSE_INT_DTYPE
+        for raw_name in raw_names[name]:
+            dtypes[raw_name] = parse_dtype
+    return dtypes
+
+
+def memory_report(df):
+    """
+    Reporte de memoria por columna
+    
+    Compara el uso actual con el que tendría la misma columna con los tipos
+    por defecto de pandas (int64/float64 para números, object para texto).
+    
+    Returns:
+        pd.DataFrame: dtype, MB actuales y MB con tipos por defecto por columna
+    """
+    rows = []
+    for col in df.columns:
+        series = df[col]
+        current = series.memory_usage(deep=True, index=False)
+        if pd.api.types.is_numeric_dtype(series):
+            default = len(series) * 8
+        else:
+            default = series.astype(object).memory_usage(deep=True, index=False)
+        rows.append({
+            'column': col,
+            'dtype': str(series.dtype),
+            'mb': current / 1024**2,
+            'default_mb': default / 1024**2
+        })
+    
+    report = pd.DataFrame(rows).set_index('column')
+    report.loc['TOTAL'] = ['', report['mb'].sum(), report['default_mb'].sum()]
+    return report.round(3)
+
+
+def harmonize_columns(df):
+    """
+    Aplica el esquema canónico a un DataFrame de un año
+    
+    Renombra las columnas según COLUMN_ALIASES y convierte cada una a su
+    dtype de CANONICAL_DTYPES; las columnas desconocidas se conservan tal cual.
+    Así la concatenación de años produce una columna compacta por concepto
+    en lugar de columnas duplicadas rellenas con NaN.
+    """
+    renamed = {}
+    for col in df.columns:
+        name = canonical_name(col)
+        if name in renamed:
+            # Dos nombres del mismo concepto en un mismo archivo: se combinan
+            renamed[name] = renamed[name].combine_first(df[col])
+        else:
+            renamed[name] = df[col]
+    
+    for name, series in renamed.items():
+        if name in CANONICAL_DTYPES and str(series.dtype) != CANONICAL_DTYPES[name]:
+            renamed[name] = cast_canonical(series, CANONICAL_DTYPES[name])
+    
+    return pd.DataFrame(renamed, index=df.index)
+
+
+def concat_years(frames):
+    """
+    Concatena DataFrames ya armonizados conservando las columnas categóricas
+    
+    pd.concat convierte a object las categóricas con categorías distintas;
+    aquí se unifican las categorías antes de concatenar.
+    """
+    frames = list(frames)
+    categorical_cols = {
+        col for df in frames for col in df.columns
+        if isinstance(df[col].dtype, pd.CategoricalDtype)
+    }
+    
+    for col in categorical_cols:
+        categories = pd.Index([])
+        for df in frames:
+            if col in df.columns:
+                categories = categories.union(df[col].astype('category').cat.categories)
+        for i, df in enumerate(frames):
+            if col in df.columns:
+                frames[i] = df.assign(**{col: df[col].astype(pd.CategoricalDtype(categories))})
+    
+    return pd.concat(frames, ignore_index=True)
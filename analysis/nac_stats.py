@@ -0,0 +1,633 @@
+"""
+Estadísticas exactas del corpus NAC en una sola pasada
+Acumuladores mergeables (histogramas enteros, covarianza de Welford) que se
+actualizan año por año sin mantener el corpus completo en memoria
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import json
+
+from nac_cache import read_nac_file
+from nac_dates import ORDINAL_COLUMN, date_ordinal, ordinal_parts
+from nac_io import file_fingerprint
+
+# Columnas que necesita CorpusStats
+STATS_COLUMNS = [
+    'DIA_NAC', 'MES_NAC', 'ANO_NAC',
+    'PESO', 'TALLA', 'EDAD_P', 'EDAD_M'
+]
+
+# Pares de variables para covarianza/correlación: (x, y, rango x, rango y).
+# Los rangos son abiertos, iguales a los filtros de los notebooks.
+CORRELATION_PAIRS = {
+    'peso_talla': ('PESO', 'TALLA', (0, 9999), (0, 99)),
+    'edad_padres': ('EDAD_P', 'EDAD_M', (10, 100), (10, 100)),
+}
+
+# Variables con histograma completo (cuartiles y outliers IQR)
+HISTOGRAM_VARS = ['PESO', 'TALLA', 'EDAD_P', 'EDAD_M']
+
+# Estadísticos suficientes de un par: n, Σx, Σy, Σx², Σy², Σxy
+SUM_COLUMNS = ['n', 'sx', 'sy', 'sxx', 'syy', 'sxy']
+
+# Manifiesto junto a los CSV con los estadísticos suficientes por archivo
+PAIR_STATS_MANIFEST = '.pair_stats.json'
+
+
+def _as_float(series):
+    """Columna (nullable o no) como float64 con NaN para los nulos"""
+    return series.to_numpy(dtype='float64', na_value=np.nan)
+
+
+def _integral(values):
+    """Máscara de los valores finitos y enteros de un arreglo float64"""
+    return np.isfinite(values) & (values == np.round(values))
+
+
+class CovarianceAccumulator:
+    """
+    Media, varianzas y covarianza de (x, y) acumuladas por lotes
+    
+    Cada lote se resume con sus momentos centrados y se combina con el
+    acumulado mediante la fórmula de Chan et al. (Welford por lotes), que es
+    estable numéricamente y permite sumar acumuladores de distintos años.
+    """
+    
+    def __init__(self):
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+        self.c_xy = 0.0
+    
+    @classmethod
+    def from_moments(cls, n, mean_x, mean_y, m2_x, m2_y, c_xy):
+        acc = cls()
+        acc.n = int(n)
+        acc.mean_x, acc.mean_y = float(mean_x), float(mean_y)
+        acc.m2_x, acc.m2_y, acc.c_xy = float(m2_x), float(m2_y), float(c_xy)
+        return acc
+    
+    @classmethod
+    def from_sums(cls, n, sx, sy, sxx, syy, sxy):
+        """
+        Acumulador a partir de sumas (n, Σx, Σy, Σx², Σy², Σxy)
+        
+        Con sumas enteras los momentos centrados se calculan con enteros de
+        Python (sin redondeo) y solo la división final es de punto flotante.
+        """
+        sums = [int(v) if float(v).is_integer() else float(v) for v in (sx, sy, sxx, syy, sxy)]
+        sx, sy, sxx, syy, sxy = sums
+        n = int(n)
+        if n == 0:
+            return cls()
+        return cls.from_moments(
+            n, sx / n, sy / n,
+            (n * sxx - sx * sx) / n,
+            (n * syy - sy * sy) / n,
+            (n * sxy - sx * sy) / n
+        )
+    
+    def update(self, x, y):
+        """Agrega un lote de pares (arrays sin nulos)"""
+        x = np.asarray(x, dtype='float64')
+        y = np.asarray(y, dtype='float64')
+        if not len(x):
+            return self
+        
+        dx = x - x.mean()
+        dy = y - y.mean()
+        batch = CovarianceAccumulator.from_moments(
+            len(x), x.mean(), y.mean(), dx @ dx, dy @ dy, dx @ dy
+        )
+        return self.merge(batch)
+    
+    def merge(self, other):
+        """Combina otro acumulador en este (in place)"""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean_x, self.mean_y = other.n, other.mean_x, other.mean_y
+            self.m2_x, self.m2_y, self.c_xy = other.m2_x, other.m2_y, other.c_xy
+            return self
+        
+        n = self.n + other.n
+        delta_x = other.mean_x - self.mean_x
+        delta_y = other.mean_y - self.mean_y
+        weight = self.n * other.n / n
+        
+        self.m2_x += other.m2_x + delta_x * delta_x * weight
+        self.m2_y += other.m2_y + delta_y * delta_y * weight
+        self.c_xy += other.c_xy + delta_x * delta_y * weight
+        self.mean_x += delta_x * other.n / n
+        self.mean_y += delta_y * other.n / n
+        self.n = n
+        return self
+    
+    def cov(self):
+        """Covarianza muestral (ddof=1, igual que pandas)"""
+        return self.c_xy / (self.n - 1) if self.n > 1 else np.nan
+    
+    def corr(self):
+        """Correlación de Pearson"""
+        denominator = np.sqrt(self.m2_x * self.m2_y)
+        return self.c_xy / denominator if self.n > 1 and denominator > 0 else np.nan
+
+
+class IntHistogram:
+    """
+    Histograma exacto de una variable entera
+    
+    Las variables NAC son enteros acotados (PESO < 10000, edades < 100), así
+    que un conteo por valor ocupa pocos KB y da cuartiles exactos sin ordenar
+    ni guardar las filas. El rango crece automáticamente con los datos.
+    """
+    
+    def __init__(self):
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+        # Valores no enteros (o infinitos) omitidos
+        self.skipped = 0
+    
+    @property
+    def n(self):
+        return int(self.counts.sum())
+    
+    def _extend(self, low, high):
+        """Amplía el rango cubierto para incluir [low, high]"""
+        if not len(self.counts):
+            self.offset = low
+            self.counts = np.zeros(high - low + 1, dtype=np.int64)
+            return
+        
+        new_offset = min(self.offset, low)
+        new_size = max(self.offset + len(self.counts), high + 1) - new_offset
+        if new_offset != self.offset or new_size != len(self.counts):
+            counts = np.zeros(new_size, dtype=np.int64)
+            start = self.offset - new_offset
+            counts[start:start + len(self.counts)] = self.counts
+            self.offset, self.counts = new_offset, counts
+    
+    def update(self, values):
+        """
+        Agrega valores (Series o array); los nulos se ignoran y los no
+        enteros se omiten y se cuentan en skipped
+        """
+        if isinstance(values, pd.Series):
+            values = _as_float(values)
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        integral = _integral(values)
+        self.skipped += int(np.count_nonzero(~integral))
+        values = values[integral]
+        if not len(values):
+            return self
+        
+        values = values.astype(np.int64)
+        low, high = int(values.min()), int(values.max())
+        self._extend(low, high)
+        self.counts += np.bincount(values - self.offset, minlength=len(self.counts))
+        return self
+    
+    def add_counts(self, offset, counts):
+        """Suma conteos por valor que empiezan en el valor offset"""
+        if len(counts):
+            self._extend(offset, offset + len(counts) - 1)
+            start = offset - self.offset
+            self.counts[start:start + len(counts)] += counts
+        return self
+    
+    def merge(self, other):
+        """Suma otro histograma en este (in place)"""
+        self.skipped += other.skipped
+        return self.add_counts(other.offset, other.counts)
+    
+    def quantile(self, q):
+        """Cuantil exacto con interpolación lineal (igual que Series.quantile)"""
+        n = self.n
+        if n == 0:
+            return np.nan
+        
+        position = (n - 1) * q
+        lower = int(np.floor(position))
+        upper = min(lower + 1, n - 1)
+        
+        # Valor en la posición k del arreglo ordenado: primer bin con cumsum > k
+        cumulative = np.cumsum(self.counts)
+        values = np.searchsorted(cumulative, [lower, upper], side='right') + self.offset
+        return values[0] + (position - lower) * (values[1] - values[0])
+    
+    def count_outside(self, lower, upper):
+        """Cantidad de valores < lower o > upper"""
+        values = np.arange(self.offset, self.offset + len(self.counts))
+        return int(self.counts[(values < lower) | (values > upper)].sum())
+
+
+class OutlierStats:
+    """
+    Cuartiles y outliers IQR exactos por variable y por año
+    
+    Guarda un IntHistogram por (variable, año); los histogramas globales se
+    obtienen sumándolos. Como los conteos por valor son exactos, Q1/Q3 y la
+    cantidad de filas fuera de [Q1 - 1.5·IQR, Q3 + 1.5·IQR] salen de los
+    histogramas sin una segunda pasada ni copias de la columna.
+    """
+    
+    def __init__(self, variables=HISTOGRAM_VARS):
+        # variable -> año -> IntHistogram (None = año desconocido)
+        self.histograms = {var: {} for var in variables}
+        # variable -> valores no enteros omitidos
+        self.skipped = {var: 0 for var in variables}
+    
+    def update(self, df):
+        """Agrega un DataFrame con nombres canónicos"""
+        years = _as_float(df['ANO_NAC']) if 'ANO_NAC' in df.columns else np.full(len(df), np.nan)
+        
+        for var, by_year in self.histograms.items():
+            if var not in df.columns:
+                continue
+            values = _as_float(df[var])
+            known = ~np.isnan(values)
+            values, value_years = values[known], years[known]
+            
+            # Un PESO con decimales no cabe en el histograma: se omite y se cuenta
+            integral = _integral(values)
+            self.skipped[var] = self.skipped.get(var, 0) + int(np.count_nonzero(~integral))
+            values, value_years = values[integral], value_years[integral]
+            if not len(values):
+                continue
+            
+            # Un solo bincount 2D (año x valor) para todo el DataFrame
+            values = values.astype(np.int64)
+            low, span = int(values.min()), int(values.max() - values.min()) + 1
+            keys, group = np.unique(np.where(np.isnan(value_years), -1, value_years), return_inverse=True)
+            counts = np.bincount(group * span + (values - low), minlength=len(keys) * span)
+            counts = counts.reshape(len(keys), span)
+            
+            for i, key in enumerate(keys):
+                year = int(key) if key >= 0 else None
+                by_year.setdefault(year, IntHistogram()).add_counts(low, counts[i])
+        
+        return self
+    
+    def merge(self, other):
+        for var, count in other.skipped.items():
+            self.skipped[var] = self.skipped.get(var, 0) + count
+        for var, by_year in other.histograms.items():
+            for year, histogram in by_year.items():
+                self.histograms.setdefault(var, {}).setdefault(year, IntHistogram()).merge(histogram)
+        return self
+    
+    def histogram(self, var):
+        """Histograma global de una variable (todos los años)"""
+        total = IntHistogram()
+        for histogram in self.histograms[var].values():
+            total.merge(histogram)
+        return total
+    
+    def summary(self):
+        """
+        Tabla por variable: cuartiles, límites IQR y outliers
+        
+        Returns:
+            pd.DataFrame: n, Q1, Q3, IQR, lower, upper, outliers, pct y
+                skipped (valores no enteros que no entraron en el histograma)
+        """
+        rows = []
+        for var in self.histograms:
+            histogram = self.histogram(var)
+            if histogram.n == 0:
+                continue
+            q1, q3 = histogram.quantile(0.25), histogram.quantile(0.75)
+            iqr = q3 - q1
+            lower, upper = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+            outliers = histogram.count_outside(lower, upper)
+            rows.append({
+                'variable': var, 'n': histogram.n,
+                'Q1': q1, 'Q3': q3, 'IQR': iqr,
+                'lower': lower, 'upper': upper,
+                'outliers': outliers, 'pct': outliers / histogram.n * 100,
+                'skipped': self.skipped.get(var, 0)
+            })
+        return pd.DataFrame(rows).set_index('variable')
+    
+    def by_year(self):
+        """
+        Tabla por año y variable con los límites globales de summary()
+        
+        Returns:
+            pd.DataFrame: n, Q1 y Q3 del año, outliers y pct, indexado por
+                (year, variable)
+        """
+        limits = self.summary()
+        rows = []
+        for var, by_year in self.histograms.items():
+            if var not in limits.index:
+                continue
+            lower, upper = limits.loc[var, 'lower'], limits.loc[var, 'upper']
+            for year, histogram in sorted((y, h) for y, h in by_year.items() if y is not None):
+                outliers = histogram.count_outside(lower, upper)
+                rows.append({
+                    'year': year, 'variable': var, 'n': histogram.n,
+                    'Q1': histogram.quantile(0.25), 'Q3': histogram.quantile(0.75),
+                    'outliers': outliers, 'pct': outliers / histogram.n * 100
+                })
+        columns = ['year', 'variable', 'n', 'Q1', 'Q3', 'outliers', 'pct']
+        return pd.DataFrame(rows, columns=columns).set_index(['year', 'variable'])
+
+
+def calendar_month_day(df):
+    """
+    Mes y día (int64) de las filas con fecha válida en el calendario
+    
+    Usa la columna ordinal si el DataFrame ya la tiene; si no, la calcula
+    desde (ANO_NAC, MES_NAC, DIA_NAC). En ambos casos quedan fuera las filas
+    sin año, porque no se puede saber si un 29-02 existe.
+    """
+    if ORDINAL_COLUMN in df.columns:
+        ordinal = df[ORDINAL_COLUMN].dropna().to_numpy(dtype=np.int64)
+    elif 'ANO_NAC' in df.columns:
+        ordinal, valid = date_ordinal(df['ANO_NAC'], df['MES_NAC'], df['DIA_NAC'])
+        ordinal = ordinal[valid]
+    else:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    
+    _, months, days = ordinal_parts(ordinal)
+    return months, days
+
+
+class DateHistogram:
+    """
+    Frecuencia de nacimientos por día del año (sin considerar el año)
+    
+    Cada fecha válida se reduce a la clave entera mes * 32 + día y se cuenta
+    con np.bincount: 416 contadores en lugar de un string 'MM-DD' por fila.
+    Las etiquetas se generan solo para los días pedidos en top().
+    """
+    
+    SIZE = 13 * 32
+    
+    def __init__(self):
+        self.counts = np.zeros(self.SIZE, dtype=np.int64)
+    
+    def update(self, df):
+        """Agrega las filas con fecha válida en el calendario"""
+        months, days = calendar_month_day(df)
+        return self.add(months, days)
+    
+    def add(self, months, days):
+        """Agrega arreglos enteros de mes y día ya validados"""
+        self.counts += np.bincount(months * 32 + days, minlength=self.SIZE)
+        return self
+    
+    def merge(self, other):
+        self.counts += other.counts
+        return self
+    
+    @property
+    def n(self):
+        return int(self.counts.sum())
+    
+    def top(self, k=10):
+        """
+        Los k días más frecuentes (empates: primero la fecha menor)
+        
+        Returns:
+            pd.DataFrame: month, day y count indexados por la etiqueta 'MM-DD'
+        """
+        # Orden estable por conteo descendente: en empates queda la clave menor
+        keys = np.argsort(-self.counts, kind='stable')[:k]
+        keys = keys[self.counts[keys] > 0]
+        months, days = keys // 32, keys % 32
+        return pd.DataFrame(
+            {'month': months, 'day': days, 'count': self.counts[keys]},
+            index=pd.Index([f"{m:02d}-{d:02d}" for m, d in zip(months, days)], name='MD')
+        )
+
+
+class CorpusStats:
+    """
+    Agregados exactos del corpus, actualizados con un DataFrame por vez
+    
+    Reúne lo que calculan los Puntos 2, 3, 4, 5 y 7 de los notebooks:
+    frecuencia por mes y por día del año, covarianza/correlación global y
+    por año, y cuartiles/outliers IQR. La memoria usada no depende de la
+    cantidad de filas procesadas.
+    """
+    
+    def __init__(self):
+        self.rows = 0
+        self.month_counts = np.zeros(13, dtype=np.int64)
+        self.dates = DateHistogram()
+        # par -> año -> CovarianceAccumulator (None = año desconocido)
+        self.pairs = {pair: {} for pair in CORRELATION_PAIRS}
+        self.outliers = OutlierStats()
+    
+    def update(self, df):
+        """Agrega un DataFrame con nombres canónicos (un año o un chunk)"""
+        self.rows += len(df)
+        years = _as_float(df['ANO_NAC']) if 'ANO_NAC' in df.columns else np.full(len(df), np.nan)
+        
+        # Mes y día del año solo de fechas que existen en el calendario
+        if 'MES_NAC' in df.columns and 'DIA_NAC' in df.columns:
+            months, days = calendar_month_day(df)
+            self.month_counts += np.bincount(months, minlength=13)
+            self.dates.add(months, days)
+        
+        for pair, (col_x, col_y, range_x, range_y) in CORRELATION_PAIRS.items():
+            if col_x in df.columns and col_y in df.columns:
+                self._update_pair(pair, _as_float(df[col_x]), _as_float(df[col_y]),
+                                  years, range_x, range_y)
+        
+        self.outliers.update(df)
+        return self
+    
+    def _update_pair(self, pair, x, y, years, range_x, range_y):
+        """Momentos por año de un par, vectorizados con bincount"""
+        valid = ((x > range_x[0]) & (x < range_x[1]) &
+                 (y > range_y[0]) & (y < range_y[1]))
+        x, y, years = x[valid], y[valid], years[valid]
+        if not len(x):
+            return
+        
+        known = ~np.isnan(years)
+        keys, group = np.unique(np.where(known, years, -1), return_inverse=True)
+        
+        n = np.bincount(group)
+        mean_x = np.bincount(group, x) / n
+        mean_y = np.bincount(group, y) / n
+        dx = x - mean_x[group]
+        dy = y - mean_y[group]
+        m2_x = np.bincount(group, dx * dx)
+        m2_y = np.bincount(group, dy * dy)
+        c_xy = np.bincount(group, dx * dy)
+        
+        accumulators = self.pairs[pair]
+        for i, key in enumerate(keys):
+            year = int(key) if key >= 0 else None
+            batch = CovarianceAccumulator.from_moments(
+                n[i], mean_x[i], mean_y[i], m2_x[i], m2_y[i], c_xy[i]
+            )
+            accumulators.setdefault(year, CovarianceAccumulator()).merge(batch)
+    
+    def pair_total(self, pair):
+        """Acumulador global de un par (todos los años)"""
+        total = CovarianceAccumulator()
+        for acc in self.pairs[pair].values():
+            total.merge(acc)
+        return total
+    
+    def pair_by_year(self, pair, min_count=50):
+        """
+        Covarianza y correlación por año
+        
+        Returns:
+            pd.DataFrame: n, cov y corr indexados por año (años con más de
+                min_count pares válidos)
+        """
+        rows = [
+            {'year': year, 'n': acc.n, 'cov': acc.cov(), 'corr': acc.corr()}
+            for year, acc in sorted((y, a) for y, a in self.pairs[pair].items() if y is not None)
+            if acc.n > min_count
+        ]
+        return pd.DataFrame(rows, columns=['year', 'n', 'cov', 'corr']).set_index('year')
+
+
+def pair_sums(df, pair):
+    """
+    Estadísticos suficientes por año de un par, en una sola pasada (groupby)
+    
+    Las columnas enteras se suman en int64, así que las sumas son exactas y
+    se pueden combinar entre archivos sin perder precisión.
+    
+    Returns:
+        pd.DataFrame: SUM_COLUMNS indexadas por ANO_NAC (NaN = año desconocido)
+    """
+    col_x, col_y, range_x, range_y = CORRELATION_PAIRS[pair]
+    if col_x not in df.columns or col_y not in df.columns:
+        return pd.DataFrame(columns=SUM_COLUMNS, index=pd.Index([], name='ANO_NAC'))
+    
+    x, y = df[col_x], df[col_y]
+    valid = ((x > range_x[0]) & (x < range_x[1]) &
+             (y > range_y[0]) & (y < range_y[1])).fillna(False).to_numpy(dtype=bool)
+    
+    def values(series):
+        dtype = 'int64' if pd.api.types.is_integer_dtype(series) else 'float64'
+        return series[valid].to_numpy(dtype=dtype)
+    
+    x, y = values(x), values(y)
+    years = (df['ANO_NAC'][valid].to_numpy(dtype='float64', na_value=np.nan)
+             if 'ANO_NAC' in df.columns else np.full(len(x), np.nan))
+    
+    terms = pd.DataFrame({
+        'ANO_NAC': years, 'n': 1, 'sx': x, 'sy': y,
+        'sxx': x * x, 'syy': y * y, 'sxy': x * y
+    })
+    return terms.groupby('ANO_NAC', dropna=False)[SUM_COLUMNS].sum()
+
+
+def merge_pair_sums(tables):
+    """Suma tablas de pair_sums (de distintos archivos o chunks) por año"""
+    tables = [t for t in tables if len(t)]
+    if not tables:
+        return pd.DataFrame(columns=SUM_COLUMNS, index=pd.Index([], name='ANO_NAC'))
+    return pd.concat(tables).groupby(level=0, dropna=False).sum()
+
+
+def pair_table(sums, min_count=1):
+    """
+    Covarianza y correlación por año y global desde estadísticos suficientes
+    
+    Returns:
+        tuple: (CovarianceAccumulator global, pd.DataFrame con n, cov y corr
+            por año para los años con más de min_count pares)
+    """
+    total = CovarianceAccumulator.from_sums(*sums[SUM_COLUMNS].sum())
+    
+    rows = []
+    for year, row in sums[sums.index.notna()].sort_index().iterrows():
+        if row['n'] > min_count:
+            acc = CovarianceAccumulator.from_sums(*row[SUM_COLUMNS])
+            rows.append({'year': int(year), 'n': acc.n, 'cov': acc.cov(), 'corr': acc.corr()})
+    
+    return total, pd.DataFrame(rows, columns=['year', 'n', 'cov', 'corr']).set_index('year')
+
+
+def _sums_to_records(sums):
+    return [
+        {'year': None if pd.isna(year) else int(year),
+         **{col: row[col].item() if hasattr(row[col], 'item') else row[col] for col in SUM_COLUMNS}}
+        for year, row in sums.iterrows()
+    ]
+
+
+def _sums_from_records(records):
+    sums = pd.DataFrame(records, columns=['year'] + SUM_COLUMNS)
+    sums['year'] = sums['year'].astype('float64')
+    return sums.rename(columns={'year': 'ANO_NAC'}).set_index('ANO_NAC')
+
+
+def load_pair_stats(data_directory):
+    """Manifiesto de estadísticos suficientes por archivo ({} si no existe)"""
+    try:
+        with open(Path(data_directory) / PAIR_STATS_MANIFEST, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def update_pair_stats(data_directory):
+    """
+    Estadísticos suficientes por año de todos los pares, para todo el corpus
+    
+    Cada archivo se resume una vez y se guarda en PAIR_STATS_MANIFEST con su
+    huella (tamaño y mtime); al agregar o modificar un año solo se lee ese
+    archivo y se combina con los resúmenes guardados.
+    
+    Returns:
+        dict: par -> pd.DataFrame de SUM_COLUMNS por año (pair_sums combinadas)
+    """
+    data_directory = Path(data_directory)
+    manifest = load_pair_stats(data_directory)
+    csv_files = sorted(data_directory.glob('NAC_*.csv'))
+    
+    columns = ['ANO_NAC'] + sorted({col for pair in CORRELATION_PAIRS.values() for col in pair[:2]})
+    changed = False
+    
+    for csv_file in csv_files:
+        fingerprint = file_fingerprint(csv_file)
+        entry = manifest.get(csv_file.name)
+        if entry and entry.get('fingerprint') == fingerprint:
+            continue
+        
+        df = read_nac_file(csv_file, usecols=columns, harmonize=True)
+        manifest[csv_file.name] = {
+            'fingerprint': fingerprint,
+            'pairs': {pair: _sums_to_records(pair_sums(df, pair)) for pair in CORRELATION_PAIRS}
+        }
+        changed = True
+        print(f"✓ {csv_file.name}: estadísticos suficientes calculados")
+        del df
+    
+    # Quitar archivos que ya no existen
+    existing = {csv_file.name for csv_file in csv_files}
+    for name in [name for name in manifest if name not in existing]:
+        del manifest[name]
+        changed = True
+    
+    if changed:
+        try:
+            with open(data_directory / PAIR_STATS_MANIFEST, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+        except OSError as e:
+            print(f"⚠️  No se pudo guardar {PAIR_STATS_MANIFEST}: {e}")
+    
+    return {
+        pair: merge_pair_sums(
+            _sums_from_records(entry['pairs'][pair]) for entry in manifest.values()
+        )
+        for pair in CORRELATION_PAIRS
+    }
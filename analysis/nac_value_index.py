@@ -0,0 +1,236 @@
+"""
+Índice de valores distintos del corpus NAC
+Por archivo, año y columna: cada valor distinto con la cantidad de filas en que
+aparece. Las búsquedas por palabra clave o regex, los top-N por columna y las
+comparaciones entre años recorren solo este perfil, sin volver a leer los CSV.
+"""
+
+import pandas as pd
+from pathlib import Path
+import re
+import sys
+
+from nac_cache import cache_directory, parquet_available, read_nac_file
+from nac_io import file_fingerprint
+from nac_schema import CANONICAL_DTYPES, canonical_name, cast_canonical
+
+# Índice guardado junto a la caché columnar
+VALUE_INDEX_FILE = 'value_index.parquet'
+
+INDEX_COLUMNS = ['file', 'year', 'column', 'source_column', 'value', 'rows', 'size', 'mtime_ns']
+
+
+def _file_year(csv_path):
+    """Año del archivo según su nombre (NAC_1996.csv -> 1996)"""
+    match = re.search(r'(\d{4})', Path(csv_path).stem)
+    return int(match.group(1)) if match else None
+
+
+def _value_strings(series, column):
+    """Valores de una columna como texto, con el dtype canónico si se conoce"""
+    if column in CANONICAL_DTYPES:
+        series = cast_canonical(series, CANONICAL_DTYPES[column])
+    return series.astype('string')
+
+
+def index_file(csv_path):
+    """
+    Valores distintos y conteo de filas de cada columna de un archivo
+    
+    Returns:
+        pd.DataFrame: una fila por (columna, valor), con INDEX_COLUMNS
+    """
+    csv_path = Path(csv_path)
+    df = read_nac_file(csv_path)
+    fingerprint = file_fingerprint(csv_path)
+    
+    parts = []
+    for source_column in df.columns:
+        column = canonical_name(source_column)
+        counts = _value_strings(df[source_column], column).value_counts(dropna=False)
+        parts.append(pd.DataFrame({
+            'column': column,
+            'source_column': str(source_column).strip(),
+            'value': counts.index.astype('string'),
+            'rows': counts.to_numpy(dtype='int64')
+        }))
+    
+    index = pd.concat(parts, ignore_index=True)
+    index.insert(0, 'file', csv_path.name)
+    index.insert(1, 'year', _file_year(csv_path))
+    index['size'] = fingerprint['size']
+    index['mtime_ns'] = fingerprint['mtime_ns']
+    return index[INDEX_COLUMNS]
+
+
+def _compact(index):
+    """Columnas repetidas como categóricas: el índice ocupa pocos MB"""
+    index = index.astype({'year': 'Int16', 'rows': 'int64', 'size': 'int64', 'mtime_ns': 'int64'})
+    for col in ['file', 'column', 'source_column', 'value']:
+        index[col] = index[col].astype('category')
+    return index.reset_index(drop=True)
+
+
+def load_value_index(data_directory):
+    """Índice guardado (DataFrame vacío si no existe)"""
+    path = cache_directory(data_directory) / VALUE_INDEX_FILE
+    if not parquet_available() or not path.exists():
+        return pd.DataFrame(columns=INDEX_COLUMNS)
+    return pd.read_parquet(path)
+
+
+def build_value_index(data_directory, force=False):
+    """
+    Construye o actualiza el índice de valores de todos los NAC_*.csv
+    
+    Solo se vuelven a indexar los archivos nuevos o modificados (tamaño o
+    mtime distintos a los registrados en el índice).
+    
+    Returns:
+        pd.DataFrame: Índice completo
+    """
+    data_directory = Path(data_directory)
+    csv_files = sorted(data_directory.glob('NAC_*.csv'))
+    index = pd.DataFrame(columns=INDEX_COLUMNS) if force else load_value_index(data_directory)
+    
+    # Huella registrada por archivo
+    indexed = {
+        row.file: {'size': int(row.size), 'mtime_ns': int(row.mtime_ns)}
+        for row in index.drop_duplicates('file').itertuples()
+    }
+    fresh = [f.name for f in csv_files if indexed.get(f.name) == file_fingerprint(f)]
+    
+    parts = [index[index['file'].isin(fresh)]]
+    for csv_file in csv_files:
+        if csv_file.name in fresh:
+            continue
+        try:
+            parts.append(index_file(csv_file))
+            print(f"✓ {csv_file.name}: indexado")
+        except Exception as e:
+            print(f"✗ Error en {csv_file.name}: {e}")
+    
+    changed = len(fresh) != len(indexed) or len(parts) > 1
+    index = _compact(pd.concat(parts, ignore_index=True))
+    
+    if changed:
+        if parquet_available():
+            cache_directory(data_directory).mkdir(exist_ok=True)
+            index.to_parquet(cache_directory(data_directory) / VALUE_INDEX_FILE, index=False)
+        else:
+            print("⚠️  pyarrow no está instalado: el índice no se guarda en disco")
+    
+    return index
+
+
+def search_values(index, pattern, columns=None, years=None, case=False):
+    """
+    Busca una palabra clave o regex en los valores distintos del índice
+    
+    La expresión se evalúa una vez por valor distinto (el diccionario de
+    categorías), no por fila del corpus.
+    
+    Args:
+        index: índice de build_value_index / load_value_index
+        pattern: regex, por ejemplo 'AMBULANCIA|TRAYECTO'
+        columns: limitar a estas columnas (nombres canónicos)
+        years: limitar a estos años
+    
+    Returns:
+        pd.DataFrame: year, file, column, value y rows de cada coincidencia
+    """
+    if columns is not None:
+        index = index[index['column'].isin(columns)]
+    if years is not None:
+        index = index[index['year'].isin(years)]
+    
+    values = index['value'].astype('category').cat.categories.astype('string')
+    matches = values[values.str.contains(pattern, case=case, regex=True).fillna(False).to_numpy(dtype=bool)]
+    
+    result = index[index['value'].isin(matches)]
+    return (result[['year', 'file', 'column', 'value', 'rows']]
+            .astype({'file': str, 'column': str, 'value': str})
+            .sort_values(['year', 'column', 'rows'], ascending=[True, True, False])
+            .reset_index(drop=True))
+
+
+def column_values(index, column, year=None):
+    """Valores distintos de una columna canónica (y año) con su cantidad de filas"""
+    subset = index[index['column'] == column]
+    if year is not None:
+        subset = subset[subset['year'] == year]
+    return (subset.astype({'value': 'string'})
+            .groupby('value', dropna=False)['rows'].sum()
+            .sort_values(ascending=False))
+
+
+def top_values(index, column, year=None, n=10, dropna=True):
+    """
+    Los n valores más frecuentes de una columna, como value_counts().head(n)
+    
+    Args:
+        column: nombre canónico o nombre original de la columna en ese año
+    """
+    counts = column_values(index, canonical_name(column), year)
+    if dropna:
+        counts = counts[counts.index.notna()]
+    return counts.head(n)
+
+
+def compare_years(index, column, year_a, year_b):
+    """
+    Distribución de códigos de una columna en dos años
+    
+    Usa el nombre canónico, así que compara LUGAR_PART (1995) con
+    LOCAL_PART (1996) como la misma variable.
+    
+    Returns:
+        pd.DataFrame: filas (columnas year_a y year_b) y % ('<año>_pct') de
+            cada valor en ambos años y la diferencia en puntos porcentuales
+            (diff_pp), ordenado por valor
+    """
+    column = canonical_name(column)
+    counts = pd.DataFrame({
+        year_a: column_values(index, column, year_a),
+        year_b: column_values(index, column, year_b)
+    }).fillna(0).astype('int64')
+    
+    pct = counts / counts.sum().replace(0, 1) * 100
+    # join con rsuffix convertiría a texto también las columnas year_a y year_b
+    result = counts.copy()
+    for year in (year_a, year_b):
+        result[f'{year}_pct'] = pct[year].round(2)
+    result['diff_pp'] = (pct[year_b] - pct[year_a]).round(2)
+    
+    # Orden numérico cuando los códigos son números
+    numeric = pd.to_numeric(result.index.to_series(), errors='coerce')
+    return result.iloc[numeric.argsort(kind='stable')] if numeric.notna().all() else result.sort_index()
+
+
+def column_profile(index, year):
+    """
+    Resumen por columna de un año: nombre original, filas, nulos y distintos
+    
+    Returns:
+        pd.DataFrame: una fila por columna, en el orden del archivo
+    """
+    subset = index[index['year'] == year].astype({'column': str, 'source_column': str})
+    rows = []
+    for source_column, values in subset.groupby('source_column', sort=False):
+        nulls = values.loc[values['value'].isna(), 'rows'].sum()
+        rows.append({
+            'source_column': source_column,
+            'column': values['column'].iloc[0],
+            'rows': values['rows'].sum(),
+            'nulls': nulls,
+            'distinct': values['value'].notna().sum()
+        })
+    return pd.DataFrame(rows, columns=['source_column', 'column', 'rows', 'nulls', 'distinct'])
+
+
+if __name__ == "__main__":
+    data_directory = sys.argv[1] if len(sys.argv) > 1 else 'resources/03_BI'
+    index = build_value_index(data_directory)
+    print(f"🗂️  Índice: {len(index):,} valores distintos en {index['file'].nunique()} archivos")
+    if len(sys.argv) > 2:
+        print(search_values(index, sys.argv[2]).to_string())
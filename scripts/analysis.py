@@ -2,12 +2,22 @@ import pandas as pd
 import numpy as np
 import os
 import glob
+import sys
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'analysis'))
+from nac_cache import read_nac_file
+from nac_features import gestational_category
+from nac_schema import concat_years
+from nac_dates import ORDINAL_COLUMN, add_date_ordinal
+from nac_stats import DateHistogram, pair_sums, pair_table, update_pair_stats
+
 # Define paths
 DATA_DIR = 'resources/03_BI'
 OUTPUT_FILE = 'analysis_results.txt'
+# Processes used to parse each CSV by newline-aligned byte ranges
+PARSE_WORKERS = os.cpu_count() or 1
 
 def load_data():
     print("Loading data...")
@@ -16,8 +26,10 @@ def load_data():
     
     for filename in all_files:
         try:
-            # Try reading with latin1 first as it's common for these files
-            df = pd.read_csv(filename, sep=';', encoding='latin1')
+            # Columnar cache when fresh, otherwise CSV with the detected encoding.
+            # Column names and dtypes are harmonized across years at read time;
+            # large CSVs are parsed in parallel byte ranges.
+            df = read_nac_file(filename, harmonize=True, workers=PARSE_WORKERS)
             df_list.append(df)
             print(f"Loaded {os.path.basename(filename)}: {df.shape}")
         except Exception as e:
@@ -27,7 +39,7 @@ def load_data():
         print("No data loaded.")
         return None
         
-    full_df = pd.concat(df_list, ignore_index=True)
+    full_df = concat_years(df_list)
     print(f"Total records: {full_df.shape}")
     return full_df
 
@@ -41,77 +53,65 @@ def clean_data(df):
     for col in numeric_cols:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors='coerce')
+    
+    # Calendar-validated birth date as an Int32 ordinal (null when the date
+    # does not exist, e.g. 31-04 or 29-02 in a common year)
+    df = add_date_ordinal(df)
+    if ORDINAL_COLUMN in df.columns:
+        print(f"Invalid dates: {df[ORDINAL_COLUMN].isna().sum()}")
             
     return df
 
 def analyze_freq_month(df):
     print("\n--- 2. Most Frequent Month ---")
     if 'MES_NAC' in df.columns:
-        freq_month = df['MES_NAC'].mode()[0]
+        # Only calendar-valid dates
+        months = df.loc[df[ORDINAL_COLUMN].notna(), 'MES_NAC'] if ORDINAL_COLUMN in df.columns else df['MES_NAC']
+        freq_month = months.mode()[0]
         print(f"Most frequent month: {freq_month}")
-        print(df['MES_NAC'].value_counts().head())
+        print(months.value_counts().head())
     else:
         print("MES_NAC column not found.")
 
 def analyze_freq_day(df):
     print("\n--- 3. Most Frequent Day of Year ---")
     if 'MES_NAC' in df.columns and 'DIA_NAC' in df.columns:
-        # Create a temporary date column (ignoring year for day-of-year)
-        # We use a leap year (e.g., 2000) to include Feb 29
+        # Day of year (ignoring year) as integer key month*32+day, counted with
+        # np.bincount; 'MM-DD' labels are built only for the top results
         try:
-            # Filter invalid dates
-            valid_dates = df[(df['MES_NAC'].between(1, 12)) & (df['DIA_NAC'].between(1, 31))].copy()
-            # Construct string 'MM-DD'
-            valid_dates['MD'] = valid_dates['MES_NAC'].astype(int).astype(str).str.zfill(2) + '-' + \
-                                valid_dates['DIA_NAC'].astype(int).astype(str).str.zfill(2)
+            top = DateHistogram().update(df).top(5)
             
-            freq_day = valid_dates['MD'].mode()[0]
+            freq_day = top.index[0]
             print(f"Most frequent day (MM-DD): {freq_day}")
-            print(valid_dates['MD'].value_counts().head())
+            print(top['count'])
         except Exception as e:
             print(f"Error in day analysis: {e}")
 
-def analyze_cov_corr_peso_talla(df):
+def print_cov_corr(sums):
+    # Global and per-year values from per-year sufficient statistics
+    total, by_year = pair_table(sums)
+    print(f"Global Covariance: {total.cov()}")
+    print(f"Global Correlation: {total.corr()}")
+    
+    print("By Year:")
+    for year, row in by_year.iterrows():
+        print(f"Year {year}: {row['corr']}")
+
+def analyze_cov_corr_peso_talla(df, sums=None):
     print("\n--- 4. Covariance/Correlation Peso vs Talla ---")
     if 'PESO' in df.columns and 'TALLA' in df.columns:
-        # Filter valid data (e.g., weight > 0, height > 0)
-        valid = df[(df['PESO'] > 0) & (df['PESO'] < 9999) & (df['TALLA'] > 0) & (df['TALLA'] < 99)]
-        
-        cov = valid['PESO'].cov(valid['TALLA'])
-        corr = valid['PESO'].corr(valid['TALLA'])
-        print(f"Global Covariance: {cov}")
-        print(f"Global Correlation: {corr}")
-        
-        print("By Year:")
-        if 'ANO_NAC' in df.columns:
-            years = valid['ANO_NAC'].unique()
-            years.sort()
-            for year in years:
-                subset = valid[valid['ANO_NAC'] == year]
-                if len(subset) > 1:
-                    c = subset['PESO'].corr(subset['TALLA'])
-                    print(f"Year {year}: {c}")
+        # Valid range filter (0 < PESO < 9999, 0 < TALLA < 99) and one groupby by year
+        if sums is None:
+            sums = pair_sums(df, 'peso_talla')
+        print_cov_corr(sums)
 
-def analyze_cov_corr_parents_age(df):
+def analyze_cov_corr_parents_age(df, sums=None):
     print("\n--- 5. Covariance/Correlation Parent Ages ---")
     if 'EDAD_P' in df.columns and 'EDAD_M' in df.columns:
-        # Filter valid ages (e.g., 10-100)
-        valid = df[(df['EDAD_P'] > 10) & (df['EDAD_P'] < 100) & (df['EDAD_M'] > 10) & (df['EDAD_M'] < 100)]
-        
-        cov = valid['EDAD_P'].cov(valid['EDAD_M'])
-        corr = valid['EDAD_P'].corr(valid['EDAD_M'])
-        print(f"Global Covariance: {cov}")
-        print(f"Global Correlation: {corr}")
-        
-        print("By Year:")
-        if 'ANO_NAC' in df.columns:
-            years = valid['ANO_NAC'].unique()
-            years.sort()
-            for year in years:
-                subset = valid[valid['ANO_NAC'] == year]
-                if len(subset) > 1:
-                    c = subset['EDAD_P'].corr(subset['EDAD_M'])
-                    print(f"Year {year}: {c}")
+        # Valid range filter (10 < EDAD < 100 for both parents) and one groupby by year
+        if sums is None:
+            sums = pair_sums(df, 'edad_padres')
+        print_cov_corr(sums)
 
 def analyze_premature(df):
     print("\n--- 6. Premature Analysis ---")
@@ -121,12 +121,8 @@ def analyze_premature(df):
         df['SEMANAS'] = pd.to_numeric(df['SEMANAS'], errors='coerce')
         valid = df[(df['SEMANAS'] > 20) & (df['SEMANAS'] < 45)]
         
-        def categorize(weeks):
-            if weeks < 37: return 'Prematuro'
-            elif weeks <= 41: return 'A termino'
-            else: return 'Postermino'
-            
-        valid['Category'] = valid['SEMANAS'].apply(categorize)
+        # Ordered categorical from pd.cut (no per-row Python call)
+        valid = valid.assign(Category=gestational_category(valid['SEMANAS']))
         
         print(valid['Category'].value_counts())
         
@@ -162,8 +158,11 @@ def main():
         df = clean_data(df)
         analyze_freq_month(df)
         analyze_freq_day(df)
-        analyze_cov_corr_peso_talla(df)
-        analyze_cov_corr_parents_age(df)
+        # Per-file sufficient statistics, stored next to the CSVs: only new
+        # or modified files are summarized again
+        pair_stats = update_pair_stats(DATA_DIR)
+        analyze_cov_corr_peso_talla(df, pair_stats['peso_talla'])
+        analyze_cov_corr_parents_age(df, pair_stats['edad_padres'])
         analyze_premature(df)
         analyze_ambulance_indicator(df)
 
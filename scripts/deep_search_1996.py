@@ -1,18 +1,19 @@
-import pandas as pd
+import sys
+
+sys.path.insert(0, 'analysis')
+from nac_value_index import build_value_index, column_values, search_values
 
 try:
-    df = pd.read_csv('resources/03_BI/NAC_1996.csv', sep=';', encoding='latin1')
+    index = build_value_index('resources/03_BI')
     
     print("Searching for 'AMBULANCIA' or 'TRAYECTO' in all columns...")
-    for col in df.columns:
-        if df[col].dtype == 'object':
-            matches = df[df[col].astype(str).str.contains('AMBULANCIA|TRAYECTO', case=False, na=False)]
-            if not matches.empty:
-                print(f"Found matches in column {col}:")
-                print(matches[col].unique())
+    matches = search_values(index, 'AMBULANCIA|TRAYECTO', years=[1996])
+    for col, found in matches.groupby('column'):
+        print(f"Found matches in column {col}:")
+        print(found[['value', 'rows']].to_string(index=False))
                 
     print("\nAll unique values in ESTAB:")
-    print(df['ESTAB'].unique())
+    print(column_values(index, 'ESTAB', year=1996))
     
 except Exception as e:
     print(f"Error: {e}")
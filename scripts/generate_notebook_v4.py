@@ -5,6 +5,15 @@ Versión completa con todos los puntos de análisis
 
 import nbformat as nbf
 import json
+from pathlib import Path
+
+# Módulos de analysis/ que se copian al notebook (Colab no tiene el repositorio)
+ANALYSIS_DIR = Path(__file__).resolve().parent.parent / 'analysis'
+
+def module_cell(module_name):
+    """Celda %%writefile que crea en Colab un módulo de analysis/"""
+    source = (ANALYSIS_DIR / f'{module_name}.py').read_text(encoding='utf-8')
+    return {'type': 'code', 'content': f"%%writefile {module_name}.py\n{source.rstrip()}"}
 
 def create_complete_notebook():
     """Crea el notebook completo con todos los análisis"""
@@ -123,6 +132,34 @@ plt.rcParams['font.size'] = 10
 print("✅ Librerías importadas correctamente")"""
     })
     
+    # CACHÉ COLUMNAR
+    cells.append({
+        'type': 'markdown',
+        'content': """## 🗃️ Caché Columnar
+
+Los CSV se parsean una sola vez y se guardan en Parquet tipado (un archivo por año)
+en `data/_columnar_cache/`. Las lecturas siguientes usan la caché mientras los CSV no cambien."""
+    })
+    
+    cells.append(module_cell('nac_io'))
+    cells.append(module_cell('nac_schema'))
+    cells.append(module_cell('nac_cache'))
+    cells.append(module_cell('nac_dates'))
+    cells.append(module_cell('nac_offsets'))
+    cells.append(module_cell('nac_features'))
+    cells.append(module_cell('nac_stats'))
+    
+    cells.append({
+        'type': 'code',
+        'content': """from nac_cache import build_cache, read_nac_file
+from nac_dates import ORDINAL_COLUMN, add_date_ordinal, valid_date_mask
+from nac_features import gestational_category
+from nac_schema import concat_years
+from nac_stats import DateHistogram, OutlierStats
+
+build_cache('data')"""
+    })
+    
     # PUNTO 0
     cells.append({
         'type': 'markdown',
@@ -171,16 +208,16 @@ Este punto es fundamental para:
         filename = os.path.basename(file_path)
         
         try:
-            df = pd.read_csv(file_path, sep=';', encoding='latin-1', low_memory=False)
+            df = read_nac_file(file_path)
             
             quality_report['total_records'] += len(df)
             duplicates = df.duplicated().sum()
             quality_report['exact_duplicates'] += duplicates
             
-            # Detectar fechas inválidas
-            if 'DIA_NAC' in df.columns:
-                invalid = df[(df['DIA_NAC'] < 1) | (df['DIA_NAC'] > 31)]
-                quality_report['invalid_dates'] += len(invalid)
+            # Fechas que no existen en el calendario (31-04, 29-02 en año común)
+            if all(col in df.columns for col in ['ANO_NAC', 'MES_NAC', 'DIA_NAC']):
+                valid = valid_date_mask(df['ANO_NAC'], df['MES_NAC'], df['DIA_NAC'])
+                quality_report['invalid_dates'] += int((~valid).sum())
             
             quality_report['files_analyzed'].append({
                 'file': filename,
@@ -241,8 +278,8 @@ quality_report = analyze_data_quality()"""
     
     for filename in all_files:
         try:
-            df = pd.read_csv(filename, sep=';', encoding='latin-1', low_memory=False)
-            df.columns = [c.upper().strip() for c in df.columns]
+            # Esquema canónico: mismos nombres y dtypes compactos en todos los años
+            df = read_nac_file(filename, harmonize=True)
             
             year = os.path.basename(filename).split('_')[1].split('.')[0]
             df['ARCHIVO_ORIGEN'] = year
@@ -257,7 +294,7 @@ quality_report = analyze_data_quality()"""
         return None
     
     print("\\n🔗 Concatenando...")
-    full_df = pd.concat(df_list, ignore_index=True)
+    full_df = concat_years(df_list)
     
     # Convertir columnas numéricas
     numeric_cols = ['PESO', 'TALLA', 'EDAD_P', 'EDAD_M', 'MES_NAC', 'DIA_NAC', 'ANO_NAC', 'SEMANAS']
@@ -265,6 +302,9 @@ quality_report = analyze_data_quality()"""
         if col in full_df.columns:
             full_df[col] = pd.to_numeric(full_df[col], errors='coerce')
     
+    # Fecha validada contra el calendario como ordinal Int32 (nula si no existe)
+    full_df = add_date_ordinal(full_df)
+    
     # Eliminar duplicados
     before = len(full_df)
     full_df = full_df.drop_duplicates()
@@ -272,6 +312,8 @@ quality_report = analyze_data_quality()"""
     
     print(f"\\n✅ Datos cargados: {len(full_df):,} registros")
     print(f"   Duplicados eliminados: {removed:,}")
+    if ORDINAL_COLUMN in full_df.columns:
+        print(f"   Fechas inválidas: {full_df[ORDINAL_COLUMN].isna().sum():,}")
     
     return full_df
 
@@ -300,9 +342,10 @@ if df is not None:
     cells.append({
         'type': 'code',
         'content': """if df is not None and 'MES_NAC' in df.columns:
-    valid_months = df[df['MES_NAC'].between(1, 12)].copy()
-    month_counts = valid_months['MES_NAC'].value_counts().sort_index()
-    freq_month = valid_months['MES_NAC'].mode()[0]
+    # Solo fechas válidas en el calendario (FECHA_ORD no nula)
+    valid_months = df.loc[df[ORDINAL_COLUMN].notna(), 'MES_NAC']
+    month_counts = valid_months.value_counts().sort_index()
+    freq_month = valid_months.mode()[0]
     
     month_names = {
         1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril',
@@ -349,14 +392,9 @@ if df is not None:
     cells.append({
         'type': 'code',
         'content': """if df is not None and 'MES_NAC' in df.columns and 'DIA_NAC' in df.columns:
-    valid_dates = df[(df['MES_NAC'].between(1, 12)) & (df['DIA_NAC'].between(1, 31))].copy()
-    
-    valid_dates['FECHA_CUMPLE'] = (
-        valid_dates['MES_NAC'].astype(int).astype(str).str.zfill(2) + '-' +
-        valid_dates['DIA_NAC'].astype(int).astype(str).str.zfill(2)
-    )
-    
-    date_counts = valid_dates['FECHA_CUMPLE'].value_counts()
+    # Conteo por clave entera mes*32+día (np.bincount); solo el top 20
+    # recibe etiqueta 'MM-DD'
+    date_counts = DateHistogram().update(df).top(20)['count']
     freq_date = date_counts.index[0]
     
     month_names = {
@@ -509,12 +547,8 @@ if df is not None:
                    (df['PESO'] > 0) & (df['PESO'] < 6000) & 
                    (df['TALLA'] > 20) & (df['TALLA'] < 70)].copy()
     
-    def categorize_weeks(weeks):
-        if weeks < 37: return 'Prematuro'
-        elif weeks <= 41: return 'A término'
-        else: return 'Postérmino'
-    
-    valid_sem['Categoria'] = valid_sem['SEMANAS'].apply(categorize_weeks)
+    # Categórica ordenada vectorizada (pd.cut), sin apply por fila
+    valid_sem['Categoria'] = gestational_category(valid_sem['SEMANAS'])
     
     print("="*80)
     print("CATEGORÍAS GESTACIONALES")
@@ -539,7 +573,7 @@ if df is not None:
     
     # Estadísticas
     print("\\nEstadísticas por Categoría:")
-    print(valid_sem.groupby('Categoria')[['PESO', 'TALLA']].describe())"""
+    print(valid_sem.groupby('Categoria', observed=True)[['PESO', 'TALLA']].describe())"""
     })
     
     # PUNTO 7
@@ -568,22 +602,20 @@ Se inicializa la columna en 0 y se muestra el análisis de outliers general."""
     
     vars_to_analyze = ['PESO', 'TALLA', 'EDAD_P', 'EDAD_M']
     
-    for var in vars_to_analyze:
-        if var in df.columns:
-            data = df[var].dropna()
-            Q1 = data.quantile(0.25)
-            Q3 = data.quantile(0.75)
-            IQR = Q3 - Q1
-            
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            
-            outliers = data[(data < lower_bound) | (data > upper_bound)]
-            
-            print(f"\\n{var}:")
-            print(f"   Q1: {Q1:.2f}, Q3: {Q3:.2f}, IQR: {IQR:.2f}")
-            print(f"   Límites: [{lower_bound:.2f}, {upper_bound:.2f}]")
-            print(f"   Outliers: {len(outliers):,} ({(len(outliers)/len(data))*100:.2f}%)")
+    # Histogramas enteros por variable y año: cuartiles y conteo de outliers
+    # exactos sin copiar ni ordenar las columnas
+    outlier_stats = OutlierStats(vars_to_analyze).update(df)
+    
+    for var, row in outlier_stats.summary().iterrows():
+        print(f"\\n{var}:")
+        print(f"   Q1: {row['Q1']:.2f}, Q3: {row['Q3']:.2f}, IQR: {row['IQR']:.2f}")
+        print(f"   Límites: [{row['lower']:.2f}, {row['upper']:.2f}]")
+        print(f"   Outliers: {int(row['outliers']):,} ({row['pct']:.2f}%)")
+        if row['skipped']:
+            print(f"   Valores no enteros omitidos: {int(row['skipped']):,}")
+    
+    print("\\nOutliers por año (%):")
+    display(outlier_stats.by_year()['pct'].unstack('variable')[vars_to_analyze].round(2))
     
     # Visualización de outliers
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
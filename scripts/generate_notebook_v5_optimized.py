@@ -5,12 +5,21 @@ VERSIÓN OPTIMIZADA PARA GOOGLE COLAB - BAJO CONSUMO DE RAM
 Estrategias de optimización:
 1. Procesamiento por chunks (no cargar todo en memoria)
 2. Muestreo estratégico de datos
-3. Tipos de datos optimizados (int8, int16, float32)
+3. Tipos de datos compactos (Int8, Int16, category) aplicados al parsear
 4. Liberación de memoria después de cada análisis
 5. Procesamiento iterativo por año
 """
 
 import nbformat as nbf
+from pathlib import Path
+
+# Módulos de analysis/ que se copian al notebook (Colab no tiene el repositorio)
+ANALYSIS_DIR = Path(__file__).resolve().parent.parent / 'analysis'
+
+def module_cell(module_name):
+    """Celda %%writefile que crea en Colab un módulo de analysis/"""
+    source = (ANALYSIS_DIR / f'{module_name}.py').read_text(encoding='utf-8')
+    return {'type': 'code', 'content': f"%%writefile {module_name}.py\n{source.rstrip()}"}
 
 def create_optimized_notebook():
     """Crea notebook optimizado para RAM limitada"""
@@ -42,7 +51,7 @@ Esta versión está diseñada para funcionar en Google Colab con RAM limitada (1
 
 1. **Procesamiento por Chunks**: No carga todos los datos en memoria
 2. **Muestreo Estratégico**: Usa muestras representativas cuando es posible
-3. **Tipos de Datos Eficientes**: Reduce uso de memoria en 50-70%
+3. **Tipos de Datos Eficientes**: Esquema de dtypes aplicado al parsear, reduce memoria en 50-70%
 4. **Liberación de Memoria**: Limpia memoria después de cada análisis
 5. **Procesamiento Iterativo**: Analiza año por año cuando es necesario
 
@@ -98,6 +107,39 @@ def print_memory_usage():
 print_memory_usage()"""
     })
     
+    # ========================================================================
+    # CACHÉ COLUMNAR
+    # ========================================================================
+    cells.append({
+        'type': 'markdown',
+        'content': """## 🗃️ Caché Columnar
+
+Los CSV se parsean **una sola vez** y se guardan en Parquet tipado (un archivo por año)
+en `data/_columnar_cache/`. Las cargas siguientes leen solo las columnas necesarias
+desde la caché; si un CSV cambia se vuelve a leer desde el CSV."""
+    })
+    
+    cells.append(module_cell('nac_io'))
+    cells.append(module_cell('nac_schema'))
+    cells.append(module_cell('nac_cache'))
+    cells.append(module_cell('nac_dates'))
+    cells.append(module_cell('nac_offsets'))
+    cells.append(module_cell('nac_sampling'))
+    cells.append(module_cell('nac_features'))
+    cells.append(module_cell('nac_stats'))
+    
+    cells.append({
+        'type': 'code',
+        'content': """from nac_cache import build_cache, read_nac_file
+from nac_dates import add_date_ordinal
+from nac_features import gestational_category
+from nac_sampling import read_sample, sample_positions
+from nac_schema import canonical_name, concat_years, harmonize_columns, memory_report
+from nac_stats import CorpusStats
+
+build_cache('data')"""
+    })
+    
     # ========================================================================
     # FUNCIONES OPTIMIZADAS
     # ========================================================================
@@ -108,35 +150,18 @@ print_memory_usage()"""
     
     cells.append({
         'type': 'code',
-        'content': """def optimize_dtypes(df):
-    \"\"\"Optimiza tipos de datos para reducir memoria\"\"\"
-    
-    for col in df.columns:
-        col_type = df[col].dtype
-        
-        if col_type == 'int64':
-            c_min = df[col].min()
-            c_max = df[col].max()
-            
-            if c_min > np.iinfo(np.int8).min and c_max < np.iinfo(np.int8).max:
-                df[col] = df[col].astype(np.int8)
-            elif c_min > np.iinfo(np.int16).min and c_max < np.iinfo(np.int16).max:
-                df[col] = df[col].astype(np.int16)
-            elif c_min > np.iinfo(np.int32).min and c_max < np.iinfo(np.int32).max:
-                df[col] = df[col].astype(np.int32)
-        
-        elif col_type == 'float64':
-            df[col] = df[col].astype(np.float32)
-    
-    return df
-
-def load_data_chunked(data_dir='data', sample_size=None):
+        'content': """def load_data_chunked(data_dir='data', sample_size=None, stats=None, by_month=False):
     \"\"\"
     Carga datos de manera eficiente usando chunks
     
     Args:
         data_dir: directorio con archivos CSV
-        sample_size: si se especifica, toma muestra aleatoria de cada archivo
+        sample_size: si se especifica, toma muestra aleatoria reproducible
+            de cada archivo. Sin stats solo se parsean las filas elegidas
+            (offsets de bytes, nac_sampling)
+        stats: CorpusStats que se actualiza con cada archivo completo antes
+            de muestrear (estadísticas exactas con la RAM de la muestra)
+        by_month: muestra estratificada por MES_NAC
     \"\"\"
     print("🔄 Cargando datos de manera optimizada...")
     
@@ -157,33 +182,44 @@ def load_data_chunked(data_dir='data', sample_size=None):
     
     df_list = []
     total_rows = 0
+    failed = []
     
     for filename in all_files:
         try:
-            # Leer solo columnas esenciales
-            df = pd.read_csv(
-                filename, 
-                sep=';', 
-                encoding='latin-1',
-                usecols=lambda x: x.upper() in essential_cols,
-                low_memory=False
-            )
-            
-            # Estandarizar nombres
-            df.columns = [c.upper().strip() for c in df.columns]
-            
-            # Tomar muestra si se especifica
-            if sample_size and len(df) > sample_size:
-                df = df.sample(n=sample_size, random_state=42)
-            
-            # Optimizar tipos de datos
-            df = optimize_dtypes(df)
-            
-            # Convertir a numérico
-            numeric_cols = ['PESO', 'TALLA', 'EDAD_P', 'EDAD_M', 'MES_NAC', 'DIA_NAC', 'ANO_NAC', 'SEMANAS']
-            for col in numeric_cols:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
+            if sample_size and stats is None:
+                # Muestra por offsets de bytes: solo se parsean las filas elegidas
+                df = read_sample(filename, sample_size, usecols=essential_cols,
+                                 harmonize=True, by_month=by_month)
+                df = add_date_ordinal(df)
+            else:
+                if stats is not None:
+                    # Año completo con todas las columnas: los duplicados exactos
+                    # se buscan sobre la fila entera, porque dos nacimientos
+                    # distintos pueden coincidir en las columnas esenciales
+                    raw = read_nac_file(filename)
+                    unique = ~raw.duplicated().to_numpy()
+                    df = harmonize_columns(raw[[col for col in raw.columns if canonical_name(col) in essential_cols]])
+                    del raw
+                else:
+                    # Leer solo columnas esenciales (desde la caché si está vigente),
+                    # con nombres y dtypes del esquema canónico
+                    df = read_nac_file(
+                        filename,
+                        usecols=essential_cols,
+                        harmonize=True
+                    )
+                
+                # Fecha validada como ordinal Int32, reutilizada por las estadísticas
+                df = add_date_ordinal(df)
+                
+                # Agregados exactos con todas las filas del año
+                if stats is not None:
+                    stats.update(df[unique])
+                
+                # Misma muestra que read_sample (posiciones reproducibles por archivo)
+                if sample_size and len(df) > sample_size:
+                    strata = df['MES_NAC'].fillna(-1).to_numpy(dtype=np.int64) if by_month else None
+                    df = df.iloc[sample_positions(len(df), sample_size, key=os.path.basename(filename), strata=strata)]
             
             df_list.append(df)
             total_rows += len(df)
@@ -195,13 +231,17 @@ def load_data_chunked(data_dir='data', sample_size=None):
                 gc.collect()
             
         except Exception as e:
+            failed.append(os.path.basename(filename))
             print(f"✗ Error en {filename}: {e}")
     
+    if failed:
+        print(f"\\n⚠️ Archivos omitidos de la muestra y de las estadísticas: {', '.join(failed)}")
+    
     if not df_list:
         return None
     
     print(f"\\n🔗 Concatenando {len(df_list)} dataframes...")
-    full_df = pd.concat(df_list, ignore_index=True)
+    full_df = concat_years(df_list)
     
     # Liberar memoria de la lista
     del df_list
@@ -216,6 +256,10 @@ def load_data_chunked(data_dir='data', sample_size=None):
     print(f"   Duplicados eliminados: {removed:,}")
     print(f"   Columnas: {len(full_df.columns)}")
     
+    # Tipos compactos desde el parser: no hay pico int64/float64 ni downcast posterior
+    print("\\n📦 Reporte de memoria por columna:")
+    print(memory_report(full_df))
+    
     print_memory_usage()
     
     return full_df
@@ -252,7 +296,7 @@ Análisis rápido sin cargar todos los datos en memoria."""
     for filename in all_files:
         try:
             # Leer solo para contar
-            df = pd.read_csv(filename, sep=';', encoding='latin-1', low_memory=False)
+            df = read_nac_file(filename)
             
             records = len(df)
             duplicates = df.duplicated().sum()
@@ -289,28 +333,46 @@ quality = quick_quality_check()"""
 
 **Estrategia**: Cargar solo columnas esenciales con tipos de datos optimizados.
 
+**Estadísticas exactas**: mientras se lee cada año completo se actualiza `stats`
+(`CorpusStats`), con histogramas de mes/día, covarianzas por año y cuartiles
+sobre **todas** las filas. Los Puntos 2, 3, 4, 5 y 7 usan esos agregados; la
+muestra `df` solo se conserva para los gráficos de distribución.
+
+**Duplicados**: `stats` descarta los duplicados exactos comparando la fila
+completa (todas las columnas del archivo), así que dos nacimientos que solo
+coinciden en las columnas esenciales cuentan ambos. La muestra `df` elimina los
+duplicados sobre las columnas esenciales cargadas.
+
 **Opciones**:
 - `sample_size=None`: Carga todos los datos (puede usar mucha RAM)
 - `sample_size=10000`: Carga 10,000 registros por archivo (recomendado para Colab)
-- `sample_size=50000`: Carga 50,000 registros por archivo (más datos, más RAM)"""
+- `sample_size=50000`: Carga 50,000 registros por archivo (más datos, más RAM)
+- `stats=None` con `sample_size`: sin agregados exactos, pero solo se parsean
+  las filas muestreadas (segundos para los 28 años); la muestra es la misma
+  que con `stats`
+- `by_month=True`: muestra estratificada por mes"""
     })
     
     cells.append({
         'type': 'code',
-        'content': """# OPCIÓN 1: Muestra pequeña (RECOMENDADO para Colab gratuito)
-# df = load_data_chunked(sample_size=10000)
+        'content': """# Agregados exactos sobre todas las filas (memoria constante)
+stats = CorpusStats()
+
+# OPCIÓN 1: Muestra pequeña (RECOMENDADO para Colab gratuito)
+# df = load_data_chunked(sample_size=10000, stats=stats)
 
 # OPCIÓN 2: Muestra mediana (requiere más RAM)
-df = load_data_chunked(sample_size=20000)
+df = load_data_chunked(sample_size=20000, stats=stats)
 
 # OPCIÓN 3: Todos los datos (solo si tienes Colab Pro)
-# df = load_data_chunked(sample_size=None)
+# df = load_data_chunked(sample_size=None, stats=stats)
 
 if df is not None:
     print("\\n" + "="*60)
     print("INFORMACIÓN DEL DATASET")
     print("="*60)
-    print(f"Registros: {len(df):,}")
+    print(f"Registros en muestra: {len(df):,}")
+    print(f"Registros en estadísticas: {stats.rows:,}")
     print(f"Columnas: {list(df.columns)}")
     print(f"Periodo: {df['ANO_NAC'].min():.0f} - {df['ANO_NAC'].max():.0f}")
     
@@ -333,9 +395,9 @@ if df is not None:
     cells.append({
         'type': 'code',
         'content': """if df is not None and 'MES_NAC' in df.columns:
-    valid_months = df[df['MES_NAC'].between(1, 12)].copy()
-    month_counts = valid_months['MES_NAC'].value_counts().sort_index()
-    freq_month = valid_months['MES_NAC'].mode()[0]
+    # Histograma exacto de meses (todas las filas)
+    month_counts = pd.Series(stats.month_counts[1:], index=range(1, 13))
+    freq_month = month_counts.idxmax()
     
     month_names = {
         1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril',
@@ -355,11 +417,7 @@ if df is not None:
     ax.set_xticklabels([month_names[i] for i in range(1, 13)], rotation=45, ha='right')
     ax.grid(axis='y', alpha=0.3)
     plt.tight_layout()
-    plt.show()
-    
-    # Liberar memoria
-    del valid_months
-    gc.collect()"""
+    plt.show()"""
     })
     
     # ========================================================================
@@ -375,14 +433,9 @@ if df is not None:
     cells.append({
         'type': 'code',
         'content': """if df is not None and 'MES_NAC' in df.columns and 'DIA_NAC' in df.columns:
-    valid_dates = df[(df['MES_NAC'].between(1, 12)) & (df['DIA_NAC'].between(1, 31))].copy()
-    
-    valid_dates['FECHA'] = (
-        valid_dates['MES_NAC'].astype(int).astype(str).str.zfill(2) + '-' +
-        valid_dates['DIA_NAC'].astype(int).astype(str).str.zfill(2)
-    )
-    
-    date_counts = valid_dates['FECHA'].value_counts()
+    # Histograma exacto por clave entera mes*32+día (todas las filas);
+    # solo se generan etiquetas 'MM-DD' para el top 15
+    date_counts = stats.dates.top(15)['count']
     freq_date = date_counts.index[0]
     
     month_names = {
@@ -409,11 +462,7 @@ if df is not None:
     plt.gca().invert_yaxis()
     plt.grid(axis='x', alpha=0.3)
     plt.tight_layout()
-    plt.show()
-    
-    # Liberar memoria
-    del valid_dates, date_counts
-    gc.collect()"""
+    plt.show()"""
     })
     
     # ========================================================================
@@ -429,25 +478,18 @@ if df is not None:
     cells.append({
         'type': 'code',
         'content': """if df is not None:
-    valid_pt = df[(df['PESO'] > 0) & (df['PESO'] < 9999) & 
-                  (df['TALLA'] > 0) & (df['TALLA'] < 99)].copy()
-    
-    cov_global = valid_pt['PESO'].cov(valid_pt['TALLA'])
-    corr_global = valid_pt['PESO'].corr(valid_pt['TALLA'])
+    # Covarianza acumulada (Welford) sobre todas las filas válidas
+    total_pt = stats.pair_total('peso_talla')
+    cov_global = total_pt.cov()
+    corr_global = total_pt.corr()
     
     print(f"Covarianza Global: {cov_global:.2f}")
     print(f"Correlación Global: {corr_global:.4f}")
     
-    # Por año (procesamiento eficiente)
-    years = sorted(valid_pt['ANO_NAC'].unique())
-    corrs = []
-    
-    for year in years:
-        subset = valid_pt[valid_pt['ANO_NAC'] == year]
-        if len(subset) > 50:
-            c = subset['PESO'].corr(subset['TALLA'])
-            corrs.append(c)
-        del subset
+    # Por año (años con más de 50 pares válidos)
+    by_year = stats.pair_by_year('peso_talla')
+    years = list(by_year.index)
+    corrs = list(by_year['corr'])
     
     # Gráfico
     plt.figure(figsize=(12, 6))
@@ -461,9 +503,6 @@ if df is not None:
     plt.tight_layout()
     plt.show()
     
-    # Liberar memoria
-    del valid_pt
-    gc.collect()
     print_memory_usage()"""
     })
     
@@ -480,25 +519,18 @@ if df is not None:
     cells.append({
         'type': 'code',
         'content': """if df is not None:
-    valid_age = df[(df['EDAD_P'] > 10) & (df['EDAD_P'] < 100) & 
-                   (df['EDAD_M'] > 10) & (df['EDAD_M'] < 100)].copy()
-    
-    cov_global = valid_age['EDAD_P'].cov(valid_age['EDAD_M'])
-    corr_global = valid_age['EDAD_P'].corr(valid_age['EDAD_M'])
+    # Covarianza acumulada (Welford) sobre todas las filas válidas
+    total_age = stats.pair_total('edad_padres')
+    cov_global = total_age.cov()
+    corr_global = total_age.corr()
     
     print(f"Covarianza Global: {cov_global:.2f}")
     print(f"Correlación Global: {corr_global:.4f}")
     
-    # Por año
-    years = sorted(valid_age['ANO_NAC'].unique())
-    corrs_age = []
-    
-    for year in years:
-        subset = valid_age[valid_age['ANO_NAC'] == year]
-        if len(subset) > 50:
-            c = subset['EDAD_P'].corr(subset['EDAD_M'])
-            corrs_age.append(c)
-        del subset
+    # Por año (años con más de 50 pares válidos)
+    by_year_age = stats.pair_by_year('edad_padres')
+    years = list(by_year_age.index)
+    corrs_age = list(by_year_age['corr'])
     
     # Gráfico
     plt.figure(figsize=(12, 6))
@@ -512,9 +544,6 @@ if df is not None:
     plt.tight_layout()
     plt.show()
     
-    # Liberar memoria
-    del valid_age
-    gc.collect()
     print_memory_usage()"""
     })
     
@@ -540,12 +569,8 @@ if df is not None:
                    (df['PESO'] > 0) & (df['PESO'] < 6000) & 
                    (df['TALLA'] > 20) & (df['TALLA'] < 70)].copy()
     
-    def categorize_weeks(weeks):
-        if weeks < 37: return 'Prematuro'
-        elif weeks <= 41: return 'A término'
-        else: return 'Postérmino'
-    
-    valid_sem['Categoria'] = valid_sem['SEMANAS'].apply(categorize_weeks)
+    # Categórica ordenada vectorizada (pd.cut), sin apply por fila
+    valid_sem['Categoria'] = gestational_category(valid_sem['SEMANAS'])
     
     print(valid_sem['Categoria'].value_counts())
     
@@ -588,21 +613,20 @@ if df is not None:
     
     vars_to_analyze = ['PESO', 'TALLA', 'EDAD_P', 'EDAD_M']
     
-    for var in vars_to_analyze:
-        if var in df.columns:
-            data = df[var].dropna()
-            Q1 = data.quantile(0.25)
-            Q3 = data.quantile(0.75)
-            IQR = Q3 - Q1
-            
-            lower = Q1 - 1.5 * IQR
-            upper = Q3 + 1.5 * IQR
-            
-            outliers = data[(data < lower) | (data > upper)]
-            
-            print(f"{var}:")
-            print(f"   Q1={Q1:.1f}, Q3={Q3:.1f}, IQR={IQR:.1f}")
-            print(f"   Outliers: {len(outliers):,} ({(len(outliers)/len(data))*100:.2f}%)\\n")
+    # Cuartiles y outliers exactos desde histogramas enteros (todas las filas)
+    iqr_summary = stats.outliers.summary()
+    
+    for var, row in iqr_summary.iterrows():
+        print(f"{var}:")
+        print(f"   Q1={row['Q1']:.1f}, Q3={row['Q3']:.1f}, IQR={row['IQR']:.1f}")
+        if row['skipped']:
+            print(f"   Valores no enteros omitidos: {int(row['skipped']):,}")
+        print(f"   Outliers: {int(row['outliers']):,} ({row['pct']:.2f}%)\\n")
+    
+    # Outliers por año con los límites globales
+    outliers_by_year = stats.outliers.by_year()
+    print("Outliers por año (%):")
+    display(outliers_by_year['pct'].unstack('variable')[vars_to_analyze].round(2))
     
     # Visualización compacta
     fig, axes = plt.subplots(2, 2, figsize=(12, 10))
@@ -632,8 +656,8 @@ if df is not None:
 ### Optimizaciones Aplicadas
 
 1. ✅ **Carga por chunks**: Solo columnas esenciales
-2. ✅ **Tipos de datos optimizados**: Reducción de 50-70% en memoria
-3. ✅ **Muestreo estratégico**: Análisis representativo con menos datos
+2. ✅ **Tipos de datos compactos al parsear**: Esquema de dtypes (`nac_schema`), reducción de 50-70% en memoria
+3. ✅ **Estadísticas exactas en streaming**: Histogramas y covarianzas sobre todas las filas; la muestra solo se usa para gráficos
 4. ✅ **Liberación de memoria**: Limpieza después de cada análisis
 5. ✅ **Procesamiento iterativo**: Por año cuando es necesario
 
@@ -645,8 +669,8 @@ if df is not None:
 
 ### Recomendaciones
 
-- Para análisis completo: usar `sample_size=None` en Colab Pro
-- Para Colab gratuito: `sample_size=10000-20000` es óptimo
+- Los resultados numéricos de `stats` son exactos con cualquier `sample_size`
+- Para Colab gratuito: `sample_size=10000-20000` es suficiente para los gráficos
 - Monitorear memoria con `print_memory_usage()`
 
 ---
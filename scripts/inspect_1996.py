@@ -1,19 +1,28 @@
-import pandas as pd
+import sys
+
+sys.path.insert(0, 'analysis')
+from nac_value_index import build_value_index, column_profile, compare_years, top_values
+
+# Full-year value counts from the value index (no CSV re-read, no nrows limit)
+index = build_value_index('resources/03_BI')
 
 def inspect_year(year):
     try:
-        filename = f'resources/03_BI/NAC_{year}.csv'
-        df = pd.read_csv(filename, sep=';', nrows=10000) # Read more rows to see rare values
+        profile = column_profile(index, year)
         print(f"\n--- {year} ---")
-        print("Columns:", df.columns.tolist())
+        print("Columns:", profile['source_column'].tolist())
         
-        potential_cols = [c for c in df.columns if 'LUGAR' in c or 'LOCAL' in c or 'ESTAB' in c]
+        potential_cols = [c for c in profile['source_column'] if 'LUGAR' in c or 'LOCAL' in c or 'ESTAB' in c]
         for col in potential_cols:
             print(f"Value Counts for {col}:")
-            print(df[col].value_counts())
+            print(top_values(index, col, year=year, n=None))
             
     except Exception as e:
         print(f"Error reading {year}: {e}")
 
 inspect_year(1995)
 inspect_year(1996)
+
+# LUGAR_PART (1995) and LOCAL_PART (1996) share the canonical name LOCAL_PART
+print("\n--- LOCAL_PART 1995 -> 1996 ---")
+print(compare_years(index, 'LOCAL_PART', 1995, 1996))
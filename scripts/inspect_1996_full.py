@@ -1,14 +1,19 @@
-import pandas as pd
 import sys
 
+sys.path.insert(0, 'analysis')
+from nac_value_index import build_value_index, column_profile, top_values
+
 try:
+    # value_counts of every column and year, stored once in the value index
+    index = build_value_index('resources/03_BI')
+    profile = column_profile(index, 1996)
+    
     with open('inspection_1996.txt', 'w', encoding='utf-8') as f:
-        df = pd.read_csv('resources/03_BI/NAC_1996.csv', sep=';', encoding='latin1')
-        f.write(f"Columns: {df.columns.tolist()}\n\n")
+        f.write(f"Columns: {profile['source_column'].tolist()}\n\n")
         
-        for col in df.columns:
+        for col in profile['source_column']:
             f.write(f"--- {col} ---\n")
-            f.write(str(df[col].value_counts().head(20)) + "\n\n")
+            f.write(str(top_values(index, col, year=1996, n=20)) + "\n\n")
             
     print("Inspection complete. Check inspection_1996.txt")
             
@@ -1,15 +1,19 @@
-import pandas as pd
+import sys
+
+sys.path.insert(0, 'analysis')
+from nac_value_index import build_value_index, column_profile, top_values
 
 try:
-    df = pd.read_csv('resources/03_BI/NAC_2017.csv', sep=';')
-    print("Columns:", df.columns.tolist())
+    index = build_value_index('resources/03_BI')
+    profile = column_profile(index, 2017)
+    print("Columns:", profile['source_column'].tolist())
     
-    potential_cols = [c for c in df.columns if 'LUGAR' in c or 'LOCAL' in c or 'ESTAB' in c]
+    potential_cols = [c for c in profile['source_column'] if 'LUGAR' in c or 'LOCAL' in c or 'ESTAB' in c]
     print("Potential Place Columns:", potential_cols)
     
     for col in potential_cols:
         print(f"\nValue Counts for {col}:")
-        print(df[col].value_counts().head(10))
+        print(top_values(index, col, year=2017, n=10))
         
 except Exception as e:
     print(e)
@@ -1,21 +1,19 @@
-import pandas as pd
+import sys
+
+sys.path.insert(0, 'analysis')
+from nac_value_index import build_value_index, search_values
 
 try:
-    df = pd.read_csv('resources/03_BI/NAC_1996.csv', sep=';', encoding='latin1') # Try latin1 just in case
-    print("Columns:", df.columns.tolist())
+    # Distinct values per column/year, built once and updated incrementally
+    index = build_value_index('resources/03_BI')
     
-    if 'ESTAB' in df.columns:
-        print("\nSearching in ESTAB:")
-        ambulancia = df[df['ESTAB'].astype(str).str.contains('AMBULANCIA', case=False, na=False)]
-        trayecto = df[df['ESTAB'].astype(str).str.contains('TRAYECTO', case=False, na=False)]
+    print("\nSearching in ESTAB:")
+    for keyword in ['AMBULANCIA', 'TRAYECTO']:
+        matches = search_values(index, keyword, columns=['ESTAB'], years=[1996])
         
-        print(f"Rows with AMBULANCIA: {len(ambulancia)}")
-        if not ambulancia.empty:
-            print(ambulancia['ESTAB'].unique())
-            
-        print(f"Rows with TRAYECTO: {len(trayecto)}")
-        if not trayecto.empty:
-            print(trayecto['ESTAB'].unique())
+        print(f"Rows with {keyword}: {matches['rows'].sum()}")
+        if not matches.empty:
+            print(matches['value'].unique())
             
 except Exception as e:
     print(f"Error: {e}")
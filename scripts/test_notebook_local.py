@@ -8,8 +8,13 @@ import numpy as np
 import os
 import glob
 import gc
+import io
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'analysis'))
+from nac_cache import read_nac_file
+from nac_schema import concat_years, harmonize_columns, memory_report, reader_dtypes
+
 # Agregar color a los prints
 class Colors:
     GREEN = '\033[92m'
@@ -40,27 +45,6 @@ def print_memory_usage():
     except ImportError:
         print("⚠️  psutil no instalado, no se puede monitorear memoria")
 
-def optimize_dtypes(df):
-    """Optimiza tipos de datos para reducir memoria"""
-    for col in df.columns:
-        col_type = df[col].dtype
-        
-        if col_type == 'int64':
-            c_min = df[col].min()
-            c_max = df[col].max()
-            
-            if c_min > np.iinfo(np.int8).min and c_max < np.iinfo(np.int8).max:
-                df[col] = df[col].astype(np.int8)
-            elif c_min > np.iinfo(np.int16).min and c_max < np.iinfo(np.int16).max:
-                df[col] = df[col].astype(np.int16)
-            elif c_min > np.iinfo(np.int32).min and c_max < np.iinfo(np.int32).max:
-                df[col] = df[col].astype(np.int32)
-        
-        elif col_type == 'float64':
-            df[col] = df[col].astype(np.float32)
-    
-    return df
-
 def test_data_loading():
     """Prueba la carga de datos optimizada"""
     print("\n" + "="*60)
@@ -94,18 +78,14 @@ def test_data_loading():
     
     for filename in test_files:
         try:
-            df = pd.read_csv(
-                filename, 
-                sep=';', 
-                encoding='latin-1',
-                usecols=lambda x: x.upper() in essential_cols,
-                low_memory=False,
-                nrows=5000  # Solo 5000 filas para prueba
+            # Tipos compactos aplicados por el parser (esquema nac_schema)
+            df = read_nac_file(
+                filename,
+                usecols=essential_cols,
+                nrows=5000,  # Solo 5000 filas para prueba
+                harmonize=True
             )
             
-            df.columns = [c.upper().strip() for c in df.columns]
-            df = optimize_dtypes(df)
-            
             df_list.append(df)
             print_success(f"{os.path.basename(filename)}: {len(df):,} registros")
             
@@ -115,7 +95,7 @@ def test_data_loading():
     if not df_list:
         return None
     
-    full_df = pd.concat(df_list, ignore_index=True)
+    full_df = concat_years(df_list)
     del df_list
     gc.collect()
     
@@ -162,30 +142,35 @@ def test_analysis(df):
     print_memory_usage()
 
 def test_memory_optimization():
-    """Prueba la optimización de memoria"""
+    """Prueba el esquema de dtypes aplicado al parsear"""
     print("\n" + "="*60)
     print("TEST 3: Optimización de Memoria")
     print("="*60)
     
-    # Crear DataFrame de prueba
-    test_df = pd.DataFrame({
-        'col_int64': np.random.randint(0, 10, 10000),
-        'col_float64': np.random.random(10000)
-    })
+    # CSV de prueba con columnas del esquema NAC
+    test_csv = pd.DataFrame({
+        'SEXO': np.random.randint(1, 3, 10000),
+        'MES_NAC': np.random.randint(1, 13, 10000),
+        'PESO': np.random.randint(500, 5000, 10000),
+        'ANO_NAC': np.full(10000, 2017)
+    }).to_csv(sep=';', index=False)
+    
+    default_df = pd.read_csv(io.StringIO(test_csv), sep=';')
+    typed_df = pd.read_csv(io.StringIO(test_csv), sep=';', dtype=reader_dtypes())
     
-    mem_before = test_df.memory_usage(deep=True).sum() / 1024**2
-    print(f"Memoria antes: {mem_before:.2f} MB")
+    mem_before = default_df.memory_usage(deep=True).sum() / 1024**2
+    print(f"Memoria con tipos por defecto: {mem_before:.2f} MB")
     
-    # Optimizar
-    test_df = optimize_dtypes(test_df)
+    report = memory_report(harmonize_columns(typed_df))
+    print(report)
     
-    mem_after = test_df.memory_usage(deep=True).sum() / 1024**2
-    print(f"Memoria después: {mem_after:.2f} MB")
+    mem_after = report.loc['TOTAL', 'mb']
+    print(f"Memoria con esquema NAC: {mem_after:.2f} MB")
     
     reduction = ((mem_before - mem_after) / mem_before) * 100
     print_success(f"Reducción de memoria: {reduction:.1f}%")
     
-    del test_df
+    del default_df, typed_df
     gc.collect()
 
 def main():
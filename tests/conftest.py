@@ -0,0 +1,40 @@
+"""
+Configuración de pytest: los módulos de analysis/ se importan directamente,
+igual que en los scripts
+"""
+
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'analysis'))
+
+# Encabezado de los archivos NAC de prueba
+NAC_HEADER = 'SEXO;DIA_NAC;MES_NAC;ANO_NAC;PESO'
+
+
+@pytest.fixture
+def write_nac():
+    """
+    Escribe un CSV NAC de prueba en latin-1: write_nac(path, rows, header)
+    
+    rows son las filas ya unidas con ';', sin salto de línea.
+    """
+    def write(path, rows, header=NAC_HEADER):
+        path.write_text(header + '\n' + ''.join(f'{row}\n' for row in rows), encoding='latin-1')
+        return path
+    return write
+
+
+@pytest.fixture
+def quiet():
+    """Ejecuta func(*args, **kwargs) sin imprimir: devuelve (resultado, salida)"""
+    def run(func, *args, **kwargs):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            result = func(*args, **kwargs)
+        return result, output.getvalue()
+    return run
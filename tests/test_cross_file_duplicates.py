@@ -0,0 +1,108 @@
+"""Grupos de duplicados por ordenamiento de hashes y cruce incremental entre archivos"""
+
+import os
+
+import numpy as np
+
+from csv_analysis_algorithm import (
+    CSVAnalyzer, cross_file_candidates, find_duplicate_groups, intersect_sorted, sort_hashes
+)
+
+
+def _groups(file_ids, hashes, rows=None, min_files=2):
+    hashes = np.array(hashes, dtype=np.uint64)
+    file_ids = np.array(file_ids, dtype=np.int16)
+    rows = np.arange(len(hashes), dtype=np.int32) if rows is None else np.array(rows, dtype=np.int32)
+    return find_duplicate_groups(['NAC_2000.csv', 'NAC_2001.csv'], hashes, file_ids, rows, min_files)
+
+
+def test_only_groups_spanning_files_are_kept():
+    groups = _groups(
+        file_ids=[0, 0, 0, 1, 1, 1],
+        hashes=[7, 5, 5, 7, 9, 7],
+        rows=[0, 1, 2, 0, 1, 2],
+    )
+    
+    assert len(groups) == 1
+    assert groups.total_rows == 3
+    assert groups.locations(0) == [
+        {'file': 'NAC_2000.csv', 'row': 0},
+        {'file': 'NAC_2001.csv', 'row': 0},
+        {'file': 'NAC_2001.csv', 'row': 2},
+    ]
+    assert list(groups.sample()) == [f'{7:016x}']
+
+
+def test_min_files_one_keeps_duplicates_within_a_file():
+    groups = _groups(file_ids=[0, 0, 0, 1], hashes=[7, 5, 5, 9], min_files=1)
+    
+    assert groups.hashes.tolist() == [5]
+    assert groups.file_counts.tolist() == [1]
+
+
+def test_groups_match_dictionary_grouping():
+    rng = np.random.default_rng(0)
+    hashes = rng.integers(0, 200, 1000).astype(np.uint64)
+    # Entrada en orden archivo/fila, como la arma CSVAnalyzer
+    file_ids = np.sort(rng.integers(0, 2, 1000))
+    groups = _groups(file_ids, hashes)
+    
+    expected = {}
+    for position, (value, file_id) in enumerate(zip(hashes, file_ids)):
+        expected.setdefault(int(value), []).append((int(file_id), position))
+    expected = {
+        value: sorted(members) for value, members in expected.items()
+        if len({file_id for file_id, _ in members}) >= 2
+    }
+    
+    found = {
+        int(groups.hashes[g]): [
+            (groups.file_names.index(location['file']), location['row']) for location in groups.locations(g)
+        ]
+        for g in range(len(groups))
+    }
+    assert found == expected
+
+
+def _write_years(write_nac, data_dir, shared):
+    """Tres años con filas propias; shared[year] = filas repetidas de otros años"""
+    for year in (2000, 2001, 2002):
+        rows = [f'1;{1 + i % 28};3;{year};{3000 + i}' for i in range(30)] + shared.get(year, [])
+        write_nac(data_dir / f'NAC_{year}.csv', rows)
+
+
+def _cross_file_groups(quiet, data_dir, result_cache):
+    analyzer = CSVAnalyzer(data_dir, use_cache=False, result_cache=result_cache)
+    quiet(analyzer.analyze_all_files)
+    groups = analyzer.cross_file_duplicates
+    return sorted(tuple((loc['file'], loc['row']) for loc in groups.locations(g)) for g in range(len(groups)))
+
+
+def test_incremental_cross_file_matches_full_pass(tmp_path, write_nac, quiet):
+    data_dir = tmp_path / '03_BI'
+    data_dir.mkdir()
+    _write_years(write_nac, data_dir, {2001: ['1;1;3;2000;3000']})
+    
+    assert _cross_file_groups(quiet, data_dir, True) == _cross_file_groups(quiet, data_dir, False)
+    assert _cross_file_groups(quiet, data_dir, True) == [(('NAC_2000.csv', 0), ('NAC_2001.csv', 30))]
+    
+    # Solo cambia 2002: el cruce se rehace para él y reutiliza los candidatos guardados
+    _write_years(write_nac, data_dir, {2001: ['1;1;3;2000;3000'], 2002: ['1;2;3;2001;3001', '1;1;3;2000;3000']})
+    os.utime(data_dir / 'NAC_2002.csv', ns=(0, 0))
+    
+    incremental = _cross_file_groups(quiet, data_dir, True)
+    assert incremental == _cross_file_groups(quiet, data_dir, False)
+    assert incremental == [
+        (('NAC_2000.csv', 0), ('NAC_2001.csv', 30), ('NAC_2002.csv', 31)),
+        (('NAC_2001.csv', 1), ('NAC_2002.csv', 30)),
+    ]
+
+
+def test_candidates_are_found_by_binary_search():
+    by_file = {
+        name: sort_hashes(np.array(values, dtype=np.uint64))
+        for name, values in {'a': [5, 1, 9], 'b': [9, 2, 2], 'c': [1, 7]}.items()
+    }
+    assert cross_file_candidates(by_file, ['a']).tolist() == [1, 9]
+    assert cross_file_candidates(by_file, ['c'], known=np.array([9], dtype=np.uint64)).tolist() == [1, 9]
+    assert intersect_sorted(np.array([2, 3], dtype=np.uint64), by_file['b'][0]).tolist() == [2]
@@ -0,0 +1,93 @@
+"""Perfil de bytes y reescritura normalizada"""
+
+import pandas as pd
+
+import nac_bytes
+from nac_bytes import normalize_csv, normalize_frame, profile_bytes
+
+CONFIG = {'sep': ';', 'encoding': 'latin-1'}
+
+
+def _write(path, lines, eol='\n'):
+    path.write_bytes(''.join(line + eol for line in lines).encode('latin-1'))
+    return path
+
+
+def _bloated(tmp_path):
+    return _write(tmp_path / 'NAC_2009.csv', [
+        'SEXO;PESO;COMUNA;ESTAB',
+        '1;"  3250.0";01101;"HOSP X  "',
+        '2;3100;13101;CLINICA',
+        '1;0;00110;',
+    ], eol='\r\n')
+
+
+def test_profile_counts_overheads(tmp_path):
+    profile = profile_bytes(_bloated(tmp_path), CONFIG)
+    
+    assert profile['rows'] == 3
+    assert profile['line_endings']['style'] == 'CRLF'
+    assert profile['overhead_bytes']['carriage_returns'] == 4
+    assert profile['columns']['PESO']['quote_bytes'] == 2
+    assert profile['columns']['PESO']['padding_bytes'] == 2
+    assert profile['columns']['PESO']['zero_decimal_bytes'] == 2
+    assert profile['columns']['COMUNA']['leading_zero_bytes'] == 3
+    assert profile['columns']['ESTAB']['empty_fields'] == 1
+
+
+def test_normalize_frame_keeps_zero_padded_codes():
+    df = pd.DataFrame({'COMUNA': ['01101', '13101'], 'PESO': [' 3250.0', '+3100'], 'T': ['1.5', '2']})
+    normalized = normalize_frame(df)
+    
+    assert normalized['COMUNA'].tolist() == ['01101', '13101']
+    assert normalized['PESO'].tolist() == ['3250', '3100']
+    assert normalized['T'].tolist() == ['1.5', '2']
+
+
+def test_normalize_csv_replaces_only_verified_output(tmp_path):
+    csv_path = _bloated(tmp_path)
+    result = normalize_csv(csv_path, replace=True)
+    
+    assert result['verified']
+    assert csv_path.read_text(encoding='latin-1').splitlines() == [
+        'SEXO;PESO;COMUNA;ESTAB',
+        '1;3250;01101;HOSP X',
+        '2;3100;13101;CLINICA',
+        '1;0;00110;',
+    ]
+    assert (tmp_path / 'normalized' / 'NAC_2009.csv.orig').exists()
+
+
+def test_lossy_normalization_is_rejected(tmp_path, monkeypatch):
+    csv_path = _bloated(tmp_path)
+    original = csv_path.read_bytes()
+    
+    def strip_zeros(df):
+        df = df.copy()
+        df['COMUNA'] = df['COMUNA'].str.lstrip('0')
+        return df
+    
+    monkeypatch.setattr(nac_bytes, 'normalize_frame', strip_zeros)
+    result = normalize_csv(csv_path, replace=True)
+    
+    assert not result['verified']
+    assert csv_path.read_bytes() == original
+
+
+def test_clean_file_round_trips(tmp_path):
+    csv_path = _write(tmp_path / 'NAC_2010.csv', ['SEXO;PESO;NOMBRE', '1;3250;A B', '2;;C'])
+    result = normalize_csv(csv_path)
+    
+    assert result['verified']
+    assert result['size_after'] == result['size_before']
+
+
+def test_profile_handles_cr_only_and_blank_lines(tmp_path):
+    csv_path = tmp_path / 'NAC_2011.csv'
+    csv_path.write_bytes(b'SEXO;PESO\r1;3250\r\r2;3100 \r  \r')
+    profile = profile_bytes(csv_path, CONFIG)
+    
+    assert profile['rows'] == 2
+    assert profile['irregular_rows'] == 0
+    assert profile['line_endings']['style'] == 'CR'
+    assert profile['columns']['PESO']['padding_bytes'] == 1
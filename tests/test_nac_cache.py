@@ -0,0 +1,68 @@
+"""Caché columnar: leerla da los mismos valores que el CSV"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from nac_cache import build_cache, fresh_cache_entry, read_cached_file, read_nac_file
+from nac_io import read_nac_csv
+from nac_schema import cast_canonical
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    (tmp_path / 'NAC_2000.csv').write_text(
+        'SEXO;PESO;TALLA;COMUNA;ESTAB;INDICE\n'
+        '1;3250;50;13101;HOSP A;0.1\n'
+        '2;;49;01101;;1.25\n'
+        '1;3100;X;13102;HOSP B;2.5\n',
+        encoding='latin-1'
+    )
+    return tmp_path
+
+
+def test_plain_read_equals_csv(data_dir, capsys):
+    manifest = build_cache(data_dir)
+    csv_path = data_dir / 'NAC_2000.csv'
+    
+    expected, _ = read_nac_csv(csv_path)
+    cached = read_cached_file(csv_path, manifest['NAC_2000.csv'], plain=True)
+    pd.testing.assert_frame_equal(cached, expected)
+
+
+def test_lossy_columns_keep_their_dtype(data_dir, capsys):
+    manifest = build_cache(data_dir)
+    cached = read_cached_file(data_dir / 'NAC_2000.csv', manifest['NAC_2000.csv'])
+    
+    # 0.1 no es exacto en float32; 'X' no es un entero de TALLA
+    assert cached['INDICE'].dtype == 'float64'
+    assert cached['TALLA'].tolist() == ['50', '49', 'X']
+    assert str(cached['PESO'].dtype) == 'Int16'
+
+
+def test_harmonized_read_is_canonical(data_dir, capsys):
+    build_cache(data_dir)
+    df = read_nac_file(data_dir / 'NAC_2000.csv', usecols=['PESO', 'SEXO'], harmonize=True)
+    assert list(df.columns) == ['SEXO', 'PESO']
+    assert df['PESO'].isna().tolist() == [False, True, False]
+
+
+def test_cast_canonical_avoids_lossy_float32():
+    assert str(cast_canonical(pd.Series([1.5, 2.25]), 'Int8').dtype) == 'Float32'
+    assert str(cast_canonical(pd.Series([0.1, 2.0]), 'Int8').dtype) == 'Float64'
+
+
+def test_changed_file_is_read_from_the_csv(data_dir, capsys):
+    manifest = build_cache(data_dir)
+    csv_path = data_dir / 'NAC_2000.csv'
+    assert fresh_cache_entry(csv_path, manifest) is not None
+    
+    with open(csv_path, 'a', encoding='latin-1') as f:
+        f.write('2;3000;50;13101;HOSP C;1.5\n')
+    os.utime(csv_path, ns=(0, 0))
+    
+    assert fresh_cache_entry(csv_path, manifest) is None
+    assert len(read_nac_file(csv_path, manifest=manifest)) == 4
@@ -0,0 +1,48 @@
+"""Validación de fechas y ordinal de fecha"""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from nac_dates import (
+    ORDINAL_COLUMN,
+    add_date_ordinal,
+    date_ordinal,
+    day_of_year,
+    is_leap,
+    ordinal_parts,
+    valid_date_mask,
+    weekday,
+)
+
+
+def test_leap_years():
+    assert is_leap([1996, 2000, 1900, 2017]).tolist() == [True, True, False, False]
+
+
+def test_valid_date_mask_rejects_impossible_dates():
+    years = [2000, 1999, 2000, 2000, 2000, 2000, np.nan, 2000]
+    months = [2, 2, 4, 13, 1, 6, 2, np.nan]
+    days = [29, 29, 31, 1, 0, 15.5, 29, 1]
+    assert valid_date_mask(years, months, days).tolist() == [True, False, False, False, False, False, True, False]
+
+
+def test_ordinal_matches_datetime():
+    dates = [datetime.date(1990, 1, 1), datetime.date(1996, 2, 29), datetime.date(2017, 12, 31)]
+    ordinal, valid = date_ordinal([d.year for d in dates], [d.month for d in dates], [d.day for d in dates])
+    
+    epoch = datetime.date(1970, 1, 1)
+    assert valid.all()
+    assert ordinal.tolist() == [(d - epoch).days for d in dates]
+    assert [list(part) for part in ordinal_parts(ordinal)] == [[1990, 1996, 2017], [1, 2, 12], [1, 29, 31]]
+    assert day_of_year(ordinal).tolist() == [d.timetuple().tm_yday for d in dates]
+    assert weekday(ordinal).tolist() == [d.weekday() for d in dates]
+
+
+def test_add_date_ordinal_is_null_for_invalid_dates():
+    df = pd.DataFrame({'ANO_NAC': [2001, 2001, None], 'MES_NAC': [2, 2, 3], 'DIA_NAC': [28, 29, 1]})
+    add_date_ordinal(df)
+    
+    assert str(df[ORDINAL_COLUMN].dtype) == 'Int32'
+    assert df[ORDINAL_COLUMN].isna().tolist() == [False, True, True]
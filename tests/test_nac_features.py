@@ -0,0 +1,31 @@
+"""Clasificación por tramos"""
+
+import pandas as pd
+import pytest
+
+from nac_features import bin_column, birth_weight_category, gestational_category, maternal_age_band
+
+
+def test_gestational_boundaries():
+    weeks = pd.Series([36, 37, 41, 42, None], dtype='Int8')
+    result = gestational_category(weeks)
+    
+    assert result.cat.ordered
+    assert result.astype(object).where(result.notna(), None).tolist() == [
+        'Prematuro', 'A término', 'A término', 'Postérmino', None
+    ]
+
+
+def test_weight_and_age_bands():
+    assert birth_weight_category(pd.Series([1499, 1500, 2500, 4000])).tolist() == [
+        'Muy bajo peso', 'Bajo peso', 'Normal', 'Macrosómico'
+    ]
+    assert maternal_age_band(pd.Series(['19', '20', '35'])).tolist() == ['Menor de 20', '20 a 34', '35 o más']
+
+
+def test_custom_edges():
+    result = bin_column(pd.Series([1, 5, 10]), [0, 5, 11], ['bajo', 'alto'])
+    assert result.tolist() == ['bajo', 'alto', 'alto']
+    
+    with pytest.raises(ValueError):
+        bin_column(pd.Series([1]), [0, 5], ['bajo', 'alto'])
@@ -0,0 +1,59 @@
+"""Detección de encoding/separador y manifiesto de configuraciones de lectura"""
+
+import os
+
+from nac_io import (
+    READ_CONFIGS, cached_read_config, candidate_read_configs, file_fingerprint,
+    load_read_config_manifest, read_nac_csv, save_read_config_manifest, sniff_read_config
+)
+
+
+def test_sniff_detects_latin1_and_separator(tmp_path):
+    latin = tmp_path / 'NAC_1990.csv'
+    latin.write_bytes('SEXO;ESTAB\n1;HOSPITAL CONCEPCIÓN\n'.encode('latin-1'))
+    comma = tmp_path / 'NAC_1991.csv'
+    comma.write_text('SEXO,PESO\n1,3250\n', encoding='utf-8')
+    
+    assert sniff_read_config(latin) == {'sep': ';', 'encoding': 'latin-1', 'quotechar': '"'}
+    assert sniff_read_config(comma) == {'sep': ',', 'encoding': 'utf-8', 'quotechar': '"'}
+
+
+def test_sniff_does_not_split_multibyte_characters(tmp_path):
+    # El corte de la muestra cae dentro de una 'Ó' en UTF-8
+    path = tmp_path / 'NAC_2000.csv'
+    path.write_text('SEXO;ESTAB\n' + '1;CONCEPCIÓN\n' * 100, encoding='utf-8')
+    cut = len('SEXO;ESTAB\n1;CONCEPCI') + 1
+    
+    assert sniff_read_config(path, sample_bytes=cut)['encoding'] == 'utf-8'
+
+
+def test_manifest_entry_is_used_until_the_file_changes(tmp_path):
+    path = tmp_path / 'NAC_2000.csv'
+    path.write_text('SEXO;PESO\n1;3250\n', encoding='utf-8')
+    config = READ_CONFIGS[1]
+    save_read_config_manifest(tmp_path, {
+        path.name: {'fingerprint': file_fingerprint(path), 'read_config': config}
+    })
+    
+    manifest = load_read_config_manifest(tmp_path)
+    configs, cached, first = candidate_read_configs(path, manifest)
+    assert cached == first == configs[0] == config
+    assert configs.count(config) == 1
+    
+    path.write_text('SEXO;PESO\n1;3250\n2;3100\n', encoding='utf-8')
+    os.utime(path, ns=(0, 0))
+    assert cached_read_config(path, manifest) is None
+    assert candidate_read_configs(path, manifest)[1] is None
+
+
+def test_missing_manifest_is_empty(tmp_path):
+    assert load_read_config_manifest(tmp_path) == {}
+
+
+def test_read_falls_back_when_dtype_does_not_fit(tmp_path):
+    path = tmp_path / 'NAC_2000.csv'
+    path.write_text('SEXO;TALLA\n1;50\n2;X\n', encoding='utf-8')
+    
+    df, config = read_nac_csv(path, dtype={'TALLA': 'Int32'})
+    assert config['sep'] == ';'
+    assert df['TALLA'].tolist() == ['50', 'X']
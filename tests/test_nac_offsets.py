@@ -0,0 +1,104 @@
+"""Índice de offsets de filas y lectura paralela por rangos de bytes"""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import nac_offsets
+from nac_offsets import (
+    OFFSETS_DIRNAME,
+    load_row_offsets,
+    read_csv_parallel,
+    read_row_positions,
+    read_rows,
+    row_count,
+    row_ranges,
+    scan_row_offsets,
+)
+
+CONFIG = {'sep': ';', 'encoding': 'latin-1'}
+
+LAYOUTS = {
+    'lf': b'A;B\n1;x\n2;y\n3;z\n',
+    'crlf': b'A;B\r\n1;x\r\n2;y\r\n3;z\r\n',
+    'cr': b'A;B\r1;x\r2;y\r3;z\r',
+    'mixed_endings': b'A;B\n1;x\r2;y\r\n3;z',
+    'blank_lines': b'\n  \nA;B\n1;x\n\n2;y\r\n \t \r\n3;z\n\n',
+    'separator_only': b'A;B\n1;x\n;\n3;z\n',
+}
+
+
+def _write(tmp_path, payload, name='NAC_2000.csv'):
+    path = tmp_path / name
+    path.write_bytes(payload)
+    return path
+
+
+@pytest.mark.parametrize('layout', sorted(LAYOUTS))
+def test_rows_follow_parser_numbering(tmp_path, layout):
+    path = _write(tmp_path, LAYOUTS[layout])
+    expected = pd.read_csv(io.BytesIO(LAYOUTS[layout]), sep=';')
+    
+    offsets = scan_row_offsets(path)
+    assert row_count(offsets) == len(expected)
+    pd.testing.assert_frame_equal(read_rows(path, 0, None, offsets=offsets), expected)
+    
+    positions = [2, 0, 1]
+    pd.testing.assert_frame_equal(
+        read_row_positions(path, positions, offsets=offsets).reset_index(drop=True),
+        expected.iloc[positions].reset_index(drop=True)
+    )
+
+
+def test_read_rows_slice_keeps_file_positions(tmp_path):
+    path = _write(tmp_path, LAYOUTS['blank_lines'])
+    df = read_rows(path, 1, 3)
+    assert df.index.tolist() == [1, 2]
+    assert df['B'].tolist() == ['y', 'z']
+
+
+def test_index_is_persisted_and_refreshed(tmp_path):
+    path = _write(tmp_path, LAYOUTS['lf'])
+    assert row_count(load_row_offsets(path)) == 3
+    assert (tmp_path / OFFSETS_DIRNAME / 'NAC_2000.npy').exists()
+    
+    path.write_bytes(LAYOUTS['lf'] + b'4;w\n')
+    assert row_count(load_row_offsets(path)) == 4
+
+
+def test_row_ranges_cover_all_rows():
+    offsets = np.array([0, 4] + list(range(10, 1000, 10)) + [1000], dtype=np.uint64)
+    ranges = row_ranges(offsets, 4)
+    
+    assert len(ranges) == 4
+    assert ranges[0][0] == 0 and ranges[-1][1] == row_count(offsets)
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+
+def test_parallel_read_equals_read_csv(tmp_path, monkeypatch):
+    rows = [f'{i % 2 + 1};{3000 + i};{"X" if i == 1500 else i % 7}\n' for i in range(2000)]
+    path = _write(tmp_path, ('SEXO;PESO;COD\n' + ''.join(rows)).encode('latin-1'))
+    monkeypatch.setattr(nac_offsets, 'MIN_RANGE_BYTES', 1024)
+    
+    expected = pd.read_csv(path, **CONFIG, low_memory=False)
+    parallel = read_csv_parallel(path, CONFIG, workers=3)
+    pd.testing.assert_frame_equal(parallel, expected)
+    
+    subset = read_csv_parallel(path, CONFIG, workers=3, usecols=lambda col: col != 'COD')
+    pd.testing.assert_frame_equal(subset, expected[['SEXO', 'PESO']])
+
+
+def test_parallel_read_handles_blank_lines_and_mixed_numbers(tmp_path, monkeypatch):
+    # Filas en blanco y CRLF entre rangos; PESO vacío o con decimales solo en algunos
+    rows = [
+        f'{i % 2 + 1};{"" if i == 100 else 3000 + i};{"3000.5" if i == 1900 else i % 7}\r\n'
+        + ('\r\n' if i % 250 == 0 else '')
+        for i in range(2000)
+    ]
+    path = _write(tmp_path, ('\r\nSEXO;PESO;COD\r\n' + ''.join(rows)).encode('latin-1'))
+    monkeypatch.setattr(nac_offsets, 'MIN_RANGE_BYTES', 1024)
+    
+    expected = pd.read_csv(path, **CONFIG, low_memory=False)
+    pd.testing.assert_frame_equal(read_csv_parallel(path, CONFIG, workers=4), expected)
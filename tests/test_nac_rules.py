@@ -0,0 +1,61 @@
+"""Reglas de anomalías vectorizadas"""
+
+import numpy as np
+import pandas as pd
+
+from nac_rules import AnomalyRules, Rule
+
+
+def _births():
+    return pd.DataFrame({
+        'DIA_NAC': [1, 31, 29, 0, 15],
+        'MES_NAC': [1, 4, 2, 5, 13],
+        'ANO_NAC': [2001, 2001, 2001, 2001, 2000],
+        'PESO': [3200, 9999, 200, 4500, 800],
+        'SEMANAS': [39, 99, 30, 25, 41],
+        'HIJ_VIVOS': [1, 2, 1, 1, None],
+        'HIJ_FALL': [0, 0, 0, 1, 0],
+        'HIJ_MORT': [0, 0, 0, 0, 0],
+        'HIJ_TOTAL': [1, 3, 1, 2, 5],
+    })
+
+
+def _counts(rules):
+    return {item['type']: item['count'] for item in rules.report()}
+
+
+def test_rules_count_each_anomaly():
+    counts = _counts(AnomalyRules(2001).update(_births()))
+    
+    assert counts == {
+        'year_mismatch': 1,
+        'invalid_day': 1,
+        'invalid_month': 1,
+        'impossible_date': 2,
+        'peso_out_of_range': 1,
+        'peso_semanas_inconsistent': 2,
+        'hijos_total_mismatch': 1,
+    }
+
+
+def test_chunked_updates_equal_single_pass():
+    df = _births()
+    whole = AnomalyRules(2001, keep_rows=True).update(df)
+    chunked = AnomalyRules(2001, keep_rows=True)
+    for start in range(0, len(df), 2):
+        chunked.update(df.iloc[start:start + 2])
+    
+    assert chunked.report() == whole.report()
+    assert chunked.rows('impossible_date').tolist() == [1, 2]
+    assert np.array_equal(chunked.bitmap('impossible_date'), np.packbits([0, 1, 1, 0, 0], bitorder='little'))
+
+
+def test_rules_without_columns_or_year_are_skipped():
+    rules = AnomalyRules(None).update(pd.DataFrame({'dia_nac ': [40], 'MES_NAC': [1]}))
+    assert _counts(rules) == {'invalid_day': 1}
+
+
+def test_custom_rule():
+    rule = Rule('heavy', 'PESO > {year}', ['PESO'], lambda c, year: c['PESO'] > year)
+    rules = AnomalyRules(4000, rules=[rule]).update(_births())
+    assert rules.report() == [{'type': 'heavy', 'description': 'PESO > 4000', 'count': 2, 'percentage': 40.0}]
@@ -0,0 +1,50 @@
+"""Esquema canónico: alias de columnas, dtypes compactos y concatenación de años"""
+
+import pandas as pd
+
+from nac_schema import canonical_name, cast_canonical, concat_years, harmonize_columns
+
+
+def test_canonical_name_resolves_aliases():
+    assert canonical_name(' tipo_atenc ') == 'ATENC_PART'
+    assert canonical_name('ECIV_M') == 'EST_CIVI_M'
+    assert canonical_name('PESO') == 'PESO'
+
+
+def test_cast_canonical_widens_when_values_do_not_fit():
+    assert str(cast_canonical(pd.Series([1, 2, None]), 'Int8').dtype) == 'Int8'
+    assert str(cast_canonical(pd.Series([1, 300]), 'Int8').dtype) == 'Int16'
+    assert cast_canonical(pd.Series(['1', 'X']), 'Int8').isna().tolist() == [False, True]
+
+
+def test_cast_canonical_keeps_decimals_exact():
+    assert str(cast_canonical(pd.Series([0.5, 1.25]), 'Int8').dtype) == 'Float32'
+    
+    # 0.1 no es exacto en float32
+    series = pd.Series([0.1, 2.0])
+    cast = cast_canonical(series, 'Int8')
+    assert str(cast.dtype) == 'Float64'
+    assert cast.astype('float64').tolist() == series.tolist()
+
+
+def test_cast_canonical_categories_ignore_number_format():
+    cast = cast_canonical(pd.Series([5.0, 12.0]), 'category')
+    assert cast.tolist() == ['5', '12']
+
+
+def test_harmonize_merges_aliases_of_the_same_concept():
+    df = pd.DataFrame({'TIPO_ATENC': [1, None], 'ATENC_PART': [None, 2], 'OTRA': ['a', 'b']})
+    harmonized = harmonize_columns(df)
+    
+    assert list(harmonized.columns) == ['ATENC_PART', 'OTRA']
+    assert harmonized['ATENC_PART'].tolist() == [1, 2]
+    assert str(harmonized['ATENC_PART'].dtype) == 'Int8'
+
+
+def test_concat_years_keeps_categorical_columns():
+    year_a = harmonize_columns(pd.DataFrame({'ESTAB': ['101', '102']}))
+    year_b = harmonize_columns(pd.DataFrame({'ESTAB': ['103']}))
+    combined = concat_years([year_a, year_b])
+    
+    assert isinstance(combined['ESTAB'].dtype, pd.CategoricalDtype)
+    assert combined['ESTAB'].tolist() == ['101', '102', '103']
@@ -0,0 +1,147 @@
+"""Estadísticas exactas en streaming"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from nac_stats import (
+    CorpusStats,
+    DateHistogram,
+    IntHistogram,
+    OutlierStats,
+    merge_pair_sums,
+    pair_sums,
+    pair_table,
+    update_pair_stats,
+)
+
+
+@pytest.fixture
+def births():
+    rng = np.random.default_rng(7)
+    n = 3000
+    return pd.DataFrame({
+        'DIA_NAC': rng.integers(1, 32, n),
+        'MES_NAC': rng.integers(1, 13, n),
+        'ANO_NAC': rng.choice([1999, 2000], n),
+        'PESO': rng.integers(500, 5000, n),
+        'TALLA': rng.integers(30, 60, n),
+        'EDAD_P': rng.integers(15, 70, n),
+        'EDAD_M': rng.integers(12, 50, n),
+    })
+
+
+def test_histogram_quantiles_match_pandas(births):
+    histogram = IntHistogram().update(births['PESO'])
+    for q in (0.1, 0.25, 0.5, 0.75, 0.9):
+        assert histogram.quantile(q) == pytest.approx(births['PESO'].quantile(q))
+
+
+def test_chunked_updates_equal_single_pass(births):
+    whole = CorpusStats().update(births)
+    chunked = CorpusStats()
+    for start in range(0, len(births), 700):
+        chunked.update(births.iloc[start:start + 700])
+    
+    assert chunked.rows == whole.rows
+    assert np.array_equal(chunked.month_counts, whole.month_counts)
+    pd.testing.assert_frame_equal(chunked.outliers.summary(), whole.outliers.summary())
+    assert chunked.pair_total('peso_talla').cov() == pytest.approx(whole.pair_total('peso_talla').cov())
+
+
+def test_covariance_matches_pandas(births):
+    stats = CorpusStats().update(births)
+    by_year = stats.pair_by_year('peso_talla')
+    
+    for year, group in births.groupby('ANO_NAC'):
+        assert by_year.loc[year, 'cov'] == pytest.approx(group['PESO'].cov(group['TALLA']))
+        assert by_year.loc[year, 'corr'] == pytest.approx(group['PESO'].corr(group['TALLA']))
+
+
+def test_invalid_dates_are_not_counted():
+    df = pd.DataFrame({
+        'DIA_NAC': [29, 29, 31, 30, 15],
+        'MES_NAC': [2, 2, 4, 4, 13],
+        'ANO_NAC': [2000, 1999, 2000, 2000, 2000],
+    })
+    stats = CorpusStats().update(df)
+    
+    assert stats.month_counts.sum() == 2
+    assert stats.month_counts[2] == 1 and stats.month_counts[4] == 1
+
+
+def test_pair_sums_merge_across_files(births):
+    halves = [births.iloc[:1500], births.iloc[1500:]]
+    total, by_year = pair_table(merge_pair_sums([pair_sums(half, 'peso_talla') for half in halves]))
+    
+    assert total.cov() == pytest.approx(births['PESO'].cov(births['TALLA']))
+    assert list(by_year.index) == [1999, 2000]
+
+
+def test_date_histogram_top_matches_value_counts(births):
+    valid = births[births['DIA_NAC'] <= 28]
+    histogram = DateHistogram().update(valid.iloc[:1000]).merge(DateHistogram().update(valid.iloc[1000:]))
+    
+    labels = valid['MES_NAC'].map('{:02d}'.format) + '-' + valid['DIA_NAC'].map('{:02d}'.format)
+    expected = labels.value_counts()
+    expected = expected.sort_index().sort_values(ascending=False, kind='stable').head(5)
+    
+    top = histogram.top(5)
+    assert histogram.n == len(valid)
+    assert top.index.tolist() == expected.index.tolist()
+    assert top['count'].tolist() == expected.tolist()
+
+
+def test_pair_stats_store_updates_only_changed_files(tmp_path, births, capsys):
+    for year, group in births.groupby('ANO_NAC'):
+        group.to_csv(tmp_path / f'NAC_{year}.csv', sep=';', index=False, encoding='latin-1')
+    
+    sums = update_pair_stats(tmp_path)
+    total, _ = pair_table(sums['peso_talla'])
+    assert total.cov() == pytest.approx(births['PESO'].cov(births['TALLA']))
+    assert capsys.readouterr().out.count('estadísticos suficientes calculados') == 2
+    
+    extra = births.iloc[:10].assign(ANO_NAC=2000)
+    pd.concat([births[births['ANO_NAC'] == 2000], extra]).to_csv(
+        tmp_path / 'NAC_2000.csv', sep=';', index=False, encoding='latin-1'
+    )
+    sums = update_pair_stats(tmp_path)
+    assert capsys.readouterr().out.count('estadísticos suficientes calculados') == 1
+    assert sums['peso_talla']['n'].sum() == len(births) + 10
+
+
+def test_outlier_stats_match_pandas_iqr(births):
+    births = births.copy()
+    births.loc[:9, 'PESO'] = 9000
+    births.loc[10:14, 'ANO_NAC'] = np.nan
+    stats = OutlierStats(['PESO']).update(births.iloc[:1000])
+    stats.merge(OutlierStats(['PESO']).update(births.iloc[1000:]))
+    
+    peso = births['PESO']
+    q1, q3 = peso.quantile(0.25), peso.quantile(0.75)
+    lower, upper = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    summary = stats.summary().loc['PESO']
+    assert (summary['Q1'], summary['Q3']) == (q1, q3)
+    assert summary['outliers'] == ((peso < lower) | (peso > upper)).sum() == 10
+    
+    by_year = stats.by_year()
+    for year, group in births.dropna(subset=['ANO_NAC']).groupby('ANO_NAC'):
+        row = by_year.loc[(int(year), 'PESO')]
+        assert row['n'] == len(group)
+        assert row['Q3'] == group['PESO'].quantile(0.75)
+        assert row['outliers'] == ((group['PESO'] < lower) | (group['PESO'] > upper)).sum()
+    assert by_year['n'].sum() == len(births) - 5
+
+
+def test_non_integer_values_are_skipped_and_counted(births):
+    births = births.astype({'PESO': 'float64'})
+    births.loc[:2, 'PESO'] = [3000.5, np.inf, 3100.25]
+    
+    stats = OutlierStats(['PESO']).update(births)
+    summary = stats.summary().loc['PESO']
+    assert summary['n'] == len(births) - 3
+    assert summary['skipped'] == 3
+    assert summary['Q1'] == births['PESO'].iloc[3:].quantile(0.25)
+    
+    histogram = IntHistogram().update(births['PESO'])
+    assert (histogram.n, histogram.skipped) == (len(births) - 3, 3)
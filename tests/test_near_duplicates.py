@@ -0,0 +1,67 @@
+"""Casi-duplicados por bloqueo y vecindad ordenada"""
+
+import numpy as np
+import pandas as pd
+
+from nac_near_duplicates import find_near_duplicates, near_duplicate_summary
+
+
+def _births(rows):
+    columns = ['DIA_NAC', 'MES_NAC', 'ANO_NAC', 'COMUNA', 'ESTAB', 'TIPO_PARTO', 'PESO', 'TALLA', 'EDAD_M', 'SEMANAS']
+    return pd.DataFrame(rows, columns=columns)
+
+
+def test_re_registration_is_clustered():
+    df = _births([
+        (1, 3, 2000, 13101, 100, 1, 3250, 50, 28, 39),
+        (1, 3, 2000, 13101, 100, 1, 3260, 50, 28, 39),
+        (1, 3, 2000, 13101, 100, 1, 2100, 44, 35, 33),
+        (1, 3, 2000, 13102, 100, 1, 3250, 50, 28, 39),
+    ])
+    clusters = find_near_duplicates(df)
+    
+    assert clusters['row'].tolist() == [0, 1]
+    assert near_duplicate_summary(clusters, len(df))['redundant_rows'] == 1
+
+
+def test_unknown_codes_do_not_match():
+    df = _births([
+        (1, 3, 2000, 13101, 100, 1, 3250, 99, 99, 99),
+        (1, 3, 2000, 13101, 100, 1, 3290, 99, 99, 99),
+        (2, 3, 2000, 13101, 100, 1, 9999, 50, 28, 39),
+        (2, 3, 2000, 13101, 100, 1, 9999, 50, 28, 39),
+    ])
+    assert find_near_duplicates(df).empty
+
+
+def test_unknown_codes_lower_the_score():
+    known = _births([
+        (1, 3, 2000, 13101, 100, 1, 3250, 50, 28, 39),
+        (1, 3, 2000, 13101, 100, 1, 3250, 50, 28, 39),
+    ])
+    partly_unknown = _births([
+        (1, 3, 2000, 13101, 100, 1, 3250, 50, 28, 99),
+        (1, 3, 2000, 13101, 100, 1, 3250, 50, 28, 99),
+    ])
+    assert find_near_duplicates(known)['score'].iloc[0] == 1.0
+    assert find_near_duplicates(partly_unknown)['score'].iloc[0] < 1.0
+
+
+def test_multiple_births_are_not_duplicates():
+    df = _births([
+        (1, 3, 2000, 13101, 100, 2, 2500, 46, 31, 36),
+        (1, 3, 2000, 13101, 100, 2, 2520, 46, 31, 36),
+        (1, 3, 2000, 13101, 100, 1, 3250, 50, 28, 39),
+        (1, 3, 2000, 13101, 100, 9, 3250, 50, 28, 39),
+    ])
+    assert find_near_duplicates(df).empty
+
+
+def test_missing_date_or_weight_is_skipped():
+    df = _births([
+        (np.nan, 3, 2000, 13101, 100, 1, 3250, 50, 28, 39),
+        (np.nan, 3, 2000, 13101, 100, 1, 3250, 50, 28, 39),
+        (1, 3, 2000, 13101, 100, 1, np.nan, 50, 28, 39),
+        (1, 3, 2000, 13101, 100, 1, np.nan, 50, 28, 39),
+    ])
+    assert find_near_duplicates(df).empty
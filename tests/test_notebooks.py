@@ -0,0 +1,35 @@
+"""Los módulos copiados a los notebooks son los de analysis/"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+NOTEBOOKS = ['Entrega_Evaluacion_4.ipynb', 'Entrega_Evaluacion_5_Optimizado.ipynb']
+
+
+def _module_cells(notebook):
+    """{módulo: código} de las celdas %%writefile del notebook"""
+    with open(ROOT / 'notebooks' / notebook, encoding='utf-8') as f:
+        cells = json.load(f)['cells']
+    modules = {}
+    for cell in cells:
+        source = ''.join(cell['source'])
+        if cell['cell_type'] == 'code' and source.startswith('%%writefile '):
+            header, _, code = source.partition('\n')
+            modules[header.split()[1]] = code
+    return modules
+
+
+@pytest.mark.parametrize('notebook', NOTEBOOKS)
+def test_module_cells_match_analysis(notebook):
+    modules = _module_cells(notebook)
+    assert modules
+    
+    # Si falla: python scripts/generate_notebook_v4.py y generate_notebook_v5_optimized.py
+    stale = [
+        name for name, code in modules.items()
+        if code != (ROOT / 'analysis' / name).read_text(encoding='utf-8').rstrip()
+    ]
+    assert stale == []
@@ -0,0 +1,39 @@
+"""Análisis por archivo en paralelo: mismo resultado que en serie"""
+
+import numpy as np
+
+from csv_analysis_algorithm import CSVAnalyzer
+
+
+def _run(quiet, data_dir, workers):
+    analyzer = CSVAnalyzer(data_dir, use_cache=False, result_cache=False)
+    quiet(analyzer.analyze_all_files, workers=workers)
+    return analyzer
+
+
+# Dependen de cuándo se ejecutó, no de cómo: la hora y si la configuración de
+# lectura salió del manifiesto (lo escribe la primera ejecución)
+RUN_KEYS = {'analysis_timestamp', 'read_config_source'}
+
+
+def _results(analyzer):
+    """Análisis por archivo sin los campos de RUN_KEYS"""
+    return {
+        name: {key: value for key, value in analysis.items() if key not in RUN_KEYS}
+        for name, analysis in analyzer.analysis_results.items()
+    }
+
+
+def test_workers_match_serial(tmp_path, write_nac, quiet):
+    for year in (2000, 2001, 2002):
+        write_nac(tmp_path / f'NAC_{year}.csv', [f'{1 + i % 2};{1 + i % 31};{1 + i % 12};{year};{2900 + i % 7}' for i in range(40)])
+    
+    serial = _run(quiet, tmp_path, workers=1)
+    parallel = _run(quiet, tmp_path, workers=2)
+    
+    assert list(parallel.analysis_results) == list(serial.analysis_results)
+    assert _results(parallel) == _results(serial)
+    for name, (hashes, rows) in serial.row_hashes.items():
+        np.testing.assert_array_equal(parallel.row_hashes[name][0], hashes)
+        np.testing.assert_array_equal(parallel.row_hashes[name][1], rows)
+    assert parallel.cross_file_duplicates.hashes.tolist() == serial.cross_file_duplicates.hashes.tolist()
@@ -0,0 +1,69 @@
+"""Reporte Parquet por ejecución y exportación JSON"""
+
+import json
+
+import pytest
+
+from csv_analysis_algorithm import CSVAnalyzer
+from nac_report import ReportWriter, load_report
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def analyzer(tmp_path, write_nac, quiet):
+    data_dir = tmp_path / '03_BI'
+    data_dir.mkdir()
+    for year, extra in ((2000, 0), (2001, 5)):
+        rows = [f'{1 + i % 2};{1 + i % 28};2;{year};{3000 + i}' for i in range(20 + extra)]
+        write_nac(data_dir / f'NAC_{year}.csv', rows + [f'1;30;2;{year};3000'])
+    analyzer = CSVAnalyzer(data_dir, use_cache=False, result_cache=False)
+    quiet(analyzer.analyze_all_files)
+    return analyzer
+
+
+def test_each_run_adds_a_partition(analyzer, quiet):
+    report_dir, _ = quiet(analyzer.generate_report, 'report.json')
+    quiet(analyzer.generate_report, 'report.json')
+    
+    runs = load_report(report_dir, 'runs')
+    assert len(runs) == 2 and runs['run'].is_unique
+    assert runs['total_records'].tolist() == [47, 47]
+    
+    files = load_report(report_dir, 'files', latest=True)
+    assert files['file'].tolist() == ['NAC_2000.csv', 'NAC_2001.csv']
+    assert files['rows'].tolist() == [21, 26]
+    assert files['year'].tolist() == [2000, 2001]
+    
+    anomalies = load_report(report_dir, 'anomalies', latest=True)
+    assert set(anomalies['type']) == {'impossible_date'}
+    assert anomalies['count'].tolist() == [1, 1]
+    assert len(load_report(report_dir, 'anomalies')) == 4
+
+
+def test_json_export_has_the_full_analysis(analyzer, quiet):
+    expected = {name: analysis['metrics'] for name, analysis in analyzer.analysis_results.items()}
+    quiet(analyzer.generate_report, 'report.json', export_json=True, release=True)
+    
+    with open(analyzer.data_directory.parent / 'report.json', encoding='utf-8') as f:
+        report = json.load(f)
+    assert report['total_files_analyzed'] == 2
+    assert {name: analysis['metrics'] for name, analysis in report['individual_file_analysis'].items()} == expected
+    assert report['summary']['total_records_analyzed'] == 47
+    assert analyzer.analysis_results == {}
+
+
+def test_missing_report_is_an_empty_table(tmp_path):
+    assert load_report(tmp_path, 'columns').empty
+
+
+def test_writer_batches_keep_every_file(analyzer, tmp_path):
+    writer = ReportWriter(tmp_path / 'report', run_id='r1', batch_files=1)
+    for analysis in analyzer.analysis_results.values():
+        writer.update(analysis)
+    cross_file = {'total_duplicate_groups': 0, 'total_duplicate_rows': 0}
+    writer.close('2026-01-01', analyzer._generate_summary(), cross_file)
+    
+    columns = load_report(tmp_path / 'report', 'columns')
+    assert len(columns) == 10
+    assert set(columns['run']) == {'r1'}
@@ -0,0 +1,94 @@
+"""Caché de resultados por archivo"""
+
+import os
+
+import pytest
+
+import nac_result_cache
+from csv_analysis_algorithm import CSVAnalyzer
+from nac_result_cache import load_result_manifest, result_cache_directory
+
+
+@pytest.fixture
+def data_dir(tmp_path, write_nac):
+    data_dir = tmp_path / '03_BI'
+    data_dir.mkdir()
+    for year in (2000, 2001):
+        rows = [f'{1 + i % 2};{1 + i % 28};3;{year};{3000 + i}' for i in range(50)]
+        write_nac(data_dir / f'NAC_{year}.csv', rows + [f'1;1;3;{year};3000'])
+    return data_dir
+
+
+@pytest.fixture
+def run(data_dir, quiet):
+    """Analiza data_dir: run(**options) devuelve (analyzer, salida)"""
+    def run(**options):
+        analyzer = CSVAnalyzer(data_dir, use_cache=False, **options)
+        _, output = quiet(analyzer.analyze_all_files)
+        return analyzer, output
+    return run
+
+
+def test_unchanged_files_are_reused(run):
+    first, _ = run()
+    second, output = run()
+    
+    assert output.count('se reutiliza el análisis guardado') == 2
+    assert second.analysis_results == first.analysis_results
+    assert (second.row_hashes['NAC_2000.csv'][0] == first.row_hashes['NAC_2000.csv'][0]).all()
+
+
+@pytest.mark.parametrize('options', [{'hash_mode': 'md5'}, {'chunksize': 10}])
+def test_changed_options_are_not_reused(run, options):
+    run()
+    analyzer, output = run(**options)
+    
+    assert 'se reutiliza' not in output
+    assert analyzer.analysis_results['NAC_2000.csv']['duplicates']['exact_duplicates']['count'] == 1
+
+
+def test_modified_file_is_reanalyzed(data_dir, run):
+    run()
+    csv_path = data_dir / 'NAC_2001.csv'
+    with open(csv_path, 'a', encoding='latin-1') as f:
+        f.write('2;2;3;2001;3001\n')
+    os.utime(csv_path, ns=(0, 0))
+    
+    analyzer, output = run()
+    assert output.count('se reutiliza') == 1
+    assert analyzer.analysis_results['NAC_2001.csv']['metrics']['total_rows'] == 52
+
+
+def test_touched_file_is_reused_by_content_hash(data_dir, run):
+    run()
+    csv_path = data_dir / 'NAC_2000.csv'
+    os.utime(csv_path, ns=(0, 0))
+    
+    _, output = run()
+    assert output.count('se reutiliza') == 2
+    
+    # La huella nueva queda en el manifiesto: no se vuelve a leer el contenido
+    manifest = load_result_manifest(result_cache_directory(data_dir.parent))
+    assert manifest['NAC_2000.csv']['fingerprint']['mtime_ns'] == 0
+
+
+def test_removed_file_is_dropped_with_its_arrays(data_dir, run):
+    run()
+    cache_dir = result_cache_directory(data_dir.parent)
+    arrays = load_result_manifest(cache_dir)['NAC_2001.csv']['arrays']
+    assert all((cache_dir / name).exists() for name in arrays.values())
+    
+    (data_dir / 'NAC_2001.csv').unlink()
+    analyzer, _ = run()
+    
+    assert list(load_result_manifest(cache_dir)) == ['NAC_2000.csv']
+    assert not any((cache_dir / name).exists() for name in arrays.values())
+    assert len(analyzer.cross_file_duplicates) == 0
+
+
+def test_other_cache_version_is_ignored(run, monkeypatch):
+    run()
+    monkeypatch.setattr(nac_result_cache, 'RESULT_CACHE_VERSION', nac_result_cache.RESULT_CACHE_VERSION + 1)
+    
+    _, output = run()
+    assert 'se reutiliza' not in output
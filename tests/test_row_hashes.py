@@ -0,0 +1,75 @@
+"""Hash de filas: el modo vectorizado agrupa igual que el modo md5"""
+
+import numpy as np
+import pandas as pd
+
+from csv_analysis_algorithm import CSVAnalyzer, StreamingQualityStats, hash_rows
+
+
+def _groups(hashes):
+    """Partición de las filas según su hash"""
+    _, inverse = np.unique(hashes, return_inverse=True)
+    return sorted(tuple(np.flatnonzero(inverse == g)) for g in range(inverse.max() + 1))
+
+
+def _mode_hashes(df, hash_mode, tmp_path):
+    analyzer = CSVAnalyzer(tmp_path, hash_mode=hash_mode)
+    analysis = {'metrics': {}}
+    analyzer._create_row_hashes(df, analysis, 'NAC_2000.csv')
+    return analyzer.row_hashes['NAC_2000.csv'][0]
+
+
+def _mixed_frame():
+    return pd.DataFrame({
+        'CODIGO': pd.array(['01', '1', '1.0', None, '', '01', None, '', '1'], dtype='string'),
+        'PESO': [3200, 3200, 3200, 3200, 3200, 3200, 3200, 3200, 3200],
+        'TALLA': [50.5, 50.5, 50.5, np.nan, np.nan, 50.5, np.nan, np.nan, 50.5],
+    })
+
+
+def test_vectorized_groups_match_md5_on_mixed_values(tmp_path):
+    df = _mixed_frame()
+    vectorized = _mode_hashes(df, 'vectorized', tmp_path)
+    md5 = _mode_hashes(df, 'md5', tmp_path)
+    
+    assert _groups(vectorized) == _groups(md5)
+    assert _groups(vectorized) == [(0, 5), (1, 8), (2,), (3, 6), (4, 7)]
+
+
+def test_numeric_frame_groups_match_md5(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'ANO_NAC': rng.integers(1990, 1992, 500),
+        'PESO': rng.choice([np.nan, 3000.0, 3000.5], 500),
+        'COMUNA': rng.choice(['13101', '013101', 'X'], 500),
+    })
+    assert _groups(_mode_hashes(df, 'vectorized', tmp_path)) == _groups(_mode_hashes(df, 'md5', tmp_path))
+
+
+def test_hash_depends_on_column_order():
+    df = pd.DataFrame({'A': ['1', '2'], 'B': ['2', '1']})
+    hashes = hash_rows(df)
+    assert hashes[0] != hashes[1]
+
+
+def test_streaming_hash_ignores_chunk_dtype():
+    stats = StreamingQualityStats('2000')
+    stats.update(pd.DataFrame({'PESO': [3200, 3300]}))
+    stats.update(pd.DataFrame({'PESO': [3200.0, np.nan]}))
+    
+    hashes, _ = stats.row_hashes
+    assert hashes[0] == hashes[2]
+    assert stats.exact_duplicates == 1
+
+
+def test_extension_and_mixed_columns_group_like_md5(tmp_path):
+    df = pd.DataFrame({
+        'SEXO': pd.array([1, 1, None, None, 2, 1], dtype='Int8'),
+        'ESTAB': pd.Categorical(['A', 'A', None, None, 'B', 'A']),
+        'MIXTO': pd.Series([1, '1', None, None, 1.5, 1], dtype=object),
+        'VIVO': [True, True, False, False, True, True],
+    })
+    vectorized = _mode_hashes(df, 'vectorized', tmp_path)
+    
+    assert _groups(vectorized) == _groups(_mode_hashes(df, 'md5', tmp_path))
+    assert _groups(vectorized) == [(0, 1, 5), (2, 3), (4,)]
@@ -0,0 +1,41 @@
+"""Muestreo por offsets: reproducible y con las mismas filas que la lectura completa"""
+
+import numpy as np
+import pandas as pd
+
+from nac_sampling import read_sample, sample_positions
+
+
+def test_positions_are_reproducible_per_file():
+    first = sample_positions(1000, 50, seed=7, key='NAC_2000.csv')
+    
+    np.testing.assert_array_equal(first, sample_positions(1000, 50, seed=7, key='NAC_2000.csv'))
+    assert not np.array_equal(first, sample_positions(1000, 50, seed=7, key='NAC_2001.csv'))
+    assert len(np.unique(first)) == 50 and (np.diff(first) > 0).all()
+    assert sample_positions(10, 50).tolist() == list(range(10))
+
+
+def test_strata_receive_proportional_shares():
+    strata = np.repeat([1, 2, 3], [500, 300, 200])
+    positions = sample_positions(1000, 10, key='NAC_2000.csv', strata=strata)
+    
+    assert np.bincount(strata[positions]).tolist() == [0, 5, 3, 2]
+
+
+def test_read_sample_matches_full_read(tmp_path):
+    csv_path = tmp_path / 'NAC_2000.csv'
+    csv_path.write_text(
+        'SEXO;DIA_NAC;MES_NAC;PESO;ESTAB\r\n'
+        + ''.join(f'{1 + i % 2};{1 + i % 28};{1 + i % 12};{3000 + i};"HOSP; {i}"\r\n' for i in range(240)),
+        encoding='latin-1'
+    )
+    full = pd.read_csv(csv_path, sep=';', encoding='latin-1')
+    
+    sample = read_sample(csv_path, 30, seed=3)
+    positions = sample_positions(len(full), 30, seed=3, key=csv_path.name)
+    assert sample.index.tolist() == positions.tolist()
+    pd.testing.assert_frame_equal(sample, full.iloc[positions])
+    
+    by_month = read_sample(csv_path, 24, by_month=True)
+    pd.testing.assert_frame_equal(by_month, full.loc[by_month.index])
+    assert by_month['MES_NAC'].value_counts().tolist() == [2] * 12
@@ -0,0 +1,40 @@
+"""Análisis en streaming por chunks"""
+
+import pytest
+
+from csv_analysis_algorithm import CSVAnalyzer
+
+
+@pytest.fixture
+def csv_path(tmp_path, write_nac):
+    rows = [f'{1 + i % 2};{1 + i % 28};{1 + i % 12};2000;{3000 + i % 40};{48 + i % 5}' for i in range(300)]
+    return write_nac(tmp_path / 'NAC_2000.csv', rows + [rows[3], rows[250]], header='SEXO;DIA_NAC;MES_NAC;ANO_NAC;PESO;TALLA')
+
+
+@pytest.fixture
+def analyze(quiet):
+    """Análisis de un archivo con el chunksize dado (None: lectura completa)"""
+    def analyze(csv_path, chunksize):
+        analyzer = CSVAnalyzer(csv_path.parent, chunksize=chunksize, use_cache=False, result_cache=False)
+        return quiet(analyzer.analyze_single_csv, csv_path)[0]
+    return analyze
+
+
+def test_streaming_counts_match_full_read(csv_path, analyze):
+    full = analyze(csv_path, None)
+    streamed = analyze(csv_path, 37)
+    
+    assert streamed['read_mode']['streaming']
+    assert streamed['duplicates']['exact_duplicates'] == full['duplicates']['exact_duplicates']
+    assert full['duplicates']['exact_duplicates']['count'] == 2
+    assert streamed['metrics']['total_rows'] == full['metrics']['total_rows'] == 302
+    assert streamed['anomalies'] == full['anomalies']
+
+
+def test_streaming_duplicates_ignore_chunk_dtypes(tmp_path, write_nac, analyze):
+    # B es entera en el primer chunk y texto en el segundo (por la 'x')
+    rows = ['1;2;3;3000'] + [f'1;{i};3;3001' for i in range(9)] + ['1;2;3;3000', '1;x;3;3000']
+    path = write_nac(tmp_path / 'NAC_2000.csv', rows, header='A;B;C;PESO')
+    
+    counts = [analyze(path, chunksize)['duplicates']['exact_duplicates']['count'] for chunksize in (None, 10, 3)]
+    assert counts == [1, 1, 1]
@@ -0,0 +1,86 @@
+"""Índice de valores distintos: búsquedas, reindexado incremental y perfiles de columnas"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from nac_value_index import build_value_index, column_profile, compare_years, search_values, top_values
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    (tmp_path / 'NAC_1995.csv').write_text(
+        'SEXO;LUGAR_PART;GLOSA\n1;1;HOSPITAL\n2;1;AMBULANCIA\n1;2;HOSPITAL\n1;3;\n',
+        encoding='latin-1'
+    )
+    (tmp_path / 'NAC_1996.csv').write_text(
+        'SEXO;LOCAL_PART;GLOSA\n1;1;EN TRAYECTO\n2;2;HOSPITAL\n2;2;ambulancia\n',
+        encoding='latin-1'
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def build(data_dir, quiet):
+    """Construye o actualiza el índice: devuelve (índice, salida)"""
+    return lambda: quiet(build_value_index, data_dir)
+
+
+def test_search_counts_rows_per_value(build):
+    index, _ = build()
+    found = search_values(index, 'ambulancia|trayecto')
+    
+    assert found[['year', 'column', 'value', 'rows']].values.tolist() == [
+        [1995, 'GLOSA', 'AMBULANCIA', 1],
+        [1996, 'GLOSA', 'EN TRAYECTO', 1],
+        [1996, 'GLOSA', 'ambulancia', 1],
+    ]
+    assert search_values(index, 'AMBULANCIA', case=True)['year'].tolist() == [1995]
+    assert search_values(index, 'HOSPITAL', years=[1995])['rows'].tolist() == [2]
+
+
+def test_only_modified_files_are_reindexed(data_dir, build):
+    build()
+    index, output = build()
+    assert 'indexado' not in output
+    
+    csv_path = data_dir / 'NAC_1996.csv'
+    with open(csv_path, 'a', encoding='latin-1') as f:
+        f.write('1;1;AMBULANCIA\n')
+    os.utime(csv_path, ns=(0, 0))
+    
+    index, output = build()
+    assert output.count('indexado') == 1
+    assert 'NAC_1996.csv' in output
+    assert search_values(index, 'AMBULANCIA', years=[1996], case=True)['rows'].tolist() == [1]
+
+
+def test_top_values_match_value_counts(data_dir, build):
+    index, _ = build()
+    expected = pd.read_csv(data_dir / 'NAC_1995.csv', sep=';')['GLOSA'].value_counts()
+    
+    top = top_values(index, 'GLOSA', 1995)
+    assert top.to_dict() == expected.to_dict()
+    assert top_values(index, 'GLOSA', 1995, dropna=False).isna().sum() == 0
+    assert top_values(index, 'GLOSA', 1995, dropna=False).index.isna().sum() == 1
+
+
+def test_compare_years_uses_canonical_names(build):
+    index, _ = build()
+    comparison = compare_years(index, 'LUGAR_PART', 1995, 1996)
+    
+    assert comparison.index.tolist() == ['1', '2', '3']
+    assert comparison[1995].tolist() == [2, 1, 1]
+    assert comparison[1996].tolist() == [1, 2, 0]
+    assert comparison['diff_pp'].tolist() == [-16.67, 41.67, -25.0]
+
+
+def test_column_profile_counts_nulls_and_distinct(build):
+    index, _ = build()
+    profile = column_profile(index, 1995).set_index('source_column')
+    
+    assert profile.loc['LUGAR_PART', 'column'] == 'LOCAL_PART'
+    assert profile.loc['GLOSA', ['rows', 'nulls', 'distinct']].tolist() == [4, 1, 2]